@@ -162,6 +162,19 @@ export const importCSVWorkersService = async (
       }
     }
 
+    // Let the ML service drop its cached workers of this workspace
+    if (importedWorkers.length > 0) {
+      try {
+        const mlServiceUrl = process.env.ML_SERVICE_URL || "http://localhost:3000";
+        await fetch(
+          `${mlServiceUrl}/workers/cache/invalidate?workspace_id=${encodeURIComponent(workspaceId)}`,
+          { method: 'POST' }
+        );
+      } catch (error) {
+        console.log(`Failed to invalidate ML service worker cache: ${error}`);
+      }
+    }
+
     return {
       imported: importedWorkers,
       errors,
@@ -141,7 +141,8 @@ export const getProjectAnalyticsService = async(
         project_title: project.name,
         project_description: project.description || "",
         max_workers_per_task: 3,
-        workspace_id: workspaceId
+        workspace_id: workspaceId,
+        project_id: projectId
       })
     });
 
@@ -215,5 +216,16 @@ export const deleteProjectService = async (
     project: project._id,
   });
 
+  // Free the worker hours the ML service booked for this project
+  try {
+    const mlServiceUrl = process.env.ML_SERVICE_URL || "http://localhost:3000";
+    await fetch(
+      `${mlServiceUrl}/workers/bookings/${encodeURIComponent(projectId)}?workspace_id=${encodeURIComponent(workspaceId)}`,
+      { method: 'DELETE' }
+    );
+  } catch (error) {
+    console.log(`Failed to release ML service booking of project: ${error}`);
+  }
+
   return project;
 }
\ No newline at end of file
@@ -3,10 +3,14 @@ FastAPI Application for Task Prediction and Assignment System
 Author: Mohamed Taher Ben Slama - Digixi Intern
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Optional, Any, Union
+import time
+import asyncio
 import json
 import pandas as pd
 import numpy as np
@@ -19,10 +23,18 @@ import uvicorn
 import logging
 
 # Import your existing modules
-from ml import TaskPredictorTextOnly
-from model import FormulaYAssignmentEngine, calculate_task_times, predict_tasks
+from ml import (
+    TaskPredictorTextOnly, prediction_cache, MODEL_BACKENDS, DEFAULT_BACKEND,
+    INCREMENTAL_BACKENDS, BUNDLE_FILE, PREDICTION_SOURCES
+)
+from training_worker import TrainingStatusStore, ServingHeartbeat, heartbeat_path, start_training_process
+from batch_assignment import BATCH_PROCESSES, run_batch, to_ndjson
+from workload_ledger import WorkloadLedger, LedgerConflict
+from model import FormulaYAssignmentEngine, calculate_task_times, predict_tasks, ASSIGNMENT_MODES
 from gemini import suggest_task_details
 from database import db_connection
+from worker_cache import worker_cache
+from planning_context import PlanningContext
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -46,6 +58,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def mark_serving(request, call_next):
+    """Record serving traffic so a running training job pauses under load"""
+    if request.url.path.startswith(SERVING_PATHS):
+        serving_heartbeat.beat()
+    return await call_next(request)
+
 # Pydantic Models
 class TaskPredictionRequest(BaseModel):
     task_text: str = Field(..., description="Task description text")
@@ -55,6 +74,26 @@ class TaskPredictionResponse(BaseModel):
     risk: float = Field(..., description="Predicted risk score (0-1)")
     priority: float = Field(..., description="Predicted priority score (0-1)")
 
+class SimilarTasksRequest(BaseModel):
+    task_text: str = Field(..., description="Task description text")
+    k: Optional[int] = Field(default=None, ge=1, le=100, description="Number of neighbours (default: index setting)")
+
+class NeighborTask(BaseModel):
+    row: int
+    task: str
+    project: str
+    similarity: float
+    complexity: float
+    risk: float
+    duration: Optional[float] = None
+
+class SimilarTasksResponse(BaseModel):
+    complexity: Optional[float] = Field(None, description="Similarity-weighted complexity of the neighbours (0-10)")
+    risk: Optional[float] = Field(None, description="Similarity-weighted risk of the neighbours (0-1)")
+    priority: Optional[float] = Field(None, description="Similarity-weighted priority of the neighbours (0-1)")
+    duration: Optional[float] = Field(None, description="Similarity-weighted estimated duration in hours")
+    neighbors: List[NeighborTask]
+
 class SprintTaskPrediction(BaseModel):
     complexity: float
     risk: float
@@ -88,6 +127,8 @@ class ProjectRequest(BaseModel):
     project_description: str = Field(..., description="Detailed project description")
     max_workers_per_task: int = Field(default=3, description="Maximum workers per task")
     workspace_id: str = Field(..., description="Workspace ID to fetch workers from")
+    assignment_mode: Optional[str] = Field(default=None, description="greedy, global or auto (default: ASSIGNMENT_MODE)")
+    project_id: Optional[str] = Field(default=None, description="Key of the project's booking in the workload ledger (default: project_title)")
 
 class TaskInfo(BaseModel):
     task: str
@@ -117,6 +158,48 @@ class TaskAssignment(BaseModel):
     priority: float
     assigned_workers: List[WorkerInfo]
 
+class WorkerRecord(BaseModel):
+    name: str
+    role: str = ""
+    technologies: List[str] = []
+    experience: List[float] = []
+
+    def to_worker(self):
+        return {"Name": self.name, "Role": self.role, "Technologies": self.technologies, "Experience": self.experience}
+
+class TaskChange(BaseModel):
+    task_index: int
+    task: Optional[str] = None
+    roles: Optional[List[str]] = None
+    complexity: Optional[float] = None
+    risk: Optional[float] = None
+    priority: Optional[float] = None
+    estimated_time: Optional[float] = None
+
+class ReassignRequest(BaseModel):
+    previous_assignments: List[TaskAssignment] = Field(..., description="Assignments returned by a previous run")
+    added_tasks: List[TaskInfo] = []
+    changed_tasks: List[TaskChange] = []
+    removed_tasks: List[int] = Field(default=[], description="task_index of the removed tasks")
+    added_workers: List[WorkerRecord] = []
+    changed_workers: List[WorkerRecord] = Field(default=[], description="Workers are matched by name")
+    removed_workers: List[str] = []
+    max_workers_per_task: int = 3
+    workspace_id: str = Field(default="default", description="Workload ledger workspace the hours are booked in")
+    project_id: Optional[str] = Field(default=None, description="Project whose booking is replaced; without one, the difference to previous_assignments is booked")
+
+class BatchJob(BaseModel):
+    workspace_id: str
+    tasks: List[TaskInfo]
+    job_id: Optional[str] = None
+    max_workers_per_task: int = 3
+    workers: Optional[List[WorkerRecord]] = Field(default=None, description="Workers to use instead of the workspace's")
+
+class BatchAssignmentRequest(BaseModel):
+    jobs: List[BatchJob]
+    assignment_mode: Optional[str] = Field(default=None, description="greedy, global or auto (default: ASSIGNMENT_MODE)")
+    processes: Optional[int] = Field(default=None, description="Worker processes (default: BATCH_PROCESSES)")
+
 class ProjectResponse(BaseModel):
     project_title: str
     project_description: str
@@ -124,34 +207,157 @@ class ProjectResponse(BaseModel):
     total_estimated_time: float
     assignments: List[TaskAssignment]
     worker_utilization: Dict[str, Dict[str, Any]]
+    assignment_stats: Optional[Dict[str, Any]] = None
 
 class TrainingRequest(BaseModel):
     csv_path: str = Field(default="big_dataset.csv", description="Path to training dataset")
+    backend: str = Field(default=DEFAULT_BACKEND, description=f"Model backend to train: {', '.join(MODEL_BACKENDS)}")
+    tune: bool = Field(default=False, description="Run a successive-halving hyperparameter search before training")
 
 class TrainingStatus(BaseModel):
+    # model_version is a field, not pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+    
     status: str
     message: str
     timestamp: str
+    stage: Optional[str] = None
+    job_id: Optional[str] = None
+    backend: Optional[str] = None
+    model_version: Optional[str] = None
+    paused: Optional[bool] = None
+
+class LabeledTask(BaseModel):
+    task_text: str = Field(..., description="Task description text")
+    complexity: float = Field(..., ge=0, le=10, description="Actual complexity score (0-10)")
+    risk: Union[float, str] = Field(..., description="Actual risk as a 0-1 score or Low/Medium/High")
+    duration: Optional[float] = Field(default=None, ge=0, description="Actual duration in hours (neighbour index only)")
+
+class OnlineUpdateRequest(BaseModel):
+    tasks: List[LabeledTask] = Field(..., min_length=1, description="Newly labeled tasks")
+    checkpoint: bool = Field(default=False, description="Save the updated models to disk immediately")
+
+class NeighborUpdateRequest(BaseModel):
+    tasks: List[LabeledTask] = Field(..., min_length=1, description="Newly labeled tasks")
+    save: bool = Field(default=False, description="Save the updated neighbour index to disk")
 
 # Global variables for model management
+ml_backend = os.getenv("ML_MODEL_BACKEND", DEFAULT_BACKEND)
+ml_bundle_file = os.getenv("ML_MODEL_BUNDLE", BUNDLE_FILE)
+ml_prediction_source = os.getenv("ML_PREDICTION_SOURCE", "model")
+ASSIGNMENT_MODE = os.getenv("ASSIGNMENT_MODE", "greedy")
+ASSIGNMENT_TIME_LIMIT = float(os.getenv("ASSIGNMENT_TIME_LIMIT", 5))
+# Booked hours per (workspace, worker), shared by all API workers
+workload_ledger = WorkloadLedger(os.getenv("WORKLOAD_LEDGER_FILE", os.path.join("models", "workload_ledger.db")))
+DEFAULT_WORKSPACE = "default"  # Ledger workspace of the shared assignment engine
+LEDGER_COMMIT_RETRIES = 5
+WORKER_CACHE_WATCH = os.getenv("WORKER_CACHE_WATCH", "true").lower() in ("1", "true", "yes")
 ml_predictor = None
 assignment_engine = None
-training_status = {"status": "idle", "message": "No training in progress", "timestamp": ""}
+# Training runs in a separate process; its status is shared by all API workers
+training_store = TrainingStatusStore(os.getenv("TRAINING_STATUS_FILE", os.path.join("models", "training_status.json")))
+training_process = None
+# Tells the training supervisor when this worker is serving, so it can pause the fit
+serving_heartbeat = ServingHeartbeat(heartbeat_path(training_store.path))
+SERVING_PATHS = ("/predict", "/formula-y")
+applied_training_job = None
+TRAINING_POLL_SECONDS = float(os.getenv("TRAINING_POLL_SECONDS", 2))
+online_predictor = None
+online_backend = INCREMENTAL_BACKENDS[0]
+ONLINE_CHECKPOINT_EVERY = int(os.getenv("ONLINE_CHECKPOINT_EVERY", 100))
+ONLINE_CHECKPOINT_SECONDS = float(os.getenv("ONLINE_CHECKPOINT_SECONDS", 300))
 
 # Utility functions
 def initialize_ml_predictor():
-    """Initialize ML predictor with pre-trained models"""
+    """Initialize ML predictor with pre-trained models for the selected backend"""
     global ml_predictor
     try:
-        ml_predictor = TaskPredictorTextOnly()
-        ml_predictor.load_models("models")
-        logger.info("ML predictor initialized successfully")
+        ml_predictor = TaskPredictorTextOnly(backend=ml_backend)
+        ml_predictor.load_models("models", bundle_file=ml_bundle_file)
+        load_neighbor_index(ml_predictor)
+        # Cached predictions belong to the previous model artifacts
+        prediction_cache.clear()
+        logger.info(f"ML predictor initialized successfully (model version {ml_predictor.model_version[:12]})")
         return True
     except Exception as e:
         logger.error(f"Failed to initialize ML predictor: {e}")
         ml_predictor = None
         return False
 
+def initialize_online_predictor():
+    """Initialize the incrementally updated predictor (shared with ml_predictor when it is online)"""
+    global online_predictor
+    if ml_predictor is not None and ml_backend in INCREMENTAL_BACKENDS:
+        online_predictor = ml_predictor
+        return True
+    try:
+        online_predictor = TaskPredictorTextOnly(backend=online_backend)
+        online_predictor.load_models("models")
+        logger.info(f"Online predictor loaded (model version {online_predictor.model_version[:12]})")
+    except Exception as e:
+        # Start from scratch; the first labeled tasks initialize the models
+        logger.info(f"No saved online models, starting a fresh online predictor: {e}")
+        online_predictor = TaskPredictorTextOnly(backend=online_backend)
+    return True
+
+def load_neighbor_index(predictor):
+    """Attach the neighbour index to a predictor and select the configured prediction source"""
+    try:
+        if predictor.load_neighbor_index("models"):
+            logger.info(f"Neighbour index loaded ({predictor.neighbor_index.n_rows} tasks)")
+    except Exception as e:
+        logger.error(f"Failed to load neighbour index: {e}")
+    
+    if ml_prediction_source not in PREDICTION_SOURCES:
+        logger.error(f"Unknown ML_PREDICTION_SOURCE '{ml_prediction_source}', using the models")
+    elif ml_prediction_source == "knn" and predictor.neighbor_index is None:
+        logger.warning("ML_PREDICTION_SOURCE=knn but no neighbour index is available, using the models")
+    else:
+        predictor.prediction_source = ml_prediction_source
+
+def load_trained_predictor(backend):
+    """Load freshly trained models for a backend (runs in a thread, off the event loop)"""
+    predictor = TaskPredictorTextOnly(backend=backend)
+    predictor.load_models("models", bundle_file=ml_bundle_file)
+    # Keep the serving index, including rows added since it was loaded
+    if ml_predictor is not None and ml_predictor.neighbor_index is not None:
+        predictor.neighbor_index = ml_predictor.neighbor_index
+        predictor.prediction_source = ml_predictor.prediction_source
+    else:
+        load_neighbor_index(predictor)
+    return predictor
+
+async def watch_training_jobs():
+    """Swap in the models of every training job that completes, in each API worker"""
+    global ml_predictor, ml_backend, training_process, applied_training_job
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        await asyncio.sleep(TRAINING_POLL_SECONDS)
+        try:
+            # Reap the training process started by this worker
+            if training_process is not None and training_process.poll() is not None:
+                training_process = None
+            
+            status = training_store.read()
+            if status.get("status") != "completed" or status.get("job_id") == applied_training_job:
+                continue
+            
+            predictor = await loop.run_in_executor(None, load_trained_predictor, status["backend"])
+            
+            # Replace global predictor and drop predictions made by the old one
+            ml_predictor = predictor
+            ml_backend = status["backend"]
+            applied_training_job = status["job_id"]
+            prediction_cache.clear()
+            initialize_online_predictor()
+            logger.info(f"Swapped in models from training job {status['job_id']} "
+                        f"(model version {predictor.model_version[:12]})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to apply trained models: {e}")
+
 def initialize_assignment_engine():
     """Initialize Formula Y assignment engine"""
     global assignment_engine
@@ -164,13 +370,78 @@ def initialize_assignment_engine():
         assignment_engine = None
         return False
 
+def assign_with_ledger(engine, workspace_id, tasks_data, max_workers_per_task, assignment_mode, project_id=None):
+    """
+    Assign tasks on top of the hours already booked in the workspace and book the new hours
+    
+    The plan is made on a ledger snapshot; if another request booked hours
+    in the workspace meanwhile, it is re-planned on the new snapshot. With a
+    project_id the hours replace the project's previous booking (planned
+    without it), so analysing a project again doesn't book it twice.
+    """
+    for attempt in range(LEDGER_COMMIT_RETRIES):
+        booked, version = workload_ledger.snapshot(workspace_id, exclude_project=project_id)
+        engine.worker_availability = dict(booked)
+        assignments = engine.assign_tasks(tasks_data, max_workers_per_task,
+                                          mode=assignment_mode, time_limit=ASSIGNMENT_TIME_LIMIT)
+        try:
+            workload_ledger.commit(workspace_id, engine.assignment_hours(assignments), version, project=project_id)
+            return assignments
+        except LedgerConflict:
+            logger.info(f"Workload of workspace {workspace_id} changed during planning, re-planning ({attempt + 1})")
+    raise HTTPException(status_code=409, detail=f"Workload of workspace {workspace_id} kept changing, try again")
+
+def reassign_with_ledger(base_engine, workspace_id, previous_assignments, delta, max_workers_per_task, project_id=None):
+    """
+    Reassign on top of the hours booked elsewhere in the workspace and book the change
+    
+    With a project_id the result replaces the project's booking; otherwise the
+    previous assignments are taken to be booked and the difference is added.
+    Like assign_with_ledger, a conflicting commit re-plans on a new snapshot.
+    
+    Returns: (assignments, engine the reassignment ran on)
+    """
+    previous_hours = base_engine.assignment_hours(previous_assignments)
+    for attempt in range(LEDGER_COMMIT_RETRIES):
+        booked, version = workload_ledger.snapshot(workspace_id, exclude_project=project_id)
+        if project_id is None:
+            for worker_name, hours in previous_hours.items():
+                booked[worker_name] = max(booked.get(worker_name, 0.0) - hours, 0.0)
+        # Worker changes apply to this attempt's copy of the workers only
+        engine = base_engine.copy()
+        assignments = engine.reassign(previous_assignments, delta, max_workers_per_task, booked_hours=booked)
+        hours = engine.assignment_hours(assignments)
+        if project_id is None:
+            for worker_name, previous in previous_hours.items():
+                hours[worker_name] -= previous
+        try:
+            workload_ledger.commit(workspace_id, hours, version, project=project_id)
+            return assignments, engine
+        except LedgerConflict:
+            logger.info(f"Workload of workspace {workspace_id} changed during reassignment, re-planning ({attempt + 1})")
+    raise HTTPException(status_code=409, detail=f"Workload of workspace {workspace_id} kept changing, try again")
+
+def resolve_assignment_mode(mode):
+    """Requested assignment mode, or ASSIGNMENT_MODE when none is given"""
+    mode = mode or ASSIGNMENT_MODE
+    if mode not in ASSIGNMENT_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown assignment mode '{mode}'. Available: {ASSIGNMENT_MODES}")
+    return mode
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
+    global applied_training_job
     logger.info("Starting Task Prediction & Assignment API...")
+    # Models on disk already include the last completed training job
+    applied_training_job = training_store.read().get("job_id")
     initialize_ml_predictor()
+    initialize_online_predictor()
     initialize_assignment_engine()
+    if WORKER_CACHE_WATCH:
+        worker_cache.start_watch()
+    asyncio.create_task(watch_training_jobs())
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
@@ -180,6 +451,10 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "ml_predictor_ready": ml_predictor is not None and ml_predictor.is_trained,
+        "ml_backend": ml_backend,
+        "model_format": ml_predictor.model_format if ml_predictor else None,
+        "prediction_source": ml_predictor.prediction_source if ml_predictor else None,
+        "neighbor_index_rows": ml_predictor.neighbor_index.n_rows if ml_predictor and ml_predictor.neighbor_index else None,
         "assignment_engine_ready": assignment_engine is not None
     }
 
@@ -200,6 +475,21 @@ async def predict_single_task(request: TaskPredictionRequest):
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@app.post("/predict/task/similar", response_model=SimilarTasksResponse, tags=["Prediction"])
+async def predict_similar_tasks(request: SimilarTasksRequest):
+    """Find the most similar historical tasks and their similarity-weighted estimates, including duration"""
+    if not ml_predictor or ml_predictor.neighbor_index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Neighbour index not available. Build it with: python ml.py --knn"
+        )
+    
+    try:
+        return SimilarTasksResponse(**ml_predictor.predict_neighbors(request.task_text, request.k))
+    except Exception as e:
+        logger.error(f"Similar task search error: {e}")
+        raise HTTPException(status_code=500, detail=f"Similar task search failed: {str(e)}")
+
 @app.post("/predict/project/sprints", response_model=SprintPlanResponse, tags=["Sprint Planning"])
 async def predict_project_sprints(request: SprintPlanRequest):
     """Generate sprint-organized project plan with task predictions"""
@@ -228,10 +518,12 @@ async def predict_project_sprints(request: SprintPlanRequest):
         except json.JSONDecodeError:
             raise HTTPException(status_code=500, detail="Invalid JSON response from Gemini API")
         
-        # Step 2: Process tasks and get ML predictions
+        # Step 2: Process tasks and get ML predictions (one batch for all tasks)
+        task_texts = [task_info.get("task", "Unknown Task") for task_info in tasks_info]
+        predictions = ml_predictor.predict_many(task_texts)
+        
         processed_tasks = []
-        for task_info in tasks_info:
-            task_text = task_info.get("task", "Unknown Task")
+        for task_info, task_text, pred in zip(tasks_info, task_texts, predictions):
             duration = float(task_info.get("duration", 8))  # Default 8 hours if not specified
             roles = task_info.get("roles", [])
             
@@ -241,9 +533,6 @@ async def predict_project_sprints(request: SprintPlanRequest):
             elif not isinstance(roles, list):
                 roles = ["Developer"]  # Default role
             
-            # Get ML predictions
-            pred = ml_predictor.predict(task_text)
-            
             processed_tasks.append({
                 "task": task_text,
                 "duration": duration,
@@ -255,8 +544,8 @@ async def predict_project_sprints(request: SprintPlanRequest):
                 }
             })
         
-        # Step 3: Calculate estimated times using database workers
-        processed_tasks = calculate_task_times(processed_tasks, request.workspace_id)
+        # Step 3: Calculate estimated times using the workspace's workers (loaded once for the request)
+        processed_tasks = PlanningContext(request.workspace_id).estimate_times(processed_tasks)
         
         # Step 4: Sort tasks by priority (high priority first)
         processed_tasks.sort(key=lambda x: x['prediction']['priority'], reverse=True)
@@ -321,6 +610,7 @@ async def predict_project_tasks(request: ProjectRequest):
     print(f"🚀 AI Project Analysis triggered for workspace: {request.workspace_id}")
     print(f"🔍 Request details - Project: {request.project_title}, Workers per task: {request.max_workers_per_task}")
     print(f"🔍 This should only be called when user clicks 'Analyze Project' button")
+    assignment_mode = resolve_assignment_mode(request.assignment_mode)
     
     if not ml_predictor or not ml_predictor.is_trained:
         print("❌ ML predictor not available")
@@ -330,17 +620,18 @@ async def predict_project_tasks(request: ProjectRequest):
         )
     
     print(f"✅ ML predictor ready - Initializing assignment engine")
-    # Initialize assignment engine with database workers
-    assignment_engine = FormulaYAssignmentEngine(request.workspace_id)
+    # Load the workspace's workers once; time estimation and assignment share them
+    context = PlanningContext(request.workspace_id)
+    assignment_engine = context.engine
     
-    if assignment_engine.workers_df.empty:
+    if len(assignment_engine.worker_table) == 0:
         print(f"❌ No CSV workers found for workspace {request.workspace_id}")
         raise HTTPException(
             status_code=400, 
             detail=f"No CSV workers found in database for workspace {request.workspace_id}. Please import workers first."
         )
     
-    print(f"✅ Assignment engine ready with {len(assignment_engine.workers_df)} workers")
+    print(f"✅ Assignment engine ready with {len(assignment_engine.worker_table)} workers")
     
     try:
         # Step 1: Generate task details using Gemini
@@ -356,10 +647,12 @@ async def predict_project_tasks(request: ProjectRequest):
         except json.JSONDecodeError:
             raise HTTPException(status_code=500, detail="Invalid JSON response from Gemini API")
         
-        # Step 2: Predict using ML models
+        # Step 2: Predict using ML models (one batch for all tasks)
+        task_texts = [task_info.get("task", "Unknown Task") for task_info in tasks_info]
+        predictions = ml_predictor.predict_many(task_texts)
+        
         predicted_tasks = []
-        for task_info in tasks_info:
-            task_text = task_info.get("task", "Unknown Task")
+        for task_info, task_text, pred in zip(tasks_info, task_texts, predictions):
             duration = task_info.get("duration", 0)
             roles = task_info.get("roles", [])
             
@@ -369,9 +662,6 @@ async def predict_project_tasks(request: ProjectRequest):
             elif not isinstance(roles, list):
                 roles = []
             
-            # Get ML predictions
-            pred = ml_predictor.predict(task_text)
-            
             predicted_tasks.append({
                 "task": task_text,
                 "duration": duration,
@@ -382,26 +672,19 @@ async def predict_project_tasks(request: ProjectRequest):
             })
         
         # Step 3: Calculate estimated times
-        predicted_tasks = calculate_task_times(predicted_tasks, request.workspace_id)
+        predicted_tasks = context.estimate_times(predicted_tasks)
         
-        # Step 4: Apply Formula Y assignment
-        assignments = assignment_engine.assign_tasks(predicted_tasks, request.max_workers_per_task)
+        # Step 4: Apply Formula Y assignment on top of the hours already booked in the workspace
+        # (in a worker thread: the global solver may run for seconds)
+        # The booking is keyed by project, so viewing the analysis again replaces it
+        assignments = await run_in_threadpool(assign_with_ledger, assignment_engine, request.workspace_id,
+                                              predicted_tasks, request.max_workers_per_task, assignment_mode,
+                                              request.project_id or request.project_title)
         
-        # Step 5: Calculate totals and worker utilization
+        # Step 5: Calculate totals and worker utilization (including earlier bookings)
         total_estimated_time = sum(task.get('estimated_time', 0) for task in predicted_tasks)
         
-        worker_utilization = {}
-        for worker_name, total_hours in assignment_engine.worker_availability.items():
-            utilization_percent = (total_hours / 160) * 100  # 160 hours = 4 weeks capacity
-            status = "overloaded" if utilization_percent > 100 else \
-                    "high_load" if utilization_percent > 80 else \
-                    "normal" if utilization_percent > 50 else "light_load"
-            
-            worker_utilization[worker_name] = {
-                "total_hours": round(total_hours, 2),
-                "utilization_percent": round(utilization_percent, 2),
-                "status": status
-            }
+        worker_utilization = context.utilization()
         
         return ProjectResponse(
             project_title=request.project_title,
@@ -409,7 +692,8 @@ async def predict_project_tasks(request: ProjectRequest):
             total_tasks=len(predicted_tasks),
             total_estimated_time=round(total_estimated_time, 2),
             assignments=assignments,
-            worker_utilization=worker_utilization
+            worker_utilization=worker_utilization,
+            assignment_stats=assignment_engine.last_assignment_stats
         )
         
     except HTTPException:
@@ -420,73 +704,171 @@ async def predict_project_tasks(request: ProjectRequest):
 
 # Model management endpoints
 @app.post("/models/train", response_model=TrainingStatus, tags=["Model Management"])
-async def train_models(background_tasks: BackgroundTasks, request: TrainingRequest):
-    """Train ML models in the background"""
-    global training_status
+async def train_models(request: TrainingRequest):
+    """Train ML models in a separate training process"""
+    global training_process
     
-    if training_status["status"] == "training":
-        raise HTTPException(status_code=409, detail="Training already in progress")
+    if request.backend not in MODEL_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown backend '{request.backend}'. Available: {MODEL_BACKENDS}")
     
     # Check if dataset exists
     if not os.path.exists(request.csv_path):
         raise HTTPException(status_code=404, detail=f"Dataset file not found: {request.csv_path}")
     
-    # Start background training
-    background_tasks.add_task(train_models_background, request.csv_path)
-    
-    training_status = {
-        "status": "training",
-        "message": f"Training started with dataset: {request.csv_path}",
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    return TrainingStatus(**training_status)
-
-async def train_models_background(csv_path: str):
-    """Background task for model training"""
-    global ml_predictor, training_status
+    job = training_store.try_start(
+        backend=request.backend,
+        csv_path=request.csv_path,
+        message=f"Training started with dataset: {request.csv_path} ({request.backend} backend"
+                f"{', with hyperparameter tuning' if request.tune else ''})"
+    )
+    if job is None:
+        raise HTTPException(status_code=409, detail="Training already in progress")
     
     try:
-        logger.info(f"Starting model training with dataset: {csv_path}")
-        
-        # Initialize new predictor
-        predictor = TaskPredictorTextOnly()
-        predictor.train(csv_path)
-        predictor.save_models("models")
-        
-        # Replace global predictor
-        ml_predictor = predictor
-        
-        training_status = {
-            "status": "completed",
-            "message": "Model training completed successfully",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        logger.info("Model training completed successfully")
-        
+        training_process = start_training_process(
+            training_store, job["job_id"], request.csv_path, request.backend, request.tune
+        )
     except Exception as e:
-        logger.error(f"Model training failed: {e}")
-        training_status = {
-            "status": "failed",
-            "message": f"Model training failed: {str(e)}",
-            "timestamp": datetime.now().isoformat()
-        }
+        logger.error(f"Failed to start training process: {e}")
+        training_store.update(status="failed", stage="failed", message=f"Failed to start training: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start training: {str(e)}")
+    
+    logger.info(f"Started training job {job['job_id']} (pid {training_process.pid})")
+    return TrainingStatus(**job)
 
 @app.get("/models/status", response_model=TrainingStatus, tags=["Model Management"])
 async def get_training_status():
-    """Get current training status"""
-    return TrainingStatus(**training_status)
+    """Get current training status (shared by all API workers)"""
+    return TrainingStatus(**training_store.read())
 
 @app.post("/models/reload", tags=["Model Management"])
-async def reload_models():
-    """Reload models from disk"""
+async def reload_models(backend: Optional[str] = None):
+    """Reload models from disk, optionally switching to another backend"""
+    global ml_backend
+    if backend:
+        if backend not in MODEL_BACKENDS:
+            raise HTTPException(status_code=400, detail=f"Unknown backend '{backend}'. Available: {MODEL_BACKENDS}")
+        ml_backend = backend
     success = initialize_ml_predictor()
+    initialize_online_predictor()
     if success:
         return {"status": "success", "message": "Models reloaded successfully"}
     else:
         raise HTTPException(status_code=500, detail="Failed to reload models")
 
+@app.get("/models/cache", tags=["Model Management"])
+async def get_prediction_cache_stats():
+    """Get prediction cache hit/miss/eviction counters"""
+    return {
+        "model_version": ml_predictor.model_version if ml_predictor else None,
+        "cache": prediction_cache.stats()
+    }
+
+@app.post("/models/cache/clear", tags=["Model Management"])
+async def clear_prediction_cache():
+    """Drop all cached predictions"""
+    prediction_cache.clear()
+    return {"status": "success", "message": "Prediction cache cleared", "cache": prediction_cache.stats()}
+
+@app.post("/models/online/update", tags=["Model Management"])
+async def update_online_models(request: OnlineUpdateRequest):
+    """Update the online models in place with newly labeled tasks"""
+    if online_predictor is None:
+        raise HTTPException(status_code=503, detail="Online predictor not available")
+    
+    try:
+        start = time.perf_counter()
+        applied = online_predictor.partial_fit(
+            [task.task_text for task in request.tasks],
+            [task.complexity for task in request.tasks],
+            [task.risk for task in request.tasks]
+        )
+        update_ms = (time.perf_counter() - start) * 1000
+        
+        if request.checkpoint:
+            online_predictor.checkpoint("models")
+            checkpointed = True
+        else:
+            checkpointed = online_predictor.maybe_checkpoint(
+                "models", ONLINE_CHECKPOINT_EVERY, ONLINE_CHECKPOINT_SECONDS
+            )
+        
+        return {
+            "status": "success",
+            "applied": applied,
+            "update_ms": round(update_ms, 2),
+            "checkpointed": checkpointed,
+            "model_version": online_predictor.model_version,
+            "updates_since_checkpoint": online_predictor.updates_since_checkpoint
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Online update failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Online update failed: {str(e)}")
+
+@app.get("/models/online/status", tags=["Model Management"])
+async def get_online_status():
+    """Get the online predictor's version and checkpoint state"""
+    if online_predictor is None:
+        raise HTTPException(status_code=503, detail="Online predictor not available")
+    return {
+        "backend": online_predictor.backend,
+        "serving": online_predictor is ml_predictor,
+        "is_trained": online_predictor.is_trained,
+        "model_version": online_predictor.model_version,
+        "updates_since_load": online_predictor.n_updates,
+        "updates_since_checkpoint": online_predictor.updates_since_checkpoint,
+        "last_checkpoint": datetime.fromtimestamp(online_predictor.last_checkpoint).isoformat(),
+        "checkpoint_every_updates": ONLINE_CHECKPOINT_EVERY,
+        "checkpoint_every_seconds": ONLINE_CHECKPOINT_SECONDS
+    }
+
+@app.post("/models/online/checkpoint", tags=["Model Management"])
+async def checkpoint_online_models():
+    """Save the online models to disk now"""
+    if online_predictor is None or not online_predictor.is_trained:
+        raise HTTPException(status_code=503, detail="Online predictor has no trained models to save")
+    try:
+        online_predictor.checkpoint("models")
+        return {"status": "success", "model_version": online_predictor.model_version}
+    except Exception as e:
+        logger.error(f"Online checkpoint failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Checkpoint failed: {str(e)}")
+
+@app.post("/models/neighbors/add", tags=["Model Management"])
+async def add_neighbor_tasks(request: NeighborUpdateRequest):
+    """Add labeled tasks to the neighbour index without rebuilding it"""
+    if not ml_predictor or ml_predictor.neighbor_index is None:
+        raise HTTPException(status_code=503, detail="Neighbour index not available")
+    
+    try:
+        start = time.perf_counter()
+        durations = [task.duration if task.duration is not None else np.nan for task in request.tasks]
+        added = ml_predictor.add_neighbors(
+            [task.task_text for task in request.tasks],
+            [task.complexity for task in request.tasks],
+            [task.risk for task in request.tasks],
+            duration=durations
+        )
+        update_ms = (time.perf_counter() - start) * 1000
+        if request.save:
+            ml_predictor.save_neighbor_index("models")
+        
+        return {
+            "status": "success",
+            "added": added,
+            "update_ms": round(update_ms, 2),
+            "saved": request.save,
+            "index_rows": ml_predictor.neighbor_index.n_rows,
+            "index_version": ml_predictor.neighbor_index.version
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Neighbour index update failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Neighbour index update failed: {str(e)}")
+
 # Worker management endpoints
 @app.get("/workers/debug", tags=["Workers"])
 async def debug_workers():
@@ -530,7 +912,7 @@ async def get_workers(workspace_id: str = None):
             return {"workers": [], "total_count": 0, "message": "No workspace_id provided"}
         
         print(f"🔍 API: Fetching workers for workspace {workspace_id}")
-        workers_data = db_connection.get_csv_workers(workspace_id)
+        workers_data = worker_cache.get(workspace_id).records
         
         if not workers_data:
             print(f"⚠️  No workers found for workspace {workspace_id}")
@@ -542,6 +924,18 @@ async def get_workers(workspace_id: str = None):
         print(f"❌ API Error in get_workers: {e}")
         return {"workers": [], "total_count": 0, "error": f"Error reading workers: {str(e)}"}
 
+@app.get("/workers/cache", tags=["Workers"])
+async def get_worker_cache_stats():
+    """Get worker cache hit/miss counters and how entries are invalidated"""
+    return {"status": "success", "cache": worker_cache.stats()}
+
+@app.post("/workers/cache/invalidate", tags=["Workers"])
+async def invalidate_worker_cache(workspace_id: str = None):
+    """Drop the cached workers of a workspace (all workspaces if none is given), e.g. after a CSV import"""
+    worker_cache.invalidate(workspace_id)
+    target = f"workspace {workspace_id}" if workspace_id else "all workspaces"
+    return {"status": "success", "message": f"Worker cache of {target} invalidated", "cache": worker_cache.stats()}
+
 @app.post("/workers/upload", tags=["Workers"])
 async def upload_workers_csv(file: UploadFile = File(...)):
     """Upload new workers CSV file"""
@@ -585,34 +979,23 @@ async def upload_workers_csv(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 @app.get("/workers/utilization", tags=["Workers"])
-async def get_worker_utilization():
-    """Get current worker utilization"""
-    if not assignment_engine:
-        raise HTTPException(status_code=503, detail="Assignment engine not available")
-    
-    utilization = {}
-    for worker_name, total_hours in assignment_engine.worker_availability.items():
-        utilization_percent = (total_hours / 160) * 100
-        status = "overloaded" if utilization_percent > 100 else \
-                "high_load" if utilization_percent > 80 else \
-                "normal" if utilization_percent > 50 else "light_load"
-        
-        utilization[worker_name] = {
-            "total_hours": round(total_hours, 2),
-            "utilization_percent": round(utilization_percent, 2),
-            "status": status
-        }
-    
-    return {"worker_utilization": utilization}
+async def get_worker_utilization(workspace_id: str = DEFAULT_WORKSPACE):
+    """Get current worker utilization from the workload ledger"""
+    return {"workspace_id": workspace_id, "worker_utilization": workload_ledger.utilization(workspace_id)}
+
+@app.delete("/workers/bookings/{project_id}", tags=["Workers"])
+async def release_project_booking(project_id: str, workspace_id: str = DEFAULT_WORKSPACE):
+    """Release the hours booked for a project (e.g. when it is deleted)"""
+    workload_ledger.release_project(workspace_id, project_id)
+    return {"status": "success", "message": f"Booking of project {project_id} in workspace {workspace_id} released"}
 
 @app.post("/workers/reset-utilization", tags=["Workers"])
-async def reset_worker_utilization():
-    """Reset worker utilization (clear all assignments)"""
-    if not assignment_engine:
-        raise HTTPException(status_code=503, detail="Assignment engine not available")
-    
-    assignment_engine.worker_availability.clear()
-    return {"status": "success", "message": "Worker utilization reset successfully"}
+async def reset_worker_utilization(workspace_id: str = DEFAULT_WORKSPACE):
+    """Reset worker utilization (clear all booked hours of the workspace)"""
+    workload_ledger.reset(workspace_id)
+    if assignment_engine:
+        assignment_engine.worker_availability.clear()
+    return {"status": "success", "message": f"Worker utilization of workspace {workspace_id} reset successfully"}
 
 # Dataset management endpoints
 @app.post("/dataset/upload", tags=["Dataset"])
@@ -676,8 +1059,7 @@ async def predict_batch_tasks(tasks: List[str]):
     
     try:
         predictions = []
-        for i, task_text in enumerate(tasks):
-            pred = ml_predictor.predict(task_text)
+        for i, (task_text, pred) in enumerate(zip(tasks, ml_predictor.predict_many(tasks))):
             predictions.append({
                 "index": i,
                 "task": task_text,
@@ -692,10 +1074,13 @@ async def predict_batch_tasks(tasks: List[str]):
 
 # Formula Y specific endpoints
 @app.post("/formula-y/assign", tags=["Formula Y"])
-async def formula_y_assignment(tasks: List[TaskInfo], max_workers_per_task: int = 3):
-    """Run Formula Y assignment algorithm on provided tasks"""
+async def formula_y_assignment(tasks: List[TaskInfo], max_workers_per_task: int = 3,
+                               assignment_mode: Optional[str] = None, workspace_id: str = DEFAULT_WORKSPACE,
+                               project_id: Optional[str] = None):
+    """Run Formula Y assignment algorithm on provided tasks (greedy, global or auto mode), booking the hours"""
     if not assignment_engine:
         raise HTTPException(status_code=503, detail="Assignment engine not available")
+    assignment_mode = resolve_assignment_mode(assignment_mode)
     
     try:
         # Convert TaskInfo to dict format expected by assignment engine
@@ -704,19 +1089,93 @@ async def formula_y_assignment(tasks: List[TaskInfo], max_workers_per_task: int
         # Calculate estimated times if not provided
         tasks_data = calculate_task_times(tasks_data)
         
-        # Run Formula Y assignment
-        assignments = assignment_engine.assign_tasks(tasks_data, max_workers_per_task)
+        # Run Formula Y assignment in a worker thread, on this request's own engine
+        engine = assignment_engine.copy()
+        assignments = await run_in_threadpool(assign_with_ledger, engine, workspace_id, tasks_data,
+                                              max_workers_per_task, assignment_mode, project_id)
         
         return {
             "assignments": assignments,
             "total_tasks": len(assignments),
-            "worker_utilization": assignment_engine.worker_availability
+            "worker_utilization": engine.worker_availability,
+            "assignment_stats": engine.last_assignment_stats
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Formula Y assignment error: {e}")
         raise HTTPException(status_code=500, detail=f"Assignment failed: {str(e)}")
 
+@app.post("/formula-y/reassign", tags=["Formula Y"])
+async def formula_y_reassign(request: ReassignRequest):
+    """Update a previous assignment after tasks or workers changed, re-assigning only the affected tasks"""
+    if not assignment_engine:
+        raise HTTPException(status_code=503, detail="Assignment engine not available")
+    
+    try:
+        added_tasks = [task.dict() for task in request.added_tasks]
+        if any(task.get("estimated_time") is None for task in added_tasks):
+            added_tasks = calculate_task_times(added_tasks)
+        
+        delta = {
+            "added_tasks": added_tasks,
+            "changed_tasks": [change.dict() for change in request.changed_tasks],
+            "removed_tasks": request.removed_tasks,
+            "added_workers": [worker.to_worker() for worker in request.added_workers],
+            "changed_workers": [worker.to_worker() for worker in request.changed_workers],
+            "removed_workers": request.removed_workers
+        }
+        previous_assignments = [assignment.dict() for assignment in request.previous_assignments]
+        # Plans around the workspace's other bookings and books the change
+        assignments, engine = await run_in_threadpool(reassign_with_ledger, assignment_engine, request.workspace_id,
+                                                      previous_assignments, delta, request.max_workers_per_task,
+                                                      request.project_id)
+        
+        return {
+            "assignments": assignments,
+            "total_tasks": len(assignments),
+            "worker_utilization": engine.worker_availability,
+            "assignment_stats": engine.last_assignment_stats
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Formula Y reassignment error: {e}")
+        raise HTTPException(status_code=500, detail=f"Reassignment failed: {str(e)}")
+
+@app.post("/formula-y/batch", tags=["Formula Y"])
+async def formula_y_batch(request: BatchAssignmentRequest):
+    """
+    Assign the projects of many workspaces in a process pool
+    
+    Streams one NDJSON line per job as workspaces complete.
+    """
+    assignment_mode = resolve_assignment_mode(request.assignment_mode)
+    processes = request.processes or BATCH_PROCESSES
+    if processes < 1:
+        raise HTTPException(status_code=400, detail="processes must be at least 1")
+    
+    jobs = []
+    for job in request.jobs:
+        jobs.append({
+            "workspace_id": job.workspace_id,
+            "job_id": job.job_id,
+            "tasks": [task.dict() for task in job.tasks],
+            "max_workers_per_task": job.max_workers_per_task,
+            "workers": [worker.to_worker() for worker in job.workers] if job.workers is not None else None
+        })
+    logger.info(f"Batch assignment: {len(jobs)} jobs, {processes} processes, {assignment_mode} mode")
+    
+    def stream():
+        for result in run_batch(jobs, processes, assignment_mode, ASSIGNMENT_TIME_LIMIT):
+            yield to_ndjson(result)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 # Documentation endpoints
 @app.get("/", tags=["Documentation"])
 async def root():
@@ -0,0 +1,192 @@
+"""
+Parallel multi-workspace Formula Y assignment
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Nightly re-planning assigns the projects of many workspaces. Each job is a
+(workspace_id, tasks) pair; jobs are grouped by workspace and the groups
+are spread over a process pool:
+
+    - a workspace's workers are loaded from the database and parsed into a
+      worker table once, then every project of the workspace is assigned
+      with a fresh workload
+    - the pool uses spawn workers whose BLAS/OpenMP thread pools are capped
+      at one thread, so N processes keep N cores busy without
+      oversubscription
+    - results are yielded per workspace as soon as it finishes, so callers
+      (the NDJSON endpoint, the CLI) can stream them
+
+Jobs may carry their own `workers` list instead of reading the database.
+
+Usage:
+    python batch_assignment.py --jobs jobs.json [--processes 8] [--mode auto] [--output results.ndjson]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from training_worker import THREAD_ENV_VARS
+
+BATCH_PROCESSES = int(os.getenv("BATCH_PROCESSES", os.cpu_count() or 1))
+BATCH_THREADS = 1
+
+
+def _limit_threads(threads):
+    """Pool initializer: runs before the job function imports NumPy"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+
+def _assign_workspace(workspace_id, jobs, mode, time_limit):
+    """Assign every job of one workspace; runs inside a pool process"""
+    # Imported here so the thread limits apply to NumPy
+    from database import db_connection
+    from model import FormulaYAssignmentEngine, calculate_task_times
+
+    start = time.perf_counter()
+    results = []
+    workspace_engine = None
+    workspace_workers = None
+
+    for job in jobs:
+        job_start = time.perf_counter()
+        result = {"index": job["index"], "job_id": job.get("job_id"), "workspace_id": workspace_id}
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if job.get("workers") is not None:
+                    workers = job["workers"]
+                    engine = FormulaYAssignmentEngine()
+                    engine.set_workers(workers)
+                else:
+                    if workspace_engine is None:
+                        # Loaded and parsed once per workspace
+                        workspace_workers = db_connection.get_csv_workers_dataframe(workspace_id)
+                        workspace_engine = FormulaYAssignmentEngine()
+                        workspace_engine.set_workers(workspace_workers)
+                    engine, workers = workspace_engine, workspace_workers
+
+                if len(engine.worker_table) == 0:
+                    raise ValueError(f"No CSV workers found for workspace {workspace_id}")
+
+                tasks = [dict(task) for task in job["tasks"]]
+                if any(task.get("estimated_time") is None for task in tasks):
+                    tasks = calculate_task_times(tasks, workspace_id, workers_df=_workers_frame(workers))
+
+                engine.worker_availability = {}
+                assignments = engine.assign_tasks(tasks, job.get("max_workers_per_task", 3),
+                                                  mode=job.get("mode", mode), time_limit=time_limit)
+
+            result.update(
+                status="completed",
+                workers=len(engine.worker_table),
+                assignments=assignments,
+                worker_utilization=dict(engine.worker_availability),
+                assignment_stats=engine.last_assignment_stats
+            )
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+        result["seconds"] = round(time.perf_counter() - job_start, 3)
+        results.append(result)
+
+    return {"workspace_id": workspace_id, "pid": os.getpid(), "seconds": round(time.perf_counter() - start, 3),
+            "results": results}
+
+
+def _workers_frame(workers):
+    import pandas as pd
+    return workers if isinstance(workers, pd.DataFrame) else pd.DataFrame(workers)
+
+
+def group_jobs(jobs):
+    """Jobs per workspace, in first-seen order; every job gets its input index"""
+    groups = OrderedDict()
+    for index, job in enumerate(jobs):
+        groups.setdefault(job["workspace_id"], []).append({**job, "index": index})
+    return groups
+
+
+def run_batch(jobs, processes=BATCH_PROCESSES, mode="greedy", time_limit=5.0):
+    """
+    Assign many (workspace_id, tasks) jobs in parallel
+
+    Args:
+        jobs: Dicts with workspace_id, tasks and optionally job_id,
+            max_workers_per_task, mode and workers
+        processes: Pool size (1 runs in this process)
+        mode: Assignment mode for jobs that don't set one
+        time_limit: Seconds the global solver may take per job
+
+    Yields:
+        One result dict per job, as workspaces complete
+    """
+    groups = group_jobs(jobs)
+    if processes <= 1 or len(groups) <= 1:
+        for workspace_id, workspace_jobs in groups.items():
+            yield from _assign_workspace(workspace_id, workspace_jobs, mode, time_limit)["results"]
+        return
+
+    # Spawned workers don't inherit the parent's database connection or thread pools
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(processes, len(groups)), mp_context=context,
+                             initializer=_limit_threads, initargs=(BATCH_THREADS,)) as pool:
+        futures = {pool.submit(_assign_workspace, workspace_id, workspace_jobs, mode, time_limit): workspace_jobs
+                   for workspace_id, workspace_jobs in groups.items()}
+        for future in as_completed(futures):
+            try:
+                yield from future.result()["results"]
+            except Exception as e:
+                for job in futures[future]:
+                    yield {"index": job["index"], "job_id": job.get("job_id"), "workspace_id": job["workspace_id"],
+                           "status": "failed", "error": str(e)}
+
+
+def to_ndjson(result):
+    """One NDJSON line; NumPy scalars are written as plain numbers"""
+    return json.dumps(result, default=lambda value: value.item() if hasattr(value, "item") else str(value)) + "\n"
+
+
+def _load_jobs(path):
+    with open(path) as f:
+        if path.endswith(".ndjson") or path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data["jobs"] if isinstance(data, dict) else data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign the projects of many workspaces in parallel")
+    parser.add_argument("--jobs", required=True, help="JSON list (or NDJSON) of {workspace_id, tasks} jobs")
+    parser.add_argument("--processes", type=int, default=BATCH_PROCESSES, help="Worker processes")
+    parser.add_argument("--mode", default=os.getenv("ASSIGNMENT_MODE", "greedy"), help="greedy, global or auto")
+    parser.add_argument("--time-limit", type=float, default=float(os.getenv("ASSIGNMENT_TIME_LIMIT", 5)),
+                        help="Seconds the global solver may take per job")
+    parser.add_argument("--output", help="Write NDJSON results here instead of stdout")
+    args = parser.parse_args()
+
+    jobs = _load_jobs(args.jobs)
+    output = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    completed = failed = 0
+    try:
+        for result in run_batch(jobs, args.processes, args.mode, args.time_limit):
+            output.write(to_ndjson(result))
+            output.flush()
+            if result["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+    finally:
+        if args.output:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {completed} jobs assigned, {failed} failed, {len(group_jobs(jobs))} workspaces, "
+          f"{args.processes} processes in {elapsed:.1f} s ({completed / max(elapsed, 1e-9):.1f} jobs/s)",
+          file=sys.stderr)
@@ -0,0 +1,448 @@
+"""
+Benchmark suite for the task predictor
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Measures the ML path of TaskPredictorTextOnly:
+
+    - cold load time of load_models (bundle and pickles), each in a fresh process
+    - single predict latency p50/p95/p99 (uncached)
+    - batch throughput at several batch sizes
+    - training wall-clock and peak memory on the dataset and row subsets
+    - Formula Y assignment time on synthetic workers x tasks (1k x 1k), with
+      the matrix scores checked against the per-worker scoring methods
+
+Load and training runs happen in freshly spawned processes so import caches
+and memory high-water marks of earlier runs do not leak into them.
+
+Results are written as JSON and can be compared against a stored baseline;
+the exit code is 1 when any metric is worse than the baseline by more than
+the threshold, so the suite can gate changes to the ML path.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BASELINE_FILE = "benchmark_baseline.json"
+BATCH_SIZES = [1, 10, 100, 1000]
+TRAIN_FRACTIONS = [0.25, 0.5, 1.0]
+ASSIGNMENT_SIZE = (1000, 1000)  # workers, tasks
+
+# Metrics compared to the baseline: timings, throughput and memory. Counts and
+# correctness fields (assigned, workers, max_score_difference, ...) are not
+GATED_SUFFIXES = ("_ms", "_per_second")
+GATED_NAMES = ("seconds", "ms_per_batch", "peak_rss_mb")
+# Metrics where a larger value is better; every other gated metric is a time or a size
+HIGHER_IS_BETTER = ("_per_second",)
+# Largest accepted difference between the S/C matrices and the per-worker methods
+SCORE_TOLERANCE = 1e-9
+
+
+def _percentiles(samples_ms):
+    return {
+        "p50_ms": round(float(np.percentile(samples_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples_ms, 99)), 4),
+        "mean_ms": round(float(np.mean(samples_ms)), 4)
+    }
+
+
+def _load_worker(backend, model_dir, use_bundle):
+    """Time imports and load_models in a fresh process"""
+    start = time.perf_counter()
+    from ml import TaskPredictorTextOnly, peak_rss_mb
+    import_seconds = time.perf_counter() - start
+
+    predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+    start = time.perf_counter()
+    predictor.load_models(model_dir, use_bundle=use_bundle)
+    load_seconds = time.perf_counter() - start
+    return {
+        "import_ms": import_seconds * 1000,
+        "load_ms": load_seconds * 1000,
+        "model_format": predictor.model_format,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def _train_worker(backend, csv_path, n_jobs):
+    """Time one training run in a fresh process"""
+    from ml import TaskPredictorTextOnly, peak_rss_mb
+
+    predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+    start = time.perf_counter()
+    predictor.train(csv_path, n_jobs=n_jobs)
+    return {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(include_children=True),
+        "metrics": predictor.metrics
+    }
+
+
+def _send_result(connection, function, args):
+    try:
+        connection.send(("ok", function(*args)))
+    except Exception as e:
+        connection.send(("error", repr(e)))
+    finally:
+        connection.close()
+
+
+def _in_fresh_process(function, *args):
+    """Run function(*args) in a newly spawned (non-daemon, so joblib can use workers) process"""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_send_result, args=(sender, function, args))
+    process.start()
+    sender.close()
+    try:
+        outcome, value = receiver.recv()
+    except EOFError:
+        outcome, value = "error", f"process exited with code {process.exitcode}"
+    process.join()
+    if outcome != "ok":
+        raise RuntimeError(f"Benchmark run {function.__name__} failed: {value}")
+    return value
+
+
+def benchmark_load(backend="svr", model_dir="models", repeats=5):
+    """Cold load_models time for each available model format"""
+    from ml import TaskPredictorTextOnly, BUNDLE_FILE
+
+    formats = {"pickle": False}
+    bundle_dir = TaskPredictorTextOnly(backend=backend, use_cache=False)._backend_dir(model_dir)
+    if os.path.exists(os.path.join(bundle_dir, BUNDLE_FILE)):
+        formats["bundle"] = True
+
+    results = {}
+    for name, use_bundle in formats.items():
+        runs = [_in_fresh_process(_load_worker, backend, model_dir, use_bundle) for _ in range(repeats)]
+        if any(run["model_format"] != name for run in runs):
+            print(f"⚠️  {name} load fell back to {runs[0]['model_format']}, skipping")
+            continue
+        results[name] = {
+            "load_ms": round(float(np.median([run["load_ms"] for run in runs])), 3),
+            "import_ms": round(float(np.median([run["import_ms"] for run in runs])), 3),
+            "peak_rss_mb": round(max(run["peak_rss_mb"] or 0 for run in runs), 1)
+        }
+        print(f"   load ({name}): {results[name]['load_ms']:.1f} ms, imports {results[name]['import_ms']:.0f} ms")
+    return results
+
+
+def benchmark_predict(predictor, texts, warmup=20):
+    """Single-text predict latency percentiles (cache disabled)"""
+    for text in texts[:warmup]:
+        predictor.predict(text)
+
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        predictor.predict(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    result = _percentiles(samples)
+    print(f"   predict: p50 {result['p50_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms")
+    return result
+
+
+def benchmark_batches(predictor, texts, batch_sizes=BATCH_SIZES, min_seconds=0.5):
+    """predict_many throughput per batch size"""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = [texts[i % len(texts)] for i in range(batch_size)]
+        predictor.predict_many(batch)
+
+        rows, elapsed, calls = 0, 0.0, 0
+        while elapsed < min_seconds or calls < 3:
+            start = time.perf_counter()
+            predictor.predict_many(batch)
+            elapsed += time.perf_counter() - start
+            rows += batch_size
+            calls += 1
+        results[str(batch_size)] = {
+            "rows_per_second": round(rows / elapsed, 1),
+            "ms_per_batch": round(elapsed / calls * 1000, 4)
+        }
+        print(f"   batch {batch_size:>5}: {results[str(batch_size)]['rows_per_second']:>10.1f} rows/s")
+    return results
+
+
+def benchmark_training(csv_path="big_dataset.csv", backend="svr", fractions=TRAIN_FRACTIONS, n_jobs=-1):
+    """Training wall-clock and peak memory on the dataset and row subsets"""
+    df = pd.read_csv(csv_path, header=0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fraction in fractions:
+            n_rows = max(50, int(len(df) * fraction))
+            if fraction >= 1.0:
+                subset_path = csv_path
+            else:
+                subset_path = os.path.join(tmp_dir, f"subset_{n_rows}.csv")
+                df.sample(n=n_rows, random_state=42).to_csv(subset_path, index=False)
+
+            run = _in_fresh_process(_train_worker, backend, subset_path, n_jobs)
+            results[str(n_rows)] = {
+                "seconds": round(run["seconds"], 3),
+                "peak_rss_mb": round(run["peak_rss_mb"] or 0, 1),
+                "complexity_mae": round(run["metrics"]["complexity"]["mae"], 4)
+            }
+            print(f"   train {n_rows:>6} rows: {run['seconds']:.2f} s, peak RSS {run['peak_rss_mb'] or 0:.0f} MB")
+    return results
+
+
+def _synthetic_assignment_data(role_skill_mapping, n_workers, n_tasks, seed=42):
+    """Workers with colon-separated technologies/experience and tasks with predicted metrics"""
+    rng = np.random.default_rng(seed)
+    roles = sorted(role_skill_mapping)
+    skills = sorted({skill for role_skills in role_skill_mapping.values() for skill in role_skills})
+
+    workers = []
+    for i in range(n_workers):
+        technologies = rng.choice(skills, size=rng.integers(2, 7), replace=False)
+        workers.append({
+            "Name": f"Worker {i}",
+            "Role": str(rng.choice(roles)).title(),
+            "Technologies": ":".join(technologies),
+            "Experience": ":".join(str(rng.integers(1, 7)) for _ in technologies)
+        })
+
+    tasks = [
+        {
+            "task": f"Task {i}",
+            "roles": [str(role).title() for role in rng.choice(roles, size=rng.integers(1, 4), replace=False)],
+            "estimated_time": float(rng.choice([8, 16, 24, 40])),
+            "complexity": float(rng.uniform(1, 10)),
+            "risk": float(rng.uniform(0, 1)),
+            "priority": float(rng.uniform(0, 1))
+        }
+        for i in range(n_tasks)
+    ]
+    return pd.DataFrame(workers), tasks
+
+
+def benchmark_assignment(n_workers=ASSIGNMENT_SIZE[0], n_tasks=ASSIGNMENT_SIZE[1], check_pairs=2000):
+    """
+    Formula Y assignment time, and the per-pair cost of the per-worker scoring methods
+
+    The per-worker methods are what every task x worker pair used to run;
+    their cost on a sample of pairs estimates the old assignment time, and
+    their values are checked against the S and C matrices.
+    """
+    import contextlib
+    import io
+
+    from model import FormulaYAssignmentEngine
+
+    engine = FormulaYAssignmentEngine()
+    workers_df, tasks = _synthetic_assignment_data(engine.role_skill_mapping, n_workers, n_tasks)
+    engine.set_workers(workers_df)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assignments = engine.assign_tasks(tasks)
+    assign_seconds = time.perf_counter() - start
+
+    # Sampled pairs through the per-worker methods, against fresh matrices
+    engine.worker_availability = {}
+    index = engine.skill_index
+    task_roles = [engine._parse_required_roles(task["roles"]) for task in tasks]
+    S = engine._skill_match_matrix(task_roles, index)
+    C = engine._complexity_fit_matrix([task["complexity"] for task in tasks], [task["risk"] for task in tasks],
+                                      engine.worker_table)
+
+    rng = np.random.default_rng(0)
+    pairs = list(zip(rng.integers(0, n_tasks, check_pairs), rng.integers(0, n_workers, check_pairs)))
+    max_difference = 0.0
+    start = time.perf_counter()
+    for task_idx, worker_idx in pairs:
+        task = tasks[task_idx]
+        skill_score = engine._calculate_skill_match_score(worker_idx, task_roles[task_idx])
+        engine._calculate_workload_factor(worker_idx, task["estimated_time"])
+        complexity_fit = engine._calculate_complexity_fit_factor(worker_idx, task["complexity"], task["risk"])
+        max_difference = max(max_difference, abs(skill_score - S[task_idx, worker_idx]),
+                             abs(complexity_fit - C[task_idx, worker_idx]))
+    per_pair_seconds = (time.perf_counter() - start) / check_pairs
+
+    results = {
+        "workers": n_workers,
+        "tasks": n_tasks,
+        "seconds": round(assign_seconds, 3),
+        "tasks_per_second": round(n_tasks / assign_seconds, 1),
+        "assigned": sum(len(assignment["assigned_workers"]) for assignment in assignments),
+        "per_worker_methods_estimate_seconds": round(per_pair_seconds * n_workers * n_tasks, 1),
+        "max_score_difference": max_difference
+    }
+    print(f"   assignment {n_workers}x{n_tasks}: {assign_seconds:.2f} s "
+          f"(per-worker scoring would take ~{results['per_worker_methods_estimate_seconds']:.0f} s), "
+          f"max score difference {max_difference:.1e}")
+    return results
+
+
+def run_benchmarks(csv_path="big_dataset.csv", backend="svr", model_dir="models", samples=500,
+                   load_repeats=5, train=True, train_fractions=TRAIN_FRACTIONS, assignment_size=ASSIGNMENT_SIZE):
+    """Run the whole suite and return the results dict"""
+    from ml import TaskPredictorTextOnly, peak_rss_mb
+
+    import sklearn
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "backend": backend,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        }
+    }
+
+    print(f"⏱️  Benchmarking {backend} predictor")
+    results["load"] = benchmark_load(backend, model_dir, load_repeats)
+
+    predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+    predictor.load_models(model_dir)
+    results["meta"]["model_format"] = predictor.model_format
+
+    # Realistic inputs: the task texts the models were trained on, in random order
+    combined_text, _, _, _ = predictor.load_training_data(csv_path)
+    rng = np.random.default_rng(42)
+    texts = list(rng.choice(combined_text.values, size=min(samples, len(combined_text)), replace=False))
+
+    results["predict"] = benchmark_predict(predictor, texts)
+    results["batch"] = benchmark_batches(predictor, texts)
+    results["predict"]["peak_rss_mb"] = round(peak_rss_mb() or 0, 1)
+
+    if train:
+        results["train"] = benchmark_training(csv_path, backend, train_fractions)
+    if assignment_size:
+        results["assignment"] = benchmark_assignment(*assignment_size)
+    return results
+
+
+def flatten_metrics(results):
+    """Comparable metrics as {dotted.name: value}, without the metadata"""
+    flat = {}
+
+    def visit(prefix, value):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                visit(f"{prefix}.{key}" if prefix else key, child)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = float(value)
+
+    visit("", {key: value for key, value in results.items() if key != "meta"})
+    return flat
+
+
+def is_gated(metric):
+    """Whether a dotted metric name is a timing, throughput or memory field"""
+    name = metric.rsplit(".", 1)[-1]
+    return name in GATED_NAMES or name.endswith(GATED_SUFFIXES)
+
+
+def compare_to_baseline(results, baseline, threshold=0.25, score_tolerance=SCORE_TOLERANCE):
+    """
+    Compare results to a baseline
+
+    Timing, throughput and memory metrics regress when they moved by more than
+    threshold in the wrong direction. max_score_difference regresses when it
+    exceeds score_tolerance, whatever the baseline.
+
+    Returns:
+        List of (metric, baseline value, current value, relative change, regressed)
+    """
+    current = flatten_metrics(results)
+    reference = flatten_metrics(baseline)
+    comparison = []
+    for metric in sorted(current):
+        if metric.endswith("max_score_difference"):
+            baseline_value = reference.get(metric, 0.0)
+            change = (current[metric] - baseline_value) / baseline_value if baseline_value else float("nan")
+            comparison.append((metric, baseline_value, current[metric], change, current[metric] > score_tolerance))
+            continue
+        if metric not in reference or reference[metric] == 0 or not is_gated(metric):
+            continue
+        change = (current[metric] - reference[metric]) / reference[metric]
+        if metric.endswith(HIGHER_IS_BETTER):
+            regressed = change < -threshold
+        else:
+            regressed = change > threshold
+        comparison.append((metric, reference[metric], current[metric], change, regressed))
+    return comparison
+
+
+def print_comparison(comparison, threshold):
+    print("\n" + "=" * 90)
+    print(f"BASELINE COMPARISON (threshold {threshold:.0%})")
+    print("=" * 90)
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for metric, reference, current, change, regressed in comparison:
+        flag = "  ❌ REGRESSION" if regressed else ""
+        if metric.endswith("max_score_difference"):
+            print(f"{metric:<40} {reference:>12.1e} {current:>12.1e} {'':>9}{flag}")
+        else:
+            print(f"{metric:<40} {reference:>12.3f} {current:>12.3f} {change:>+8.1%}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TaskPredictorTextOnly load, predict and training")
+    parser.add_argument("--csv", default="big_dataset.csv", help="Path to training dataset")
+    parser.add_argument("--backend", default="svr", help="Model backend to benchmark")
+    parser.add_argument("--model-dir", default="models", help="Models directory")
+    parser.add_argument("--samples", type=int, default=500, help="Texts used for latency percentiles")
+    parser.add_argument("--load-repeats", type=int, default=5, help="Fresh-process load runs per format")
+    parser.add_argument("--no-train", action="store_true", help="Skip the training benchmarks")
+    parser.add_argument("--no-assignment", action="store_true", help="Skip the Formula Y assignment benchmark")
+    parser.add_argument("--quick", action="store_true",
+                        help="Fewer samples, a single training subset and a 200x200 assignment")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON and exit 1 on regression")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Store the results as {BASELINE_FILE}")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--score-tolerance", type=float, default=SCORE_TOLERANCE,
+                        help="Largest accepted max_score_difference of the assignment check")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.samples, args.load_repeats = 200, 2
+    benchmark_results = run_benchmarks(
+        args.csv, args.backend, args.model_dir, samples=args.samples, load_repeats=args.load_repeats,
+        train=not args.no_train, train_fractions=[0.25] if args.quick else TRAIN_FRACTIONS,
+        assignment_size=None if args.no_assignment else (200, 200) if args.quick else ASSIGNMENT_SIZE
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(benchmark_results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(benchmark_results, f, indent=2)
+        print(f"💾 Baseline stored in {BASELINE_FILE}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_results = json.load(f)
+        comparison = compare_to_baseline(benchmark_results, baseline_results, args.threshold,
+                                         args.score_tolerance)
+        print_comparison(comparison, args.threshold)
+        regressions = [row[0] for row in comparison if row[4]]
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
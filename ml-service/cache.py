@@ -0,0 +1,109 @@
+"""
+Bounded in-process cache with LRU eviction and per-entry TTL
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Used by the ML service to avoid recomputing results for repeated inputs.
+Hit/miss/eviction counters are kept so they can be exposed over the API.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+
+    def __init__(self, max_size=10000, ttl_seconds=3600, name="cache"):
+        """
+        Args:
+            max_size: Maximum number of entries (0 disables the cache)
+            ttl_seconds: Entry lifetime in seconds (None or 0 = never expire)
+            name: Name reported in stats
+        """
+        self.name = name
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds if ttl_seconds else None
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting least recently used entries if full"""
+        if self.max_size == 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_counters()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or time.monotonic() < entry[1])
+
+    def stats(self):
+        """Return cache counters as a JSON-serializable dict"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
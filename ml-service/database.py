@@ -13,6 +13,32 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+WORKER_COLUMNS = ["Name", "Role", "Technologies", "Experience"]
+
+def workers_dataframe(workers_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Workers DataFrame of the records returned by get_csv_workers
+    
+    Technologies are split into lists of strings and Experience into lists
+    of integers.
+    """
+    if not workers_data:
+        # Return empty DataFrame with correct columns
+        return pd.DataFrame(columns=WORKER_COLUMNS)
+    
+    # Convert to DataFrame
+    df = pd.DataFrame(workers_data)
+    
+    # Split technologies into lists
+    df["Technologies"] = df["Technologies"].apply(lambda x: x.split(":") if x else [])
+    
+    # Split experience into lists of integers
+    df["Experience"] = df["Experience"].apply(
+        lambda x: [int(exp) for exp in x.split(":")] if x else []
+    )
+    
+    return df
+
 class DatabaseConnection:
     def __init__(self):
         # Get database connection details from environment
@@ -126,26 +152,7 @@ class DatabaseConnection:
         Returns:
             Pandas DataFrame with worker data
         """
-        workers_data = self.get_csv_workers(workspace_id)
-        
-        if not workers_data:
-            # Return empty DataFrame with correct columns
-            return pd.DataFrame(columns=["Name", "Role", "Technologies", "Experience"])
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(workers_data)
-        
-        # Parse technologies and experience columns
-        if not df.empty:
-            # Split technologies into lists
-            df["Technologies"] = df["Technologies"].apply(lambda x: x.split(":") if x else [])
-            
-            # Split experience into lists of integers
-            df["Experience"] = df["Experience"].apply(
-                lambda x: [int(exp) for exp in x.split(":")] if x else []
-            )
-        
-        return df
+        return workers_dataframe(self.get_csv_workers(workspace_id))
 
 # Global database connection instance
 db_connection = DatabaseConnection() 
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Pure-NumPy inference engine for the task prediction models
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Compiles the fitted artifacts of a model bundle into the few arrays that a
+prediction actually needs:
+
+    - a vocabulary dict (term -> feature id) and the word analyzer settings
+    - one fused weight per feature, idf / scaler scale
+    - the support vectors in feature-major layout, their squared norms,
+      the dual coefficients and the intercepts
+
+A prediction is then: tokenize, count vocabulary hits, weight and
+l2-normalize (the norm is taken over the idf-weighted counts, as
+TfidfVectorizer does before StandardScaler divides by the scale), gather
+the support-vector entries of the few non-zero features into one
+np.bincount dot product, and apply the RBF kernel and dual coefficients.
+
+Outputs match TaskPredictorTextOnly.predict up to floating-point summation
+order. Only NumPy and the standard library are imported, so a serving
+process can load a bundle without sklearn or scipy:
+
+    engine = InferenceEngine.from_bundle("models/model.bundle")
+    engine.predict("Develop user authentication system")
+"""
+
+import math
+import re
+
+import numpy as np
+
+from model_bundle import read_bundle, decode_strings
+
+
+class InferenceEngine:
+    """Sparse RBF SVR inference over raw task text, using NumPy only"""
+
+    def __init__(self, vocabulary, idf, scale, support_vectors_t, sv_sq_norms, dual_coef, intercept,
+                 gamma, target_names, target_bounds=None, vectorizer_params=None):
+        """
+        Args:
+            vocabulary: Dict of term -> feature id
+            idf: (n_features,) IDF weights of the vectorizer
+            scale: (n_features,) StandardScaler scale_ (with_mean=False)
+            support_vectors_t: Tuple (data, indices, indptr) of the support
+                vectors in feature-major (CSR of SV^T) layout
+            sv_sq_norms: (n_sv,) squared norms of the support vectors
+            dual_coef: (n_sv, n_targets) dual coefficients
+            intercept: (n_targets,) intercepts
+            gamma: RBF kernel coefficient
+            target_names: Output names, in dual_coef column order
+            target_bounds: Optional dict of target -> (low, high) clip bounds
+            vectorizer_params: TfidfVectorizer settings as stored in a bundle
+        """
+        params = vectorizer_params or {}
+        if params.get("analyzer", "word") != "word":
+            raise ValueError(f"Unsupported analyzer '{params['analyzer']}'")
+        if params.get("strip_accents"):
+            raise ValueError("Vectorizers with strip_accents are not supported")
+        if params.get("norm", "l2") not in ("l2", "l1", None):
+            raise ValueError(f"Unsupported norm '{params['norm']}'")
+
+        self.vocabulary = vocabulary
+        self.lowercase = params.get("lowercase", True)
+        self.token_pattern = re.compile(params.get("token_pattern", r"(?u)\b\w\w+\b"))
+        self.stop_words = frozenset(params.get("stop_words") or ())
+        self.ngram_range = tuple(params.get("ngram_range", (1, 1)))
+        self.binary = params.get("binary", False)
+        self.sublinear_tf = params.get("sublinear_tf", False)
+        self.norm = params.get("norm", "l2")
+
+        use_idf = params.get("use_idf", True)
+        self.idf = np.asarray(idf, dtype=np.float64) if use_idf else np.ones(len(scale))
+        # Fused per-feature weight: x_j = tf_j * idf_j / ||tf * idf|| / scale_j
+        self.weights = self.idf / np.asarray(scale, dtype=np.float64)
+
+        # Plain ndarray views of mapped arrays; memmap indexing goes through slower Python code
+        self.sv_t_data, self.sv_t_indices, self.sv_t_indptr = (np.asarray(array) for array in support_vectors_t)
+        self.sv_sq_norms = np.asarray(sv_sq_norms, dtype=np.float64)
+        self.dual_coef = np.asarray(dual_coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.target_names = list(target_names)
+
+        bounds = target_bounds or {}
+        self._low = np.array([bounds.get(name, (-np.inf, np.inf))[0] for name in self.target_names], dtype=np.float64)
+        self._high = np.array([bounds.get(name, (-np.inf, np.inf))[1] for name in self.target_names], dtype=np.float64)
+
+    @classmethod
+    def from_arrays(cls, arrays, metadata):
+        """Build an engine from the arrays and metadata of a model bundle"""
+        terms = decode_strings(arrays["vocabulary_blob"], arrays["vocabulary_offsets"])
+        return cls(
+            vocabulary={term: index for index, term in enumerate(terms)},
+            idf=arrays["idf"],
+            scale=arrays["scaler_scale"],
+            support_vectors_t=(arrays["sv_t_data"], arrays["sv_t_indices"], arrays["sv_t_indptr"]),
+            sv_sq_norms=arrays["sv_sq_norms"],
+            dual_coef=arrays["dual_coef"],
+            intercept=arrays["intercept"],
+            gamma=metadata["gamma"],
+            target_names=metadata["targets"],
+            target_bounds=metadata.get("target_bounds"),
+            vectorizer_params=metadata.get("vectorizer")
+        )
+
+    @classmethod
+    def from_bundle(cls, path):
+        """Load an engine from a model bundle file, memory-mapping its arrays"""
+        manifest, arrays = read_bundle(path, mmap=True)
+        return cls.from_arrays(arrays, manifest["metadata"])
+
+    @property
+    def n_support(self):
+        return len(self.sv_sq_norms)
+
+    def analyze(self, text):
+        """Terms of a text, as TfidfVectorizer's word analyzer produces them"""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            for start in range(len(tokens) - n + 1):
+                terms.append(" ".join(tokens[start:start + n]))
+        return terms
+
+    def featurize(self, text):
+        """
+        Scaled TF-IDF features of one text
+
+        Returns:
+            Tuple of (sorted feature ids, values)
+        """
+        counts = {}
+        for term in self.analyze(text):
+            feature = self.vocabulary.get(term)
+            if feature is not None:
+                counts[feature] = counts.get(feature, 0) + 1
+
+        features = np.array(sorted(counts), dtype=np.int64)
+        tf = np.array([counts[feature] for feature in features], dtype=np.float64)
+        if self.binary:
+            tf[:] = 1.0
+        elif self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+
+        # The norm is taken before scaling, over the idf-weighted counts
+        weighted = tf * self.idf[features]
+        if self.norm == "l2":
+            norm = math.sqrt(float(weighted @ weighted))
+        elif self.norm == "l1":
+            norm = float(np.abs(weighted).sum())
+        else:
+            norm = 1.0
+        if norm == 0.0:
+            norm = 1.0
+        return features, tf * self.weights[features] / norm
+
+    @staticmethod
+    def _ranges(starts, lengths):
+        """Concatenation of range(start, start + length) for each pair, without a Python loop"""
+        total = int(lengths.sum())
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.repeat(starts, lengths) + (np.arange(total) - offsets)
+
+    def predict_array(self, texts, batch_size=1024):
+        """
+        Predict all targets for a list of texts
+
+        Returns:
+            (n_texts, n_targets) array, clipped to the target bounds
+        """
+        predictions = np.empty((len(texts), len(self.intercept)))
+        for batch_start in range(0, len(texts), batch_size):
+            batch = texts[batch_start:batch_start + batch_size]
+            featurized = [self.featurize(text) for text in batch]
+            rows = np.repeat(np.arange(len(batch)), [len(features) for features, _ in featurized])
+            features = np.concatenate([features for features, _ in featurized])
+            values = np.concatenate([values for _, values in featurized])
+
+            # Gather the feature-major support-vector entries of every non-zero feature
+            starts = self.sv_t_indptr[features]
+            lengths = self.sv_t_indptr[features + 1] - starts
+            positions = self._ranges(starts, lengths)
+            entry_rows = np.repeat(rows, lengths)
+            weights = self.sv_t_data[positions] * np.repeat(values, lengths)
+
+            # One bincount over (row, support vector) computes every dot product
+            # (it returns integers when there are no entries, e.g. for empty texts)
+            dots = np.bincount(
+                entry_rows * self.n_support + self.sv_t_indices[positions],
+                weights=weights, minlength=len(batch) * self.n_support
+            ).astype(np.float64, copy=False).reshape(len(batch), self.n_support)
+            x_sq_norms = np.bincount(rows, weights=values * values, minlength=len(batch))
+
+            # ||x||^2 + ||sv||^2 - 2 x.sv, then the RBF kernel, all in place
+            kernel = dots
+            kernel *= -2
+            kernel += x_sq_norms[:, None]
+            kernel += self.sv_sq_norms[None, :]
+            np.maximum(kernel, 0, out=kernel)
+            kernel *= -self.gamma
+            np.exp(kernel, out=kernel)
+            predictions[batch_start:batch_start + batch_size] = kernel @ self.dual_coef + self.intercept
+
+        return np.clip(predictions, self._low, self._high)
+
+    def predict_many(self, texts):
+        """Predict a list of texts, returning one dict of target -> value per text"""
+        return [
+            {name: float(value) for name, value in zip(self.target_names, row)}
+            for row in self.predict_array(list(texts))
+        ]
+
+    def predict(self, text):
+        """Predict one text, returning a dict of target -> value"""
+        return self.predict_many([text])[0]
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    bundle_path = os.getenv("ML_MODEL_BUNDLE_PATH", os.path.join("models", "model.bundle"))
+    start = time.perf_counter()
+    engine = InferenceEngine.from_bundle(bundle_path)
+    print(f"⚡ Engine loaded from {bundle_path} in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({engine.n_support} support vectors, {len(engine.vocabulary)} terms)")
+
+    sample_text = " ".join(sys.argv[1:]) or "Develop user authentication system with login and registration"
+    for target, value in engine.predict(sample_text).items():
+        print(f"{target.capitalize()}: {value:.4f}")
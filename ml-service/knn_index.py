@@ -0,0 +1,436 @@
+"""
+Inverted-index nearest-neighbour predictor over historical tasks
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Finds the labeled tasks most similar to a new task (cosine similarity of
+TF-IDF vectors) and estimates complexity, risk, priority and duration as the
+similarity-weighted mean of their labels. The matched tasks are returned
+with the estimate so the numbers can be explained.
+
+The index is term-major (CSR of X^T): for every vocabulary term it holds
+the rows containing it (ascending) and their weights. A query only touches
+the postings of its own few terms, and common terms are mostly skipped with
+MaxScore pruning:
+
+    - query terms are ordered by their largest possible contribution
+      (query weight x the term's largest posting weight)
+    - the "essential" terms with the highest bounds are scored in full
+      until a posting budget is used up
+    - the k best partial matches are scored exactly from a row-major copy
+      of the index, which bounds the k-th best score from below
+    - a row matching none of the essential terms scores at most the summed
+      bounds of the remaining terms, and at most the norm of their part of
+      the query (Cauchy-Schwarz, rows are unit vectors), whichever is
+      smaller; if that is below the bound, only the
+      candidates that can still reach the top k are scored exactly
+    - otherwise the budget grows and the step repeats (at worst, every
+      posting of the query is scored)
+
+The result is exact, and the cost depends on how rare the query's
+distinctive terms are rather than on the number of indexed rows.
+
+Rows can be added without refitting: new rows are vectorized with the
+frozen vocabulary and IDF weights. Their row-major entries and labels are
+appended to buffers that grow by doubling, and their postings go to a tail
+segment of at most TAIL_ROWS rows, re-sorted by term on every add and
+scored exactly (without pruning) next to the search over the postings.
+When the tail is full it is merged into the postings in one O(nnz) pass,
+so an add costs O(nnz of the tail) plus, amortized, one merge per
+TAIL_ROWS rows instead of a merge per add. Terms unseen at build time are
+ignored until the next build.
+"""
+
+import hashlib
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Larger vocabulary than the regression models: rare terms are what make
+# neighbours specific, and they keep posting lists short
+KNN_VECTORIZER_PARAMS = {
+    "ngram_range": (1, 2),
+    "stop_words": "english",
+    "min_df": 1,
+    "sublinear_tf": True
+}
+
+DEFAULT_K = 10
+
+# Postings scored in full before MaxScore pruning is attempted
+POSTING_BUDGET = 2048
+
+# Added rows kept in the tail segment before it is merged into the postings
+TAIL_ROWS = 1024
+
+# Candidate rows above which exact scores are computed by a scipy CSR matrix
+# (slicing rows in C beats gathering their entries with NumPy)
+MANY_ROWS = 256
+
+LABELS = ("complexity", "risk", "priority", "duration")
+
+
+def _ranges(starts, lengths):
+    """Concatenation of range(start, start + length) for each pair"""
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(int(lengths.sum())) - offsets)
+
+
+def _reserve(array, size):
+    """The array, or a copy of it with room for at least size entries (capacity doubles)"""
+    if size <= len(array):
+        return array
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class TaskNeighborIndex:
+    """Similarity-weighted kNN over labeled tasks, backed by an inverted index"""
+
+    def __init__(self, vectorizer, k=DEFAULT_K):
+        """
+        Args:
+            vectorizer: Fitted TfidfVectorizer (l2 norm) defining the term space
+            k: Default number of neighbours per query
+        """
+        self.vectorizer = vectorizer
+        self.k = k
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = vectorizer.idf_.astype(np.float64)
+        n_terms = len(self.idf)
+
+        # Postings of rows [0, n_indexed): rows and weights of term t are [indptr[t], indptr[t + 1])
+        self._indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        self._row_ids = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._term_max = np.zeros(n_terms, dtype=np.float64)  # Largest posting weight per term
+        self._n_indexed = 0
+        # Tail segment: (indptr, rows, weights) postings of rows [n_indexed, n_rows)
+        self._tail = (np.zeros(n_terms + 1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                      np.zeros(0, dtype=np.float32))
+        # Row-major copy (CSR of X) for exact scores of a few candidate rows; buffers
+        # with spare capacity, rows [0, n_rows) are used
+        self._doc_indptr = np.zeros(1, dtype=np.int64)
+        self._doc_terms = np.zeros(0, dtype=np.int32)
+        self._doc_weights = np.zeros(0, dtype=np.float32)
+        self._doc_matrix = None  # scipy view of the used rows, built on demand
+
+        self._n_rows = 0
+        self._labels = {label: np.zeros(0) for label in LABELS}
+        self.tasks = []
+        self.projects = []
+        self.n_added = 0
+        self._build_id = None
+        self._analyzer = None
+
+    @classmethod
+    def build(cls, texts, complexity, risk, priority, duration=None, tasks=None, projects=None,
+              k=DEFAULT_K, vectorizer_params=None):
+        """Fit the term space on the texts and index them"""
+        vectorizer = TfidfVectorizer(**{**KNN_VECTORIZER_PARAMS, **(vectorizer_params or {})})
+        X = vectorizer.fit_transform(texts)
+
+        index = cls(vectorizer, k=k)
+        index._append(X.tocsr(), complexity, risk, priority, duration, tasks, projects)
+        index._merge_tail()
+        index._build_id = hashlib.sha256(X.data.tobytes() + X.indices.tobytes()).hexdigest()[:16]
+        return index
+
+    @property
+    def n_rows(self):
+        return self._n_rows
+
+    @property
+    def complexity(self):
+        return self._labels["complexity"][:self._n_rows]
+
+    @property
+    def risk(self):
+        return self._labels["risk"][:self._n_rows]
+
+    @property
+    def priority(self):
+        return self._labels["priority"][:self._n_rows]
+
+    @property
+    def duration(self):
+        return self._labels["duration"][:self._n_rows]
+
+    @property
+    def version(self):
+        """Changes whenever the indexed rows change"""
+        return f"{self._build_id}+{self.n_added}"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_analyzer"] = None  # Rebuilt from the vectorizer after loading
+        state["_doc_matrix"] = None
+        # Saved without the spare capacity of the buffers
+        n_entries = self._doc_indptr[self._n_rows]
+        state["_doc_indptr"] = self._doc_indptr[:self._n_rows + 1].copy()
+        state["_doc_terms"] = self._doc_terms[:n_entries].copy()
+        state["_doc_weights"] = self._doc_weights[:n_entries].copy()
+        state["_labels"] = {label: values[:self._n_rows].copy() for label, values in self._labels.items()}
+        return state
+
+    def _analyze(self, text):
+        if self._analyzer is None:
+            self._analyzer = self.vectorizer.build_analyzer()
+        return self._analyzer(text)
+
+    def featurize(self, text):
+        """(term ids, l2-normalized TF-IDF weights) of one text, like vectorizer.transform"""
+        counts = {}
+        for term in self._analyze(text):
+            term_id = self.vocabulary.get(term)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+
+        term_ids = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.vectorizer.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+        weights = tf * self.idf[term_ids]
+        norm = np.sqrt(weights @ weights)
+        return term_ids, weights / norm if norm > 0 else weights
+
+    def _append(self, X, complexity, risk, priority, duration=None, tasks=None, projects=None):
+        """Store the rows of a CSR matrix and their labels; their postings go to the tail segment"""
+        n_new = X.shape[0]
+        first_row, n_rows = self._n_rows, self._n_rows + n_new
+        first_entry = self._doc_indptr[first_row]
+        n_entries = first_entry + X.nnz
+
+        self._doc_indptr = _reserve(self._doc_indptr, n_rows + 1)
+        self._doc_terms = _reserve(self._doc_terms, n_entries)
+        self._doc_weights = _reserve(self._doc_weights, n_entries)
+        self._doc_indptr[first_row + 1:n_rows + 1] = X.indptr[1:] + first_entry
+        self._doc_terms[first_entry:n_entries] = X.indices
+        self._doc_weights[first_entry:n_entries] = X.data
+        self._doc_matrix = None
+
+        values = {
+            "complexity": complexity, "risk": risk, "priority": priority,
+            "duration": np.full(n_new, np.nan) if duration is None else duration
+        }
+        for label in LABELS:
+            self._labels[label] = _reserve(self._labels[label], n_rows)
+            self._labels[label][first_row:n_rows] = np.asarray(values[label], dtype=np.float64)
+        self.tasks.extend(tasks if tasks is not None else [""] * n_new)
+        self.projects.extend(projects if projects is not None else [""] * n_new)
+
+        self._n_rows = n_rows
+        self._index_tail()
+
+    def _index_tail(self):
+        """Term-major postings of the rows added since the last merge, from the row-major copy"""
+        first_row, n_rows = self._n_indexed, self._n_rows
+        start, end = self._doc_indptr[first_row], self._doc_indptr[n_rows]
+        terms = self._doc_terms[start:end]
+        rows = np.repeat(np.arange(first_row, n_rows, dtype=np.int32), np.diff(self._doc_indptr[first_row:n_rows + 1]))
+        # Stable, so rows stay ascending within a term
+        order = np.argsort(terms, kind="stable")
+        indptr = np.zeros_like(self._indptr)
+        np.cumsum(np.bincount(terms, minlength=len(self.idf)), out=indptr[1:])
+        self._tail = (indptr, rows[order], self._doc_weights[start:end][order])
+
+    def _merge_tail(self):
+        """Merge the tail segment into the postings in one O(nnz) pass"""
+        tail_indptr, new_rows, new_weights = self._tail
+        new_counts = np.diff(tail_indptr)
+        new_terms = np.repeat(np.arange(len(new_counts)), new_counts)
+
+        old_counts = np.diff(self._indptr)
+        indptr = np.zeros_like(self._indptr)
+        np.cumsum(old_counts + new_counts, out=indptr[1:])
+
+        row_ids = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=np.float32)
+
+        # Existing postings move right by the new entries of the terms before them
+        old_positions = np.arange(len(self._row_ids)) + np.repeat(indptr[:-1] - self._indptr[:-1], old_counts)
+        row_ids[old_positions] = self._row_ids
+        weights[old_positions] = self._weights
+
+        # New entries go to the end of their term's postings
+        new_positions = np.arange(len(new_terms)) + np.repeat(indptr[:-1] + old_counts - tail_indptr[:-1], new_counts)
+        row_ids[new_positions] = new_rows
+        weights[new_positions] = new_weights
+
+        self._indptr, self._row_ids, self._weights = indptr, row_ids, weights
+        np.maximum.at(self._term_max, new_terms, new_weights)
+        self._n_indexed = self._n_rows
+        self._index_tail()
+
+    def add_rows(self, texts, complexity, risk, priority, duration=None, tasks=None, projects=None):
+        """
+        Index new labeled tasks without refitting the term space
+
+        Returns:
+            Number of rows added
+        """
+        texts = list(texts)
+        if not texts:
+            return 0
+        self._append(self.vectorizer.transform(texts).tocsr(), complexity, risk, priority,
+                     duration, list(tasks) if tasks is not None else None,
+                     list(projects) if projects is not None else None)
+        if self._n_rows - self._n_indexed >= TAIL_ROWS:
+            self._merge_tail()
+        self.n_added += len(texts)
+        return len(texts)
+
+    def _accumulate(self, term_ids, values):
+        """Candidate rows and their scores over the full postings of some terms"""
+        starts = self._indptr[term_ids]
+        lengths = self._indptr[term_ids + 1] - starts
+        positions = _ranges(starts, lengths)
+        rows = self._row_ids[positions]
+        contributions = self._weights[positions] * np.repeat(values, lengths)
+
+        # Dense accumulation when the terms touch many rows, sparse otherwise
+        if len(rows) * 8 > self._n_indexed:
+            scores = np.bincount(rows, weights=contributions, minlength=self._n_indexed)
+            candidates = np.flatnonzero(scores)
+            return candidates, scores[candidates]
+        candidates, inverse = np.unique(rows, return_inverse=True)
+        return candidates, np.bincount(inverse, weights=contributions)
+
+    def _score_rows(self, rows, query):
+        """Exact cosine similarity of some rows to a dense query vector"""
+        if len(rows) > MANY_ROWS:
+            if self._doc_matrix is None:
+                n_entries = self._doc_indptr[self._n_rows]
+                self._doc_matrix = csr_matrix(
+                    (self._doc_weights[:n_entries], self._doc_terms[:n_entries], self._doc_indptr[:self._n_rows + 1]),
+                    shape=(self._n_rows, len(self.idf))
+                )
+            return self._doc_matrix[rows] @ query
+        starts = self._doc_indptr[rows]
+        lengths = self._doc_indptr[rows + 1] - starts
+        positions = _ranges(starts, lengths)
+        products = self._doc_weights[positions] * query[self._doc_terms[positions]]
+        return np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=products, minlength=len(rows))
+
+    def _score_tail(self, term_ids, values):
+        """Tail rows matching some terms and their exact scores"""
+        indptr, rows, weights = self._tail
+        starts = indptr[term_ids]
+        lengths = indptr[term_ids + 1] - starts
+        positions = _ranges(starts, lengths)
+        scores = np.bincount(rows[positions] - self._n_indexed, weights=weights[positions] * np.repeat(values, lengths),
+                             minlength=self._n_rows - self._n_indexed)
+        candidates = np.flatnonzero(scores)
+        return candidates + self._n_indexed, scores[candidates]
+
+    def _top_k(self, candidates, scores, k):
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))
+        return candidates[order], scores[order]
+
+    def search(self, text, k=None):
+        """
+        Top-k most similar rows
+
+        Returns:
+            Tuple of (row ids, cosine similarities), most similar first
+        """
+        k = k or self.k
+        term_ids, values = self.featurize(text)
+        if len(term_ids) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        rows, scores = self._search_postings(term_ids, values, k)
+        if self._n_rows > self._n_indexed:
+            # The tail is small: all of its matching rows are scored exactly
+            tail_rows, tail_scores = self._score_tail(term_ids, values)
+            rows, scores = self._top_k(np.concatenate([rows, tail_rows]), np.concatenate([scores, tail_scores]), k)
+        return rows, scores
+
+    def _search_postings(self, term_ids, values, k):
+        """Top-k rows of the postings, with MaxScore pruning"""
+        # Highest possible contribution first
+        bounds = values * self._term_max[term_ids]
+        order = np.argsort(-bounds, kind="stable")
+        term_ids, values, bounds = term_ids[order], values[order], bounds[order]
+        lengths = self._indptr[term_ids + 1] - self._indptr[term_ids]
+        # Bound on what terms i.. can add to a row: their summed bounds, or the norm of that
+        # part of the query (Cauchy-Schwarz, rows are unit vectors), with slack for float32 rounding
+        remaining = np.minimum(np.cumsum(bounds[::-1])[::-1], np.sqrt(np.cumsum((values ** 2)[::-1])[::-1]))
+        remaining = np.append(remaining, 0.0) * (1 + 1e-6) + 1e-9
+
+        budget = POSTING_BUDGET
+        query = None
+        while True:
+            n_essential = max(1, int(np.searchsorted(np.cumsum(lengths), budget, side="right")))
+            if n_essential >= len(term_ids):
+                return self._top_k(*self._accumulate(term_ids, values), k)
+
+            candidates, scores = self._accumulate(term_ids[:n_essential], values[:n_essential])
+            rest = remaining[n_essential]
+            if len(candidates) >= k:
+                if query is None:
+                    query = np.zeros(len(self.idf))
+                    query[term_ids] = values
+                # Exact scores of the k best partial matches bound the k-th best score from below
+                best = np.argpartition(-scores, k - 1)[:k]
+                threshold = self._score_rows(candidates[best], query).min()
+                if rest < threshold:
+                    # Rows outside the candidates, and candidates below threshold - rest, can't reach the top k
+                    candidates = candidates[scores + rest >= threshold]
+                    return self._top_k(candidates, self._score_rows(candidates, query), k)
+            budget *= 4
+
+    def query(self, text, k=None):
+        """
+        Similarity-weighted estimate from the nearest historical tasks
+
+        Returns:
+            Dict with complexity, risk, priority and duration estimates (None
+            when nothing matches) and the matched neighbours
+        """
+        rows, similarities = self.search(text, k)
+        if len(rows) == 0 or similarities.sum() <= 0:
+            return {"complexity": None, "risk": None, "priority": None, "duration": None, "neighbors": []}
+
+        weights = similarities / similarities.sum()
+        durations = self.duration[rows]
+        known = ~np.isnan(durations)
+        duration = (float(similarities[known] @ durations[known] / similarities[known].sum())
+                    if known.any() else None)
+
+        return {
+            "complexity": float(weights @ self.complexity[rows]),
+            "risk": float(weights @ self.risk[rows]),
+            "priority": float(weights @ self.priority[rows]),
+            "duration": duration,
+            "neighbors": [
+                {
+                    "row": int(row),
+                    "task": self.tasks[row],
+                    "project": self.projects[row],
+                    "similarity": round(float(similarity), 4),
+                    "complexity": float(self.complexity[row]),
+                    "risk": float(self.risk[row]),
+                    "duration": None if np.isnan(self.duration[row]) else float(self.duration[row])
+                }
+                for row, similarity in zip(rows, similarities)
+            ]
+        }
+
+    def query_many(self, texts, k=None):
+        return [self.query(text, k) for text in texts]
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        index = joblib.load(path)
+        if not isinstance(index, TaskNeighborIndex):
+            raise ValueError(f"{path} does not contain a TaskNeighborIndex")
+        return index
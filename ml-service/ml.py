@@ -10,20 +10,297 @@ import pandas as pd
 import numpy as np
 import os
 import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.svm import SVR
+from sklearn.linear_model import Ridge, SGDRegressor
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import ast
+import hashlib
+import json
+import pickle
+import re
+import sys
+import tempfile
+import threading
+import time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from multi_output_svr import MultiOutputSVR
+from inference_engine import InferenceEngine
+from knn_index import TaskNeighborIndex, DEFAULT_K
+from cache import LRUTTLCache
+from model_bundle import write_bundle, read_bundle, encode_strings, decode_strings
+
+MODEL_FILES = ["complexity_model.pkl", "risk_model.pkl", "priority_model.pkl", "vectorizer.pkl", "scaler.pkl"]
+BUNDLE_FILE = "model.bundle"
+COMPACT_BUNDLE_FILE = "model.compact.bundle"
+NEIGHBOR_INDEX_FILE = "neighbor_index.pkl"
+
+# TfidfVectorizer settings that affect transform() and are stored in bundles
+VECTORIZER_BUNDLE_PARAMS = [
+    "lowercase", "strip_accents", "token_pattern", "ngram_range", "analyzer",
+    "binary", "norm", "use_idf", "smooth_idf", "sublinear_tf"
+]
+
+# Output bounds applied to every prediction
+TARGET_BOUNDS = {"complexity": (0, 10), "risk": (0, 1), "priority": (0, 1)}
+
+# Shared prediction cache, keyed by (model version, normalized task text)
+prediction_cache = LRUTTLCache(
+    max_size=int(os.getenv("PREDICTION_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", 3600)),
+    name="predictions"
+)
+
+# Model families available for the complexity/risk/priority regressors.
+# "svr" is the original RBF SVR; the others trade a little accuracy for
+# inference cost that doesn't grow with the number of support vectors.
+# "online" uses hashed features and SGD so it can be updated label by label.
+MODEL_BACKENDS = ["svr", "linear", "nystroem", "rff", "online"]
+DEFAULT_BACKEND = "svr"
+
+# Backends that support partial_fit; they use hashed features (no fitted
+# vocabulary, no scaler) so the feature space never changes between updates
+INCREMENTAL_BACKENDS = ["online"]
+HASHED_N_FEATURES = 2 ** 16
+
+# Where predict() gets its numbers: the regression models, or the
+# similarity-weighted labels of the nearest historical tasks
+PREDICTION_SOURCES = ["model", "knn"]
+DURATION_COLUMN = "Estimated Task Duration (hrs)"
+
+RISK_MAP = {"low": 0.0, "medium": 0.5, "high": 1.0}
+
+def risk_to_score(risk):
+    """Map a Low/Medium/High label (or a numeric score) to the 0-1 risk scale"""
+    if isinstance(risk, str):
+        return RISK_MAP.get(risk.lower().strip(), 0.5)
+    return float(risk)
+
+def compute_priority(complexity, risk):
+    """Priority target: weighted combination of risk and complexity"""
+    return 0.6 * risk + 0.4 * (complexity / 10.0)
+
+def _scale_gamma(X):
+    """RBF gamma equivalent to sklearn's gamma='scale' for X"""
+    if hasattr(X, "multiply"):
+        variance = X.multiply(X).mean() - X.mean() ** 2
+    else:
+        variance = X.var()
+    return 1.0 / (X.shape[1] * variance) if variance != 0 else 1.0
+
+# Hyperparameters used unless a tuned config is supplied (see tuning.py)
+DEFAULT_VECTORIZER_PARAMS = {
+    "max_features": 1000,
+    "ngram_range": (1, 2),
+    "stop_words": "english",
+    "min_df": 2
+}
+
+DEFAULT_MODEL_PARAMS = {
+    "svr": {"C": 100, "epsilon": 0.1, "gamma_factor": 1.0},
+    "linear": {"alpha": 1.0},
+    "nystroem": {"alpha": 0.1},
+    "rff": {"alpha": 0.1},
+    "online": {"alpha": 1e-5, "eta0": 0.05}
+}
+
+TUNED_CONFIG_FILE = "tuned_config.json"
+
+# Training rows whose TF-IDF vectors have at least this cosine similarity are
+# collapsed into one sample weighted by its row count (None = keep every row).
+# Identical rows only by default: lower thresholds merge tasks with different
+# labels and are opt-in (--dedup-similarity, see --dedup-report)
+DEFAULT_DEDUP_SIMILARITY = 1.0
+
+def make_model(backend, X_train, params=None):
+    """
+    Create an unfitted regressor for one target
+    
+    Args:
+        backend: One of MODEL_BACKENDS
+        X_train: Training matrix, used to derive the RBF gamma for approximations
+        params: Model hyperparameters, defaults to DEFAULT_MODEL_PARAMS[backend].
+            For RBF models `gamma_factor` scales the gamma='scale' value.
+    """
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}'. Available: {MODEL_BACKENDS}")
+    params = {**DEFAULT_MODEL_PARAMS[backend], **(params or {})}
+    
+    if backend == "svr":
+        gamma_factor = params.get("gamma_factor", 1.0)
+        gamma = 'scale' if gamma_factor == 1.0 else gamma_factor * _scale_gamma(X_train)
+        return SVR(kernel='rbf', C=params["C"], epsilon=params["epsilon"], gamma=gamma)
+    if backend == "linear":
+        return Ridge(alpha=params["alpha"])
+    if backend == "online":
+        return SGDRegressor(
+            loss="squared_error", penalty="l2", alpha=params["alpha"],
+            learning_rate="invscaling", eta0=params["eta0"], random_state=42
+        )
+    if backend == "nystroem":
+        return make_pipeline(
+            Nystroem(kernel='rbf', gamma=_scale_gamma(X_train), n_components=300, random_state=42),
+            Ridge(alpha=params["alpha"])
+        )
+    return make_pipeline(
+        RBFSampler(gamma=_scale_gamma(X_train), n_components=500, random_state=42),
+        Ridge(alpha=params["alpha"])
+    )
+
+def make_vectorizer(backend, params=None):
+    """Create the text vectorizer for a backend (hashed features for incremental backends)"""
+    params = {**DEFAULT_VECTORIZER_PARAMS, **(params or {})}
+    if backend in INCREMENTAL_BACKENDS:
+        return HashingVectorizer(
+            n_features=HASHED_N_FEATURES,
+            ngram_range=params["ngram_range"],
+            stop_words=params["stop_words"],
+            alternate_sign=False,
+            norm="l2"
+        )
+    return TfidfVectorizer(**params)
+
+def load_tuned_config(model_dir):
+    """Load a tuned hyperparameter config saved next to the models, if any"""
+    config_path = os.path.join(model_dir, TUNED_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path) as f:
+        config = json.load(f)
+    # JSON has no tuples
+    config["vectorizer_params"]["ngram_range"] = tuple(config["vectorizer_params"]["ngram_range"])
+    return config
+
+TARGETS = ["complexity", "risk", "priority"]
+
+def peak_rss_mb(include_children=False):
+    """
+    Peak resident set size of this process in MB (None where unavailable)
+    
+    With include_children the largest finished child process (e.g. a joblib
+    worker) counts too.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if include_children:
+        peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _fit_target(backend, target, X_train, y_train, params=None, sample_weight=None):
+    """Fit one target's model; runs in a worker process during training"""
+    start = time.perf_counter()
+    model = make_model(backend, X_train, params)
+    if sample_weight is None:
+        model.fit(X_train, y_train)
+    elif hasattr(model, "steps"):
+        # Pipelines route fit parameters to a step by name
+        model.fit(X_train, y_train, **{f"{model.steps[-1][0]}__sample_weight": sample_weight})
+    else:
+        model.fit(X_train, y_train, sample_weight=sample_weight)
+    return target, model, time.perf_counter() - start
+
+def _group_similar(X, similarity, max_block_elements):
+    """
+    Greedy similarity groups of rows, in row order
+    
+    Returns:
+        Tuple of (group of each row, leader row of each group)
+    """
+    n_rows = X.shape[0]
+    labels = np.full(n_rows, -1, dtype=np.int64)
+    leaders = []
+    block_size = max(1, max_block_elements // max(n_rows, 1))
+    for block_start in range(0, n_rows, block_size):
+        block_end = min(block_start + block_size, n_rows)
+        # Earlier rows are all grouped; the sparse block is thresholded before any row is grouped
+        similar = (X[block_start:block_end] @ X[block_start:].T).tocsr()
+        keep = similar.data >= similarity - 1e-9
+        for row in range(block_start, block_end):
+            if labels[row] >= 0:
+                continue
+            start, end = similar.indptr[row - block_start], similar.indptr[row - block_start + 1]
+            members = similar.indices[start:end][keep[start:end]] + block_start
+            members = members[labels[members] < 0]
+            labels[members] = len(leaders)
+            labels[row] = len(leaders)
+            leaders.append(row)
+    return labels, np.array(leaders, dtype=np.int64)
+
+def collapse_near_duplicates(X, Y, similarity=DEFAULT_DEDUP_SIMILARITY, max_block_elements=1 << 22):
+    """
+    Group rows whose (l2-normalized) feature vectors are near-identical
+    
+    Rows are visited in order; each row not yet grouped starts a group with
+    every later ungrouped row whose cosine similarity to it is at least
+    `similarity` (1.0 = identical rows only). Identical rows are grouped by
+    hashing; below 1.0 the distinct rows are compared in sparse blocks of at
+    most `max_block_elements` similarities, keeping only those above the
+    threshold.
+    
+    Returns:
+        Tuple of (leader row of each group, mean targets per group, group sizes)
+    """
+    X = X.tocsr()
+    n_rows = X.shape[0]
+    first = {}
+    representative = np.array([
+        first.setdefault(X.indices[start:end].tobytes() + X.data[start:end].tobytes(), row)
+        for row, (start, end) in enumerate(zip(X.indptr[:-1], X.indptr[1:]))
+    ], dtype=np.int64)
+    distinct = np.flatnonzero(representative == np.arange(n_rows))
+    
+    if similarity < 1.0:
+        # A row's copies join whichever group its first occurrence joins
+        distinct_labels, leader_positions = _group_similar(X[distinct], similarity, max_block_elements)
+    else:
+        distinct_labels = leader_positions = np.arange(len(distinct))
+    labels = distinct_labels[np.searchsorted(distinct, representative)]
+    
+    counts = np.bincount(labels).astype(np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    Y_mean = np.column_stack([np.bincount(labels, weights=Y[:, column]) / counts for column in range(Y.shape[1])])
+    return distinct[leader_positions], Y_mean, counts
+
+def normalize_task_text(task_text):
+    """Normalize task text for cache lookups (case and whitespace do not change predictions)"""
+    return re.sub(r"\s+", " ", str(task_text)).strip().lower()
 
 class TaskPredictorTextOnly:
-    def __init__(self):
+    def __init__(self, backend=DEFAULT_BACKEND, use_cache=True, prediction_source="model"):
+        if backend not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown model backend '{backend}'. Available: {MODEL_BACKENDS}")
+        if prediction_source not in PREDICTION_SOURCES:
+            raise ValueError(f"Unknown prediction source '{prediction_source}'. Available: {PREDICTION_SOURCES}")
+        self.backend = backend
+        self.prediction_source = prediction_source
         self.complexity_model = None
         self.risk_model = None
         self.priority_model = None
         self.vectorizer = None
         self.scaler = None
+        self.multi_output_model = None
+        self.engine = None  # Pure-NumPy text -> prediction path, built from a bundle
+        self.neighbor_index = None  # Inverted index over labeled historical tasks
+        self.model_version = None  # Content hash of the model artifacts
+        self.model_format = None  # "bundle" or "pickle" once loaded
+        self.metrics = {}  # Held-out MAE/RMSE per target from the last training run
+        self.training_stats = {}  # Rows, samples after deduplication and fit time of the last training run
+        self.n_updates = 0  # Labels applied with partial_fit since the last load/train
+        self.updates_since_checkpoint = 0
+        self.last_checkpoint = time.time()
+        self._base_version = None
+        self._update_lock = threading.Lock()
+        self.cache = prediction_cache if use_cache else None
         self.is_trained = False
     
     def _parse_skill_list(self, skill_str):
@@ -38,8 +315,13 @@ class TaskPredictorTextOnly:
         except:
             return [skill.strip() for skill in str(skill_str).split(',') if skill.strip()]
     
-    def train(self, csv_path="big_dataset.csv"):
-        """Train the models using the dataset"""
+    def load_training_data(self, csv_path="big_dataset.csv"):
+        """
+        Load the dataset and build the combined text feature and targets
+        
+        Returns:
+            Tuple of (combined_text, y_complexity, y_risk, y_priority)
+        """
         print("Loading and preprocessing dataset...")
         
         # Load dataset
@@ -49,19 +331,34 @@ class TaskPredictorTextOnly:
         print(f"Dataset shape: {df.shape}")
         print(f"Columns: {df.columns.tolist()}")
         
+        combined_text, y_complexity, y_risk, y_priority = self._prepare_frame(df)
+        print(f"Sample combined text: {combined_text.iloc[0][:200]}...")
+        
+        return combined_text, y_complexity, y_risk, y_priority
+    
+    def _prepare_frame(self, df, complexity_fill=None):
+        """
+        Build the combined text feature and targets for a dataset (or a chunk of one)
+        
+        Args:
+            df: DataFrame with stripped column names
+            complexity_fill: Value for unparseable complexity scores, defaults
+                to the median of the frame
+        """
         # Clean and prepare data
-        df.dropna(subset=["Complexity Score", "Risk"], inplace=True)
+        df = df.dropna(subset=["Complexity Score", "Risk"])
         
         # Risk mapping
-        risk_map = {"low": 0.0, "medium": 0.5, "high": 1.0}
-        df["risk"] = df["Risk"].str.lower().str.strip().map(risk_map).fillna(0.5)
+        risk = df["Risk"].str.lower().str.strip().map(RISK_MAP).fillna(0.5)
         
         # Convert complexity score
-        df["complexity_score"] = pd.to_numeric(df["Complexity Score"], errors='coerce')
-        df["complexity_score"] = df["complexity_score"].fillna(df["complexity_score"].median())
+        complexity_score = pd.to_numeric(df["Complexity Score"], errors='coerce')
+        if complexity_fill is None:
+            complexity_fill = complexity_score.median()
+        complexity_score = complexity_score.fillna(complexity_fill)
         
         # Compute priority as a weighted combination of risk and complexity
-        df["priority"] = 0.6 * df["risk"] + 0.4 * (df["complexity_score"] / 10.0)
+        priority = compute_priority(complexity_score, risk)
         
         # Prepare text features - combine all available text
         text_features = []
@@ -90,91 +387,301 @@ class TaskPredictorTextOnly:
             text_features.append(rec_skills_text)
         
         combined_text = pd.Series([" ".join(texts) for texts in zip(*text_features)])
-        print(f"Sample combined text: {combined_text.iloc[0][:200]}...")
+        
+        # Targets
+        return combined_text, complexity_score.values, risk.values, priority.values
+    
+    def train(self, csv_path="big_dataset.csv", n_jobs=-1, hyperparams=None, progress=None,
+              dedup_similarity=DEFAULT_DEDUP_SIMILARITY):
+        """
+        Train the models using the dataset
+        
+        Near-duplicate training rows are collapsed into weighted samples with
+        averaged targets before fitting. Only the training split is collapsed;
+        the held-out split is evaluated row by row.
+        
+        Args:
+            csv_path: Path to the training CSV
+            n_jobs: Worker processes used to fit the targets (-1 = all cores)
+            hyperparams: Optional dict with `vectorizer_params` and `model_params`
+                (e.g. a config produced by tuning.py); missing keys use the defaults
+            progress: Optional callback progress(stage, message) called as
+                training moves through loading, vectorizing, deduplicating,
+                fitting and evaluating
+            dedup_similarity: Cosine similarity at which training rows are
+                collapsed (None keeps every row)
+        """
+        progress = progress or (lambda stage, message: None)
+        hyperparams = hyperparams or {}
+        vectorizer_params = {**DEFAULT_VECTORIZER_PARAMS, **hyperparams.get("vectorizer_params", {})}
+        model_params = {**DEFAULT_MODEL_PARAMS[self.backend], **hyperparams.get("model_params", {})}
+        
+        progress("loading", f"Loading {csv_path}")
+        combined_text, y_complexity, y_risk, y_priority = self.load_training_data(csv_path)
         
         # Vectorize text
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),
-            stop_words='english',
-            min_df=2
-        )
+        progress("vectorizing", f"Vectorizing {len(combined_text)} tasks")
+        self.vectorizer = make_vectorizer(self.backend, vectorizer_params)
         
         X_text = self.vectorizer.fit_transform(combined_text)
         
-        # Targets
-        y_complexity = df["complexity_score"].values
-        y_risk = df["risk"].values
-        y_priority = df["priority"].values
-        
         print(f"Feature matrix shape: {X_text.shape}")
         print(f"Target ranges - Complexity: [{y_complexity.min():.2f}, {y_complexity.max():.2f}]")
         print(f"Target ranges - Risk: [{y_risk.min():.2f}, {y_risk.max():.2f}]")
         print(f"Target ranges - Priority: [{y_priority.min():.2f}, {y_priority.max():.2f}]")
         
-        # Scale features
-        self.scaler = StandardScaler(with_mean=False)
-        X_scaled = self.scaler.fit_transform(X_text)
+        # Scale features (hashed features are already l2-normalized and unscaled)
+        if self.backend in INCREMENTAL_BACKENDS:
+            self.scaler = None
+            X_scaled = X_text
+        else:
+            self.scaler = StandardScaler(with_mean=False)
+            X_scaled = self.scaler.fit_transform(X_text)
         
-        # Split data
-        X_train, X_test, y_comp_train, y_comp_test = train_test_split(
-            X_scaled, y_complexity, test_size=0.2, random_state=42
-        )
+        # Split data once; the three targets stay aligned as columns of Y
+        Y = np.column_stack([y_complexity, y_risk, y_priority])
+        train_rows, test_rows = train_test_split(np.arange(len(Y)), test_size=0.2, random_state=42)
+        X_train, X_test, Y_train, Y_test = X_scaled[train_rows], X_scaled[test_rows], Y[train_rows], Y[test_rows]
         
-        _, _, y_risk_train, y_risk_test = train_test_split(
-            X_scaled, y_risk, test_size=0.2, random_state=42
-        )
+        # Collapse near-duplicate training rows (compared on the unscaled, l2-normalized features)
+        sample_weight = None
+        n_train_rows = len(train_rows)
+        if dedup_similarity is not None:
+            progress("deduplicating", f"Collapsing training rows with similarity >= {dedup_similarity}")
+            start = time.perf_counter()
+            leaders, Y_train, sample_weight = collapse_near_duplicates(X_text[train_rows], Y_train, dedup_similarity)
+            X_train = X_train[leaders]
+            print(f"Deduplicated {n_train_rows} training rows into {len(leaders)} weighted samples "
+                  f"({n_train_rows / len(leaders):.2f}x, similarity >= {dedup_similarity}) "
+                  f"in {time.perf_counter() - start:.2f}s")
         
-        _, _, y_prio_train, y_prio_test = train_test_split(
-            X_scaled, y_priority, test_size=0.2, random_state=42
+        # Train the three target models concurrently in a process pool
+        print(f"Training {', '.join(TARGETS)} models ({self.backend}, {model_params}) with n_jobs={n_jobs}...")
+        start = time.perf_counter()
+        progress("fitting", f"Fitting {', '.join(TARGETS)} models")
+        fitted = Parallel(n_jobs=min(n_jobs, len(TARGETS)) if n_jobs > 0 else n_jobs, backend="loky",
+                          return_as="generator")(
+            delayed(_fit_target)(self.backend, target, X_train, Y_train[:, column], model_params, sample_weight)
+            for column, target in enumerate(TARGETS)
         )
+        models = {}
+        for target, model, seconds in fitted:
+            models[target] = model
+            print(f"  {target} model fitted in {seconds:.2f}s")
+            progress("fitting", f"{target} model fitted in {seconds:.2f}s ({len(models)}/{len(TARGETS)})")
+        fit_seconds = time.perf_counter() - start
+        print(f"All models fitted in {fit_seconds:.2f}s wall-clock")
+        self.training_stats = {
+            "train_rows": int(n_train_rows),
+            "train_samples": int(X_train.shape[0]),
+            "compression_ratio": round(n_train_rows / X_train.shape[0], 3),
+            "dedup_similarity": dedup_similarity,
+            "fit_seconds": round(fit_seconds, 3),
+            "support_vectors": sum(len(model.support_) for model in models.values() if hasattr(model, "support_")) or None
+        }
         
-        # Train models
-        print("Training complexity model...")
-        self.complexity_model = SVR(kernel='rbf', C=100, gamma='scale')
-        self.complexity_model.fit(X_train, y_comp_train)
-        
-        print("Training risk model...")
-        self.risk_model = SVR(kernel='rbf', C=100, gamma='scale')
-        self.risk_model.fit(X_train, y_risk_train)
+        progress("evaluating", "Evaluating on the held-out split")
         
-        print("Training priority model...")
-        self.priority_model = SVR(kernel='rbf', C=100, gamma='scale')
-        self.priority_model.fit(X_train, y_prio_train)
+        self.complexity_model = models["complexity"]
+        self.risk_model = models["risk"]
+        self.priority_model = models["priority"]
         
         # Evaluate models
         comp_pred = self.complexity_model.predict(X_test)
         risk_pred = self.risk_model.predict(X_test)
         prio_pred = self.priority_model.predict(X_test)
+        y_comp_test, y_risk_test, y_prio_test = Y_test.T
+        
+        self.metrics = {
+            target: {
+                "mae": float(mean_absolute_error(y_true, y_pred)),
+                "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred)))
+            }
+            for target, y_true, y_pred in [
+                ("complexity", y_comp_test, comp_pred),
+                ("risk", y_risk_test, risk_pred),
+                ("priority", y_prio_test, prio_pred)
+            ]
+        }
         
         print("\nModel Performance:")
-        print(f"Complexity - MAE: {mean_absolute_error(y_comp_test, comp_pred):.4f}, "
-              f"RMSE: {np.sqrt(mean_squared_error(y_comp_test, comp_pred)):.4f}")
-        print(f"Risk - MAE: {mean_absolute_error(y_risk_test, risk_pred):.4f}, "
-              f"RMSE: {np.sqrt(mean_squared_error(y_risk_test, risk_pred)):.4f}")
-        print(f"Priority - MAE: {mean_absolute_error(y_prio_test, prio_pred):.4f}, "
-              f"RMSE: {np.sqrt(mean_squared_error(y_prio_test, prio_pred)):.4f}")
+        for target, scores in self.metrics.items():
+            print(f"{target.capitalize()} - MAE: {scores['mae']:.4f}, RMSE: {scores['rmse']:.4f}")
         
+        self._build_multi_output_model()
+        self._set_version(self._hash_artifacts(
+            pickle.dumps(obj) for obj in self._model_objects()
+        ))
         self.is_trained = True
         print("Training completed successfully!")
     
+    def train_streaming(self, csv_path="big_dataset.csv", chunksize=10000, hyperparams=None,
+                        holdout_every=5, complexity_fill=5.0):
+        """
+        Train out-of-core by streaming the CSV in chunks
+        
+        Memory stays bounded by the chunk size: features are hashed (no
+        vocabulary is built) and each chunk is applied with partial_fit and
+        then dropped. Every holdout_every-th row is held out and scored with
+        the final models in a second streaming pass. Only available for
+        INCREMENTAL_BACKENDS.
+        
+        Args:
+            csv_path: Path to the training CSV
+            chunksize: Rows read per chunk
+            hyperparams: Optional dict with `vectorizer_params` and `model_params`
+            holdout_every: Hold out one row in this many for validation
+            complexity_fill: Value for unparseable complexity scores (the
+                dataset median is not known until the whole file is read)
+        
+        Returns:
+            Dict with rows, rows/s and peak RSS of the run
+        """
+        if self.backend not in INCREMENTAL_BACKENDS:
+            raise ValueError(f"Streaming training needs an incremental backend: {INCREMENTAL_BACKENDS}")
+        
+        hyperparams = hyperparams or {}
+        vectorizer_params = {**DEFAULT_VECTORIZER_PARAMS, **hyperparams.get("vectorizer_params", {})}
+        model_params = {**DEFAULT_MODEL_PARAMS[self.backend], **hyperparams.get("model_params", {})}
+        
+        self.vectorizer = make_vectorizer(self.backend, vectorizer_params)
+        self.scaler = None
+        self.complexity_model, self.risk_model, self.priority_model = (
+            make_model(self.backend, None, model_params) for _ in TARGETS
+        )
+        models = [self.complexity_model, self.risk_model, self.priority_model]
+        rng = np.random.default_rng(42)
+        
+        def chunks():
+            """Yield (is_holdout mask, combined_text, Y) per chunk"""
+            row_offset = 0
+            for df in pd.read_csv(csv_path, header=0, chunksize=chunksize):
+                df.columns = [col.strip() for col in df.columns]
+                # Row positions in the file decide the split, so both passes agree
+                df.index = np.arange(row_offset, row_offset + len(df))
+                row_offset += len(df)
+                df = df.dropna(subset=["Complexity Score", "Risk"])
+                if df.empty:
+                    continue
+                combined_text, y_complexity, y_risk, y_priority = self._prepare_frame(df, complexity_fill)
+                yield (df.index.values % holdout_every == holdout_every - 1,
+                       combined_text.values, np.column_stack([y_complexity, y_risk, y_priority]))
+        
+        print(f"Streaming {csv_path} in chunks of {chunksize} rows ({self.backend}, {model_params})...")
+        start = time.perf_counter()
+        n_train = 0
+        for n_chunk, (holdout, texts, Y) in enumerate(chunks(), start=1):
+            # Shuffle within the chunk; SGD is sensitive to sorted input
+            order = rng.permutation(np.flatnonzero(~holdout))
+            if len(order) == 0:
+                continue
+            X = self.vectorizer.transform(texts[order])
+            for column, model in enumerate(models):
+                model.partial_fit(X, Y[order, column])
+            n_train += len(order)
+            print(f"  chunk {n_chunk}: {n_train} rows trained, "
+                  f"{n_train / (time.perf_counter() - start):.0f} rows/s, peak RSS {peak_rss_mb() or 0:.0f} MB")
+        train_seconds = time.perf_counter() - start
+        
+        if n_train == 0:
+            raise ValueError(f"No training rows found in {csv_path}")
+        
+        # Second pass: score the held-out rows, accumulating errors per chunk
+        abs_errors = np.zeros(len(TARGETS))
+        sq_errors = np.zeros(len(TARGETS))
+        n_holdout = 0
+        for holdout, texts, Y in chunks():
+            if not holdout.any():
+                continue
+            X = self.vectorizer.transform(texts[holdout])
+            predictions = np.column_stack([model.predict(X) for model in models])
+            errors = predictions - Y[holdout]
+            abs_errors += np.abs(errors).sum(axis=0)
+            sq_errors += (errors ** 2).sum(axis=0)
+            n_holdout += int(holdout.sum())
+        total_seconds = time.perf_counter() - start
+        
+        self.metrics = {
+            target: {
+                "mae": float(abs_errors[column] / n_holdout),
+                "rmse": float(np.sqrt(sq_errors[column] / n_holdout))
+            }
+            for column, target in enumerate(TARGETS)
+        } if n_holdout else {}
+        
+        print("\nModel Performance:")
+        for target, scores in self.metrics.items():
+            print(f"{target.capitalize()} - MAE: {scores['mae']:.4f}, RMSE: {scores['rmse']:.4f}")
+        
+        self.multi_output_model = None
+        self.engine = None
+        self._set_version(self._hash_artifacts(
+            pickle.dumps(obj) for obj in self._model_objects()
+        ))
+        self.is_trained = True
+        
+        stats = {
+            "rows_trained": n_train,
+            "rows_holdout": n_holdout,
+            "chunksize": chunksize,
+            "train_seconds": round(train_seconds, 2),
+            "total_seconds": round(total_seconds, 2),
+            "rows_per_second": round(n_train / train_seconds, 1) if train_seconds > 0 else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1) if resource is not None else None
+        }
+        print(f"Streaming training completed: {n_train} rows in {train_seconds:.2f}s "
+              f"({stats['rows_per_second']} rows/s), peak RSS {stats['peak_rss_mb']} MB")
+        return stats
+    
+    def _backend_dir(self, model_dir):
+        """SVR models live directly in model_dir, other backends in a subdirectory"""
+        return model_dir if self.backend == "svr" else os.path.join(model_dir, self.backend)
+    
     def save_models(self, model_dir="models"):
         """Save trained models to directory"""
         if not self.is_trained:
             raise ValueError("Models must be trained before saving")
+        self._require_model_objects("Saving pickles")
         
+        model_dir = self._backend_dir(model_dir)
         os.makedirs(model_dir, exist_ok=True)
         
-        joblib.dump(self.complexity_model, os.path.join(model_dir, "complexity_model.pkl"))
-        joblib.dump(self.risk_model, os.path.join(model_dir, "risk_model.pkl"))
-        joblib.dump(self.priority_model, os.path.join(model_dir, "priority_model.pkl"))
-        joblib.dump(self.vectorizer, os.path.join(model_dir, "vectorizer.pkl"))
-        joblib.dump(self.scaler, os.path.join(model_dir, "scaler.pkl"))
+        # Write each file next to its destination and move it into place, so
+        # a reader or a crash mid-save never leaves a truncated pickle behind
+        for filename, obj in zip(MODEL_FILES, self._model_objects()):
+            fd, tmp_path = tempfile.mkstemp(dir=model_dir, suffix=".pkl.tmp")
+            os.close(fd)
+            joblib.dump(obj, tmp_path)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, os.path.join(model_dir, filename))
+        
+        self._set_version(self._hash_model_dir(model_dir))
+        self.model_format = "pickle"
+        print(f"Models saved to {model_dir}/ (version {self.model_version[:12]})")
         
-        print(f"Models saved to {model_dir}/")
+        # Keep the memory-mapped bundle in sync with the pickles
+        if self.multi_output_model is not None:
+            self.save_bundle(os.path.join(model_dir, BUNDLE_FILE), source_hash=self.model_version,
+                             source_files=self._model_dir_stats(model_dir))
     
-    def load_models(self, model_dir="models"):
-        """Load pre-trained models from directory"""
+    def load_models(self, model_dir="models", use_bundle=True, bundle_file=BUNDLE_FILE):
+        """
+        Load pre-trained models for the selected backend from directory
+        
+        The single-file bundle is preferred when present and built from the
+        pickles next to it; otherwise the legacy joblib pickles are loaded.
+        Pass bundle_file=COMPACT_BUNDLE_FILE to serve the compact export.
+        """
+        model_dir = self._backend_dir(model_dir)
+        bundle_path = os.path.join(model_dir, bundle_file)
+        
+        if use_bundle and os.path.exists(bundle_path):
+            try:
+                self._load_bundle(bundle_path, model_dir)
+                return
+            except Exception as e:
+                print(f"⚠️  Not using {bundle_path}, loading the pickles instead: {e}")
+        
         try:
             self.complexity_model = joblib.load(os.path.join(model_dir, "complexity_model.pkl"))
             self.risk_model = joblib.load(os.path.join(model_dir, "risk_model.pkl"))
@@ -182,58 +689,734 @@ class TaskPredictorTextOnly:
             self.vectorizer = joblib.load(os.path.join(model_dir, "vectorizer.pkl"))
             self.scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
             
+            self._build_multi_output_model()
+            self._set_version(self._hash_model_dir(model_dir))
+            self.model_format = "pickle"
             self.is_trained = True
-            print(f"Models loaded from {model_dir}/")
+            print(f"Models loaded from {model_dir}/ (version {self.model_version[:12]})")
         except Exception as e:
             raise Exception(f"Failed to load models from {model_dir}/: {str(e)}")
     
+    def save_bundle(self, path, source_hash=None, compact=None, source_files=None):
+        """
+        Write the fitted arrays as a single memory-mappable bundle (SVR backend only)
+        
+        Args:
+            path: Bundle file to write
+            source_hash: Content hash of the pickles the models came from, used
+                to detect a bundle that no longer matches the pickles next to it
+            compact: Optional description of a compact export, stored in the metadata
+            source_files: Size and mtime of those pickles (_model_dir_stats), so
+                loading only hashes them when they were touched since
+        """
+        if self.multi_output_model is None:
+            raise ValueError("Only SVR models with shared-kernel inference can be bundled")
+        if self.vectorizer.analyzer != "word" or self.vectorizer.preprocessor or self.vectorizer.tokenizer:
+            raise ValueError("Only vectorizers using the built-in word analyzer can be bundled")
+        
+        terms = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        vocabulary_blob, vocabulary_offsets = encode_strings(terms)
+        
+        vectorizer_params = {param: getattr(self.vectorizer, param) for param in VECTORIZER_BUNDLE_PARAMS}
+        vectorizer_params["ngram_range"] = list(vectorizer_params["ngram_range"])
+        stop_words = self.vectorizer.get_stop_words()
+        vectorizer_params["stop_words"] = sorted(stop_words) if stop_words else None
+        
+        arrays = {
+            "vocabulary_blob": vocabulary_blob,
+            "vocabulary_offsets": vocabulary_offsets,
+            "idf": self.vectorizer.idf_,
+            "scaler_scale": self.scaler.scale_,
+            **self.multi_output_model.to_arrays()
+        }
+        metadata = {
+            "backend": self.backend,
+            "targets": self.multi_output_model.target_names,
+            "gamma": self.multi_output_model.gamma,
+            "target_bounds": TARGET_BOUNDS,
+            "vectorizer": vectorizer_params,
+            "source_hash": source_hash,
+            "source_files": source_files
+        }
+        if compact:
+            metadata["compact"] = compact
+        manifest = write_bundle(path, arrays, metadata)
+        print(f"📦 Model bundle written to {path} (hash {manifest['content_hash'][:12]})")
+        return manifest
+    
+    def _load_bundle(self, path, model_dir=None):
+        """Load models from a bundle, memory-mapping its arrays"""
+        manifest, arrays = read_bundle(path, mmap=True)
+        metadata = manifest["metadata"]
+        if metadata["backend"] != self.backend:
+            raise ValueError(f"Bundle holds '{metadata['backend']}' models, expected '{self.backend}'")
+        
+        # Pickles replaced after the bundle was built take precedence. They are
+        # only hashed when their size or mtime changed since the bundle was built
+        if model_dir and metadata.get("source_hash") and all(
+            os.path.exists(os.path.join(model_dir, filename)) for filename in MODEL_FILES
+        ):
+            if (self._model_dir_stats(model_dir) != metadata.get("source_files")
+                    and self._hash_model_dir(model_dir) != metadata["source_hash"]):
+                raise ValueError("bundle was built from different pickles")
+        
+        terms = decode_strings(arrays["vocabulary_blob"], arrays["vocabulary_offsets"])
+        vectorizer_params = dict(metadata["vectorizer"])
+        vectorizer_params["ngram_range"] = tuple(vectorizer_params["ngram_range"])
+        self.vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)}, **vectorizer_params)
+        self.vectorizer.idf_ = np.asarray(arrays["idf"])
+        
+        self.scaler = StandardScaler(with_mean=False)
+        self.scaler.scale_ = arrays["scaler_scale"]
+        self.scaler.mean_ = None
+        self.scaler.n_features_in_ = len(terms)
+        
+        # The per-target sklearn SVRs are not part of the bundle
+        self.complexity_model = self.risk_model = self.priority_model = None
+        self.multi_output_model = MultiOutputSVR.from_arrays(arrays, metadata["gamma"], metadata["targets"])
+        self.engine = InferenceEngine.from_arrays(arrays, metadata)
+        
+        self._set_version(manifest["content_hash"])
+        self.model_format = "bundle"
+        self.is_trained = True
+        print(f"Models loaded from bundle {path} (version {self.model_version[:12]})")
+    
+    def _set_version(self, version):
+        """Record a new model version and reset the incremental update counters"""
+        self._base_version = version
+        self.model_version = version
+        self.n_updates = 0
+        self.updates_since_checkpoint = 0
+        self.last_checkpoint = time.time()
+    
+    def partial_fit(self, task_texts, complexity, risk):
+        """
+        Update the models in place with newly labeled tasks
+        
+        Only available for INCREMENTAL_BACKENDS. An untrained predictor is
+        initialized on the first call. Priority labels are derived from
+        complexity and risk the same way as in training.
+        
+        Args:
+            task_texts: List of task texts
+            complexity: Actual complexity scores (0-10)
+            risk: Actual risk as 0-1 scores or Low/Medium/High labels
+        
+        Returns:
+            Number of labels applied
+        """
+        if self.backend not in INCREMENTAL_BACKENDS:
+            raise ValueError(f"Backend '{self.backend}' does not support incremental updates")
+        
+        task_texts = list(task_texts)
+        if not task_texts:
+            return 0
+        y_complexity = np.asarray(complexity, dtype=float)
+        y_risk = np.array([risk_to_score(value) for value in risk], dtype=float)
+        y_priority = compute_priority(y_complexity, y_risk)
+        
+        with self._update_lock:
+            if self.vectorizer is None:
+                self.vectorizer = make_vectorizer(self.backend)
+                self.scaler = None
+                self.complexity_model, self.risk_model, self.priority_model = (
+                    make_model(self.backend, None) for _ in TARGETS
+                )
+                self._set_version("incremental")
+            
+            X = self._featurize(task_texts)
+            self.complexity_model.partial_fit(X, y_complexity)
+            self.risk_model.partial_fit(X, y_risk)
+            self.priority_model.partial_fit(X, y_priority)
+            
+            self.n_updates += len(task_texts)
+            self.updates_since_checkpoint += len(task_texts)
+            # New version so cached predictions of the previous weights are not reused
+            self.model_version = f"{self._base_version}+{self.n_updates}"
+            self.is_trained = True
+        
+        return len(task_texts)
+    
+    def checkpoint(self, model_dir="models"):
+        """Save incrementally updated models to disk"""
+        with self._update_lock:
+            n_updates = self.n_updates
+            self.save_models(model_dir)
+        print(f"💾 Checkpointed {self.backend} models after {n_updates} incremental updates")
+    
+    def maybe_checkpoint(self, model_dir="models", every_updates=100, every_seconds=300):
+        """Checkpoint if enough labels or enough time accumulated since the last checkpoint"""
+        if self.updates_since_checkpoint == 0:
+            return False
+        if (self.updates_since_checkpoint >= every_updates
+                or time.time() - self.last_checkpoint >= every_seconds):
+            self.checkpoint(model_dir)
+            return True
+        return False
+
+    def build_neighbor_index(self, csv_path="big_dataset.csv", k=DEFAULT_K):
+        """
+        Index the labeled tasks of a dataset for nearest-neighbour predictions
+    
+        Uses the same combined text as the models; the estimated task duration
+        is indexed as a fourth label when the dataset has it.
+        """
+        df = pd.read_csv(csv_path, header=0)
+        df.columns = [col.strip() for col in df.columns]
+        df = df.dropna(subset=["Complexity Score", "Risk"]).reset_index(drop=True)
+    
+        combined_text, y_complexity, y_risk, y_priority = self._prepare_frame(df)
+        duration = (pd.to_numeric(df[DURATION_COLUMN], errors='coerce').values
+                    if DURATION_COLUMN in df.columns else None)
+        project_column = "Project Title" if "Project Title" in df.columns else "project_title"
+        projects = df[project_column].fillna("").astype(str).tolist() if project_column in df.columns else None
+    
+        start = time.perf_counter()
+        self.neighbor_index = TaskNeighborIndex.build(
+            combined_text.values, y_complexity, y_risk, y_priority, duration=duration,
+            tasks=df["Task"].fillna("").astype(str).tolist() if "Task" in df.columns else None,
+            projects=projects, k=k
+        )
+        print(f"🔎 Neighbour index built over {self.neighbor_index.n_rows} tasks "
+              f"({len(self.neighbor_index.vocabulary)} terms) in {time.perf_counter() - start:.2f}s")
+        return self.neighbor_index
+    
+    def save_neighbor_index(self, model_dir="models"):
+        if self.neighbor_index is None:
+            raise ValueError("No neighbour index to save")
+        os.makedirs(model_dir, exist_ok=True)
+        path = os.path.join(model_dir, NEIGHBOR_INDEX_FILE)
+        self.neighbor_index.save(path)
+        print(f"💾 Neighbour index saved to {path}")
+        return path
+    
+    def load_neighbor_index(self, model_dir="models"):
+        """Load the neighbour index saved in model_dir, if there is one"""
+        path = os.path.join(model_dir, NEIGHBOR_INDEX_FILE)
+        if not os.path.exists(path):
+            return False
+        self.neighbor_index = TaskNeighborIndex.load(path)
+        return True
+    
+    def add_neighbors(self, task_texts, complexity, risk, duration=None):
+        """Add labeled tasks to the neighbour index without rebuilding it"""
+        if self.neighbor_index is None:
+            raise ValueError("Neighbour index must be built or loaded before adding tasks")
+        complexity = np.asarray(complexity, dtype=np.float64)
+        risk = np.array([risk_to_score(value) for value in risk], dtype=np.float64)
+        return self.neighbor_index.add_rows(
+            list(task_texts), complexity, risk, compute_priority(complexity, risk), duration=duration,
+            tasks=list(task_texts)
+        )
+    
+    def predict_neighbors(self, task_text, k=None):
+        """
+        Nearest historical tasks and their similarity-weighted labels
+    
+        Returns:
+            Dict with complexity, risk, priority and duration estimates (None
+            when no indexed task shares a term with the text) and the neighbours
+        """
+        if self.neighbor_index is None:
+            raise ValueError("Neighbour index must be built or loaded before prediction")
+        return self.neighbor_index.query(task_text, k)
+    
+    def _prediction_version(self):
+        """Version of whatever predict() reads from; part of the cache key"""
+        if self.prediction_source == "knn":
+            return f"knn:{self.neighbor_index.version}"
+        return self.model_version
+    
+    def _featurize(self, task_texts):
+        """Vectorize (and scale, if the backend uses a scaler) a list of texts"""
+        X_text = self.vectorizer.transform(task_texts)
+        return self.scaler.transform(X_text) if self.scaler is not None else X_text
+    
+    def _model_objects(self):
+        """Model objects in MODEL_FILES order"""
+        return [self.complexity_model, self.risk_model, self.priority_model, self.vectorizer, self.scaler]
+    
+    @staticmethod
+    def _hash_artifacts(blobs):
+        """SHA-256 over a sequence of artifact byte strings"""
+        digest = hashlib.sha256()
+        for blob in blobs:
+            digest.update(blob)
+        return digest.hexdigest()
+    
+    def _hash_model_dir(self, model_dir):
+        """Content hash of the model files in model_dir"""
+        def read_files():
+            for filename in MODEL_FILES:
+                with open(os.path.join(model_dir, filename), "rb") as f:
+                    yield f.read()
+        return self._hash_artifacts(read_files())
+    
+    @staticmethod
+    def _model_dir_stats(model_dir):
+        """Size and mtime (ns) of every model file in model_dir"""
+        stats = {}
+        for filename in MODEL_FILES:
+            stat = os.stat(os.path.join(model_dir, filename))
+            stats[filename] = [stat.st_size, stat.st_mtime_ns]
+        return stats
+    
+    def _require_model_objects(self, action):
+        """Raise if the per-target models are missing (a bundle doesn't carry them)"""
+        if any(model is None for model in self._model_objects()):
+            raise ValueError(f"{action} needs the per-target models; models loaded from a bundle "
+                             f"don't include them, load the pickles with use_bundle=False")
+    
+    def _build_multi_output_model(self):
+        """Merge the three SVRs into one shared-kernel predictor when possible"""
+        # The engine of a previously loaded bundle no longer matches these models
+        self.engine = None
+        if self.backend != "svr":
+            self.multi_output_model = None
+            return
+        try:
+            self.multi_output_model = MultiOutputSVR.from_svr_models(
+                [self.complexity_model, self.risk_model, self.priority_model],
+                target_names=["complexity", "risk", "priority"]
+            )
+        except (ValueError, AttributeError) as e:
+            print(f"⚠️  Shared-kernel inference unavailable, using separate SVRs: {e}")
+            self.multi_output_model = None
+    
     def predict(self, task_text):
         """Predict complexity, risk, and priority for a given task text"""
-        if not self.is_trained:
+        return self.predict_many([task_text])[0]
+    
+    def predict_many(self, task_texts):
+        """
+        Predict complexity, risk, and priority for a list of task texts
+        
+        All texts are vectorized into a single sparse matrix and each model
+        runs once over it, so the sklearn per-call overhead is paid once per
+        batch instead of once per task. Texts already seen with the current
+        model version are served from the prediction cache.
+        
+        With prediction_source="knn" the numbers come from the neighbour
+        index instead of the regression models.
+        """
+        if self.prediction_source == "knn":
+            if self.neighbor_index is None:
+                raise ValueError("Neighbour index must be built or loaded before prediction")
+        elif not self.is_trained:
             raise ValueError("Models must be trained or loaded before prediction")
         
-        # Vectorize the input text
-        X_text = self.vectorizer.transform([task_text])
-        X_scaled = self.scaler.transform(X_text)
+        task_texts = list(task_texts)
+        if not task_texts:
+            return []
+        
+        if self.cache is None:
+            return self._predict_uncached(task_texts)
+        
+        version = self._prediction_version()
+        keys = [(version, normalize_task_text(text)) for text in task_texts]
+        results = [self.cache.get(key) for key in keys]
+        
+        # Predict each distinct missing text once
+        missing = {}
+        for key, text, result in zip(keys, task_texts, results):
+            if result is None and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            computed = dict(zip(missing, self._predict_uncached(list(missing.values()))))
+            for key, prediction in computed.items():
+                self.cache.put(key, prediction)
+            results = [result if result is not None else computed[key]
+                       for key, result in zip(keys, results)]
+        
+        # Hand out copies so callers can't modify cached entries
+        return [dict(result) for result in results]
+    
+    def _predict_uncached(self, task_texts):
+        """Run the full vectorizer + model path over a list of task texts"""
+        if self.prediction_source == "knn":
+            return self._predict_neighbors_uncached(task_texts)
+        return self._predict_models(task_texts)
+    
+    def _predict_models(self, task_texts):
+        """Predictions of the regression models"""
+        # Bundles compile to the pure-NumPy engine, which skips the sklearn transforms
+        if self.engine is not None:
+            return self.engine.predict_many(task_texts)
+        
+        # Vectorize all input texts at once
+        X_scaled = self._featurize(task_texts)
         
-        # Make predictions
-        complexity = float(self.complexity_model.predict(X_scaled)[0])
-        risk = float(self.risk_model.predict(X_scaled)[0])
-        priority = float(self.priority_model.predict(X_scaled)[0])
+        # Make predictions - one shared kernel evaluation for all three targets
+        if self.multi_output_model is not None:
+            predictions = self.multi_output_model.predict(X_scaled)
+            complexities, risks, priorities = predictions.T
+        else:
+            complexities = self.complexity_model.predict(X_scaled)
+            risks = self.risk_model.predict(X_scaled)
+            priorities = self.priority_model.predict(X_scaled)
         
         # Ensure predictions are within reasonable bounds
-        complexity = max(0, min(10, complexity))  # Assuming 0-10 scale
-        risk = max(0, min(1, risk))  # 0-1 scale
-        priority = max(0, min(1, priority))  # 0-1 scale
-        
-        return {
-            "complexity": complexity,
-            "risk": risk,
-            "priority": priority
-        }
+        complexities = np.clip(complexities, 0, 10)  # Assuming 0-10 scale
+        risks = np.clip(risks, 0, 1)  # 0-1 scale
+        priorities = np.clip(priorities, 0, 1)  # 0-1 scale
+        
+        return [
+            {
+                "complexity": float(complexity),
+                "risk": float(risk),
+                "priority": float(priority)
+            }
+            for complexity, risk, priority in zip(complexities, risks, priorities)
+        ]
+
+    def _predict_neighbors_uncached(self, task_texts):
+        """kNN estimates; texts with no neighbours fall back to the models, or the label means"""
+        index = self.neighbor_index
+        estimates = index.query_many(task_texts)
+        unmatched = [i for i, estimate in enumerate(estimates) if estimate["complexity"] is None]
+        
+        if unmatched and self.is_trained:
+            fallback = self._predict_models([task_texts[i] for i in unmatched])
+        else:
+            means = {"complexity": float(index.complexity.mean()), "risk": float(index.risk.mean()),
+                     "priority": float(index.priority.mean())}
+            fallback = [means] * len(unmatched)
+        
+        results = [{target: estimate[target] for target in TARGETS} for estimate in estimates]
+        for i, prediction in zip(unmatched, fallback):
+            results[i] = dict(prediction)
+        return results
 
 # Training script
-def train_models():
-    """Train and save models"""
-    print("Training TaskPredictorTextOnly models...")
+def train_models(backend=DEFAULT_BACKEND, csv_path="big_dataset.csv", model_dir="models", hyperparams=None,
+                 stream=False, chunksize=10000, n_jobs=-1, progress=None, dedup_similarity=DEFAULT_DEDUP_SIMILARITY):
+    """
+    Train and save models, using the tuned config next to the models if there is one
+    
+    With stream=True the CSV is read in chunks of `chunksize` rows and the
+    (incremental) backend is trained out-of-core. `progress` and
+    `dedup_similarity` are passed on to TaskPredictorTextOnly.train.
+    """
+    print(f"Training TaskPredictorTextOnly models ({backend} backend{', streaming' if stream else ''})...")
     
-    predictor = TaskPredictorTextOnly()
-    predictor.train("big_dataset.csv")
-    predictor.save_models("models")
+    predictor = TaskPredictorTextOnly(backend=backend)
+    if hyperparams is None:
+        hyperparams = load_tuned_config(predictor._backend_dir(model_dir))
+        if hyperparams:
+            print(f"Using tuned hyperparameters from {predictor._backend_dir(model_dir)}/{TUNED_CONFIG_FILE}")
+    if stream:
+        predictor.train_streaming(csv_path, chunksize=chunksize, hyperparams=hyperparams)
+    else:
+        predictor.train(csv_path, n_jobs=n_jobs, hyperparams=hyperparams, progress=progress,
+                        dedup_similarity=dedup_similarity)
+    if progress:
+        progress("saving", f"Saving models to {predictor._backend_dir(model_dir)}/")
+    predictor.save_models(model_dir)
     
     print("Training completed and models saved!")
+    return predictor
+
+def build_neighbor_index(csv_path="big_dataset.csv", model_dir="models", k=DEFAULT_K):
+    """Build the nearest-neighbour index over a dataset and save it next to the models"""
+    predictor = TaskPredictorTextOnly(use_cache=False)
+    predictor.build_neighbor_index(csv_path, k=k)
+    predictor.save_neighbor_index(model_dir)
+    return predictor.neighbor_index
+
+def convert_to_bundle(model_dir="models"):
+    """Convert the legacy SVR pickles in model_dir into a single model bundle"""
+    predictor = TaskPredictorTextOnly(use_cache=False)
+    predictor.load_models(model_dir, use_bundle=False)
+    model_dir = predictor._backend_dir(model_dir)
+    return predictor.save_bundle(os.path.join(model_dir, BUNDLE_FILE), source_hash=predictor.model_version,
+                                 source_files=predictor._model_dir_stats(model_dir))
+
+def _latency_profile(predictor, texts):
+    """Single-prediction p50/p99 (ms) and batch rows/s of an uncached predictor"""
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        predictor.predict_many([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    predictor.predict_many(texts)
+    batch_seconds = time.perf_counter() - start
+    
+    return {
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 4),
+        "batch_rows_per_second": round(len(texts) / batch_seconds, 1)
+    }
+
+def compact_export(model_dir="models", csv_path="big_dataset.csv", tolerance=0.02, merge_radius=0.0,
+                   dtype="float32", keep_fractions=(0.1, 0.2, 0.3, 0.5, 0.75), output=None):
+    """
+    Export a smaller, faster SVR bundle and report what it costs
+    
+    Duplicate support vectors (within merge_radius) are merged, then the
+    smallest reduced support-vector set from keep_fractions whose predictions
+    stay within `tolerance` of the original model is kept, and the arrays
+    are cast to dtype. Tolerance is the mean absolute prediction change on
+    the held-out split, as a fraction of each target's range, for the worst
+    target.
+    
+    Returns:
+        Dict with the size, latency and accuracy of the original and compact models
+    """
+    original = TaskPredictorTextOnly(use_cache=False)
+    original.load_models(model_dir, use_bundle=False)
+    if original.multi_output_model is None:
+        raise ValueError("Compact export needs SVR models with shared-kernel inference")
+    
+    # Same held-out split as training, used to check the tolerance and report accuracy
+    combined_text, y_complexity, y_risk, y_priority = original.load_training_data(csv_path)
+    _, texts_test, _, Y_test = train_test_split(
+        combined_text.values, np.column_stack([y_complexity, y_risk, y_priority]),
+        test_size=0.2, random_state=42
+    )
+    X_test = original._featurize(list(texts_test))
+    ranges = np.array([TARGET_BOUNDS[target][1] - TARGET_BOUNDS[target][0] for target in TARGETS])
+    reference = original.multi_output_model.predict(X_test)
+    
+    def deviation(model):
+        """Worst target's mean absolute change vs the original, relative to its range"""
+        return float((np.abs(model.predict(X_test) - reference).mean(axis=0) / ranges).max())
+    
+    print(f"🗜️  Compacting {original.multi_output_model.n_support} support vectors "
+          f"(tolerance {tolerance:.3f}, merge radius {merge_radius}, {dtype})...")
+    merged = original.multi_output_model.merge_duplicates(merge_radius)
+    print(f"   Merged duplicates: {merged.n_support} support vectors, deviation {deviation(merged):.5f}")
+    
+    compact = merged
+    for fraction in sorted(keep_fractions):
+        candidate = merged.reduce(max(1, int(fraction * merged.n_support)))
+        candidate_deviation = deviation(candidate)
+        print(f"   Reduced set {fraction:.0%}: {candidate.n_support} support vectors, "
+              f"deviation {candidate_deviation:.5f}")
+        if candidate_deviation <= tolerance:
+            compact = candidate
+            break
+    compact = compact.astype(np.dtype(dtype))
+    
+    # Evaluate and save through a predictor that only differs in its shared-kernel model
+    compacted = TaskPredictorTextOnly(use_cache=False)
+    compacted.load_models(model_dir, use_bundle=False)
+    compacted.multi_output_model = compact
+    
+    output = output or os.path.join(model_dir, COMPACT_BUNDLE_FILE)
+    compact_info = {
+        "dtype": np.dtype(dtype).name,
+        "tolerance": tolerance,
+        "merge_radius": merge_radius,
+        "n_support_original": original.multi_output_model.n_support,
+        "n_support": compact.n_support,
+        "deviation": round(deviation(compact), 6)
+    }
+    compacted.save_bundle(output, source_hash=original.model_version, compact=compact_info,
+                          source_files=compacted._model_dir_stats(compacted._backend_dir(model_dir)))
+    
+    rng = np.random.default_rng(42)
+    sample_texts = list(rng.choice(texts_test, size=min(200, len(texts_test)), replace=False))
+    report = {"compact": compact_info}
+    for name, predictor in [("original", original), ("compact", compacted)]:
+        predictions = np.clip(predictor.multi_output_model.predict(X_test),
+                              [TARGET_BOUNDS[target][0] for target in TARGETS],
+                              [TARGET_BOUNDS[target][1] for target in TARGETS])
+        report[name] = {
+            "n_support": predictor.multi_output_model.n_support,
+            "model_arrays_kb": round(predictor.multi_output_model.nbytes / 1024, 1),
+            "mae": {target: round(float(mean_absolute_error(Y_test[:, column], predictions[:, column])), 5)
+                    for column, target in enumerate(TARGETS)},
+            **_latency_profile(predictor, sample_texts)
+        }
+    report["original"]["file_kb"] = round(sum(
+        os.path.getsize(os.path.join(model_dir, filename)) for filename in MODEL_FILES
+    ) / 1024, 1)
+    report["compact"]["file_kb"] = round(os.path.getsize(output) / 1024, 1)
+    
+    print("\n" + "=" * 100)
+    print("COMPACT EXPORT REPORT")
+    print("=" * 100)
+    print(f"{'model':<10} {'SVs':>6} {'arrays KB':>10} {'file KB':>9} {'cplx MAE':>9} {'risk MAE':>9} "
+          f"{'prio MAE':>9} {'p50 ms':>8} {'p99 ms':>8} {'rows/s':>9}")
+    for name in ["original", "compact"]:
+        entry = report[name]
+        print(f"{name:<10} {entry['n_support']:>6} {entry['model_arrays_kb']:>10.1f} {entry['file_kb']:>9.1f} "
+              f"{entry['mae']['complexity']:>9.4f} {entry['mae']['risk']:>9.4f} {entry['mae']['priority']:>9.4f} "
+              f"{entry['latency_ms_p50']:>8.3f} {entry['latency_ms_p99']:>8.3f} {entry['batch_rows_per_second']:>9.1f}")
+    
+    return report
+
+def backend_report(csv_path="big_dataset.csv", backends=None, latency_samples=200):
+    """
+    Compare model backends on accuracy, latency and size
+    
+    Each backend is trained on the same split of the dataset. Latency is
+    measured per single uncached prediction (p50/p99) and as batch
+    throughput over the same sample of task texts.
+    
+    Returns:
+        Dict of backend -> report entry
+    """
+    backends = backends or MODEL_BACKENDS
+    report = {}
+    
+    sample_predictor = TaskPredictorTextOnly(use_cache=False)
+    combined_text, _, _, _ = sample_predictor.load_training_data(csv_path)
+    rng = np.random.default_rng(42)
+    sample_texts = list(rng.choice(combined_text.values, size=min(latency_samples, len(combined_text)), replace=False))
+    
+    for backend in backends:
+        print(f"\n{'=' * 20} Backend: {backend} {'=' * 20}")
+        predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+        
+        start = time.perf_counter()
+        predictor.train(csv_path)
+        train_seconds = time.perf_counter() - start
+        predictor._require_model_objects("The backend report")
+        
+        model_bytes = sum(
+            len(pickle.dumps(model))
+            for model in [predictor.complexity_model, predictor.risk_model, predictor.priority_model]
+        )
+        
+        report[backend] = {
+            "metrics": predictor.metrics,
+            "train_seconds": round(train_seconds, 3),
+            **_latency_profile(predictor, sample_texts),
+            "model_size_kb": round(model_bytes / 1024, 1)
+        }
+    
+    print("\n" + "=" * 100)
+    print("MODEL BACKEND REPORT")
+    print("=" * 100)
+    print(f"{'backend':<10} {'cplx MAE':>9} {'cplx RMSE':>10} {'risk MAE':>9} {'prio MAE':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'rows/s':>9} {'size KB':>9} {'train s':>8}")
+    for backend, entry in report.items():
+        metrics = entry["metrics"]
+        print(f"{backend:<10} {metrics['complexity']['mae']:>9.4f} {metrics['complexity']['rmse']:>10.4f} "
+              f"{metrics['risk']['mae']:>9.4f} {metrics['priority']['mae']:>9.4f} "
+              f"{entry['latency_ms_p50']:>8.3f} {entry['latency_ms_p99']:>8.3f} "
+              f"{entry['batch_rows_per_second']:>9.1f} {entry['model_size_kb']:>9.1f} {entry['train_seconds']:>8.2f}")
+    
+    return report
+
+def dedup_report(csv_path="big_dataset.csv", backend=DEFAULT_BACKEND, similarities=(None, 1.0, 0.9, 0.8, 0.7)):
+    """
+    Compare training with and without near-duplicate collapsing
+    
+    Every run uses the same split; the accuracy delta is the held-out MAE
+    change against training on every row.
+    
+    Returns:
+        List of report entries, one per similarity (None = no deduplication)
+    """
+    report = []
+    for similarity in similarities:
+        print(f"\n{'=' * 20} Dedup similarity: {similarity} {'=' * 20}")
+        predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+        predictor.train(csv_path, dedup_similarity=similarity)
+        report.append({**predictor.training_stats, "metrics": predictor.metrics})
+    
+    baseline = next((entry for entry in report if entry["dedup_similarity"] is None), report[0])
+    print("\n" + "=" * 100)
+    print(f"DEDUPLICATION REPORT ({backend})")
+    print("=" * 100)
+    print(f"{'similarity':>10} {'samples':>8} {'ratio':>7} {'fit s':>7} {'SVs':>6} "
+          f"{'cplx MAE':>9} {'Δ':>8} {'risk MAE':>9} {'Δ':>8} {'prio MAE':>9} {'Δ':>8}")
+    for entry in report:
+        entry["mae_delta"] = {
+            target: round(entry["metrics"][target]["mae"] - baseline["metrics"][target]["mae"], 5)
+            for target in TARGETS
+        }
+        columns = " ".join(
+            f"{entry['metrics'][target]['mae']:>9.4f} {entry['mae_delta'][target]:>+8.4f}" for target in TARGETS
+        )
+        similarity = "off" if entry["dedup_similarity"] is None else entry["dedup_similarity"]
+        support_vectors = entry["support_vectors"] if entry["support_vectors"] is not None else "-"
+        print(f"{similarity:>10} {entry['train_samples']:>8} {entry['compression_ratio']:>6.2f}x "
+              f"{entry['fit_seconds']:>7.2f} {support_vectors:>6} {columns}")
+    
+    return report
 
 if __name__ == "__main__":
-    # Train models if run directly
-    train_models()
-    
-    # Test with sample prediction
-    predictor = TaskPredictorTextOnly()
-    predictor.load_models("models")
-    
-    sample_task = "Develop user authentication system with login and registration"
-    result = predictor.predict(sample_task)
-    print(f"\nSample prediction for: '{sample_task}'")
-    print(f"Complexity: {result['complexity']:.2f}")
-    print(f"Risk: {result['risk']:.2f}")
-    print(f"Priority: {result['priority']:.2f}")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train TaskPredictorTextOnly models")
+    parser.add_argument("--csv", default="big_dataset.csv", help="Path to training dataset")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=MODEL_BACKENDS, help="Model backend to train")
+    parser.add_argument("--report", action="store_true", help="Compare backends instead of training one")
+    parser.add_argument("--backends", nargs="+", choices=MODEL_BACKENDS, help="Backends to include in the report")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--convert", action="store_true", help="Convert the SVR pickles in models/ into a model bundle")
+    parser.add_argument("--compact", action="store_true",
+                        help="Export a float32, support-vector-reduced bundle of the SVR models in models/")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Compact export: allowed mean prediction change as a fraction of each target's range")
+    parser.add_argument("--merge-radius", type=float, default=0.0,
+                        help="Compact export: merge support vectors within this squared distance")
+    parser.add_argument("--stream", action="store_true",
+                        help="Train out-of-core in chunks (online backend; implies --backend online)")
+    parser.add_argument("--chunksize", type=int, default=10000, help="Rows per chunk when streaming")
+    parser.add_argument("--dedup-similarity", type=float, default=DEFAULT_DEDUP_SIMILARITY,
+                        help="Collapse training rows with at least this cosine similarity into weighted samples")
+    parser.add_argument("--no-dedup", action="store_true", help="Train on every row")
+    parser.add_argument("--dedup-report", action="store_true",
+                        help="Compare training time, support vectors and accuracy with and without deduplication")
+    parser.add_argument("--knn", action="store_true",
+                        help="Build the nearest-neighbour index over the dataset instead of training models")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours per kNN prediction")
+    args = parser.parse_args()
+    
+    dedup_similarity = None if args.no_dedup else args.dedup_similarity
+    
+    if args.dedup_report:
+        report = dedup_report(args.csv, args.backend)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport written to {args.output}")
+    elif args.knn:
+        index = build_neighbor_index(args.csv, "models", k=args.k)
+        sample_task = "Develop user authentication system with login and registration"
+        result = index.query(sample_task)
+        print(f"\nNearest tasks for: '{sample_task}'")
+        for neighbor in result["neighbors"][:5]:
+            print(f"  {neighbor['similarity']:.3f}  {neighbor['task']} ({neighbor['project']})")
+        if result["complexity"] is not None:
+            duration = f"{result['duration']:.1f}h" if result["duration"] is not None else "n/a"
+            print(f"Complexity: {result['complexity']:.2f}  Risk: {result['risk']:.2f}  "
+                  f"Priority: {result['priority']:.2f}  Duration: {duration}")
+    elif args.convert:
+        convert_to_bundle("models")
+    elif args.compact:
+        report = compact_export("models", args.csv, tolerance=args.tolerance, merge_radius=args.merge_radius)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport written to {args.output}")
+    elif args.report:
+        report = backend_report(args.csv, args.backends)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport written to {args.output}")
+    else:
+        # Train models if run directly
+        if args.stream and args.backend not in INCREMENTAL_BACKENDS:
+            args.backend = INCREMENTAL_BACKENDS[0]
+        train_models(args.backend, args.csv, stream=args.stream, chunksize=args.chunksize,
+                     dedup_similarity=dedup_similarity)
+        
+        # Test with sample prediction
+        predictor = TaskPredictorTextOnly(backend=args.backend)
+        predictor.load_models("models")
+        
+        sample_task = "Develop user authentication system with login and registration"
+        result = predictor.predict(sample_task)
+        print(f"\nSample prediction for: '{sample_task}'")
+        print(f"Complexity: {result['complexity']:.2f}")
+        print(f"Risk: {result['risk']:.2f}")
+        print(f"Priority: {result['priority']:.2f}")
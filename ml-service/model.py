@@ -5,9 +5,17 @@ import numpy as np
 from typing import List, Dict, Tuple
 from collections import defaultdict
 import re
+import time
 from gemini import suggest_task_details
 from ml import TaskPredictorTextOnly  # ensure your ml.py defines this class
-from database import db_connection
+from skill_index import SkillIndex
+from worker_table import WorkerTable, normalize_text
+from worker_cache import WorkspaceWorkers, worker_cache
+import global_assignment
+from time_estimator import estimate_task_times
+
+ASSIGNMENT_MODES = ["greedy", "global", "auto"]
+GLOBAL_TIME_LIMIT = 5.0  # Seconds the global solver may take
 
 class FormulaYAssignmentEngine:
     """
@@ -22,36 +30,62 @@ class FormulaYAssignmentEngine:
     Final Score: Y = S × W × C
     """
     
-    def __init__(self, workspace_id: str = None):
+    def __init__(self, workspace_id: str = None, workers=None):
         """
         Initialize Formula Y with worker data from database
         
         Args:
             workspace_id: The workspace ID to fetch workers for
+            workers: Workers already loaded for the workspace (anything
+                set_workers accepts); skips the database
         """
         self.workspace_id = workspace_id
-        self.workers_df = pd.DataFrame()
+        self.worker_table = WorkerTable(self._normalize_text)
         self.worker_availability = {}  # Track hours assigned to each worker
         self.role_skill_mapping = self._create_role_skill_mapping()
+        self._skill_index = None
+        self._shared_workers = None  # Cached WorkspaceWorkers the table belongs to
+        self.last_assignment_stats = {}
         
-        if workspace_id:
+        if workers is not None:
+            self.set_workers(workers)
+        elif workspace_id:
             self.load_workers_from_database(workspace_id)
         else:
             print("⚠️  No workspace_id provided. Workers will be loaded when needed.")
     
     def load_workers_from_database(self, workspace_id: str):
         """
-        Load workers from database for a specific workspace
+        Load workers from database for a specific workspace (through the worker cache)
         
         Args:
             workspace_id: The workspace ID to fetch workers for
         """
         try:
-            self.workers_df = db_connection.get_csv_workers_dataframe(workspace_id)
-            print(f"✅ Loaded {len(self.workers_df)} workers from database for workspace {workspace_id}")
+            self.set_workers(worker_cache.get(workspace_id))
+            print(f"✅ Loaded {len(self.worker_table)} workers from database for workspace {workspace_id}")
         except Exception as e:
             print(f"❌ Error loading workers from database: {e}")
-            self.workers_df = pd.DataFrame(columns=["Name", "Role", "Technologies", "Experience"])
+            self.set_workers([])
+    
+    def set_workers(self, workers):
+        """
+        Replace the workers with a DataFrame or a list of dicts
+        (Name, Role, Technologies, Experience), or with cached WorkspaceWorkers
+        
+        Technologies and Experience may be colon strings or lists. Cached
+        workers are shared with other engines; their table is copied before
+        add_worker, update_worker or remove_worker edit it.
+        """
+        self._shared_workers = None
+        if isinstance(workers, WorkspaceWorkers):
+            self.worker_table = workers.table
+            self._shared_workers = workers
+        elif isinstance(workers, pd.DataFrame):
+            self.worker_table = WorkerTable.from_dataframe(workers, self._normalize_text)
+        else:
+            self.worker_table = WorkerTable.from_records(workers, self._normalize_text)
+        self._skill_index = None
         
     def _create_sample_workers_data(self, csv_path):
         """Create sample workers.csv if not found"""
@@ -97,9 +131,7 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
     
     def _normalize_text(self, text):
         """Normalize text for better comparison"""
-        if pd.isna(text) or text is None:
-            return ""
-        return str(text).lower().strip().replace(' ', '').replace('-', '').replace('_', '').replace('.', '')
+        return normalize_text(text)
     
     def _calculate_skill_match_score(self, worker_idx, required_roles):
         """
@@ -114,17 +146,10 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
         
         Score Range: [0, 50+]
         """
-        worker = self.workers_df.iloc[worker_idx]
-        worker_role = self._normalize_text(worker.get('Role', ''))
-        worker_technologies = str(worker.get('Technologies', '')).split(':')
-        
-        try:
-            worker_experiences = list(map(float, str(worker.get('Experience', '0')).split(':')))
-        except (ValueError, AttributeError):
-            worker_experiences = [1.0] * len(worker_technologies)
+        worker_role = self.worker_table.role_key(worker_idx)
         
-        # Normalize worker technologies
-        worker_tech_normalized = [self._normalize_text(tech) for tech in worker_technologies]
+        # Normalized technologies with their experience, parsed when the workers were loaded
+        worker_tech_normalized, worker_experiences = self.worker_table.skills(worker_idx)
         
         total_score = 0
         role_matches = 0
@@ -149,10 +174,9 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
                 # Check if worker has this skill
                 for i, worker_tech in enumerate(worker_tech_normalized):
                     if skill_normalized in worker_tech or worker_tech in skill_normalized:
-                        if i < len(worker_experiences):
-                            # β = 1.5, T_i = 1.0, E_i = experience years
-                            skill_score += worker_experiences[i] * 1.5
-                            break
+                        # β = 1.5, T_i = 1.0, E_i = experience years
+                        skill_score += worker_experiences[i] * 1.5
+                        break
             
             total_score += skill_score
         
@@ -175,7 +199,7 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
         - 1.0 = Optimal workload
         - <1.0 = Overloaded (exponential penalty)
         """
-        worker_name = self.workers_df.iloc[worker_idx]['Name']
+        worker_name = self.worker_table.names[worker_idx]
         current_workload = self.worker_availability.get(worker_name, 0)
         
         # Default capacity: 160 hours (4 weeks × 40 hours)
@@ -201,18 +225,11 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
         
         Score Range: [0.1, 1]
         """
-        worker = self.workers_df.iloc[worker_idx]
-        
-        try:
-            worker_experiences = list(map(float, str(worker.get('Experience', '0')).split(':')))
-        except (ValueError, AttributeError):
-            worker_experiences = [1.0]
-        
-        if not worker_experiences:
+        if not self.worker_table.has_experience[worker_idx]:
             return 0.5  # Default score
         
-        avg_experience = np.mean(worker_experiences)
-        max_experience = max(worker_experiences)
+        avg_experience = self.worker_table.avg_experience[worker_idx]
+        max_experience = self.worker_table.max_experience[worker_idx]
         
         # Scale task complexity (0-10) to experience scale (0-6)
         scaled_complexity = (task_complexity / 10) * 6
@@ -229,107 +246,505 @@ Ivy,Solution Architect,AWS:Microservices:DesignPatterns:Kubernetes,6:5:6:3"""
         
         return complexity_fit
     
-    def assign_tasks(self, tasks_data, max_workers_per_task=3):
+    def _parse_required_roles(self, required_roles):
+        """Parse roles if they're in string format"""
+        if isinstance(required_roles, str):
+            return [role.strip() for role in required_roles.replace('[', '').replace(']', '').replace("'", '').replace('"', '').split(',')]
+        return required_roles
+    
+    @property
+    def skill_index(self):
+        """
+        Skill index of the current workers, built once per worker set
+        
+        set_workers rebuilds it; add_worker and update_worker update it in
+        place.
+        """
+        if self._skill_index is None:
+            if self._shared_workers is not None:
+                self._skill_index = self._shared_workers.skill_index
+            else:
+                self._skill_index = SkillIndex(self.worker_table)
+        return self._skill_index
+    
+    def _own_workers(self):
+        """Copy a cached worker table before editing it"""
+        if self._shared_workers is not None:
+            self.worker_table = self.worker_table.copy()
+            self._skill_index = None
+            self._shared_workers = None
+    
+    def copy(self):
+        """
+        Engine over a copy of the workers, with its own workload and stats
+        
+        Requests run on a copy so that assignments in worker threads, and
+        workers added or removed by reassign, don't reach other callers.
+        """
+        engine = FormulaYAssignmentEngine.__new__(FormulaYAssignmentEngine)
+        engine.__dict__.update(self.__dict__)
+        engine.worker_table = self.worker_table.copy()
+        engine.worker_availability = dict(self.worker_availability)
+        engine.last_assignment_stats = {}
+        engine._skill_index = None
+        engine._shared_workers = None
+        return engine
+    
+    def add_worker(self, worker):
+        """
+        Add a worker (dict with Name, Role, Technologies, Experience)
+        
+        Returns:
+            Index of the new worker
+        """
+        self._own_workers()
+        worker_idx = self.worker_table.append(worker)
+        if self._skill_index is not None:
+            self._skill_index.add(worker_idx)
+        return worker_idx
+    
+    def update_worker(self, worker_idx, worker):
+        """Replace a worker's record (dict with Name, Role, Technologies, Experience)"""
+        self._own_workers()
+        self.worker_table.replace(worker_idx, worker)
+        if self._skill_index is not None:
+            self._skill_index.update(worker_idx)
+    
+    def remove_worker(self, worker_idx):
+        """Remove a worker from assignment; other worker indices don't change"""
+        self._own_workers()
+        self.worker_table.remove(worker_idx)
+        if self._skill_index is not None:
+            self._skill_index.update(worker_idx)
+    
+    def _role_contributions(self, role_normalized, index):
+        """
+        Score of one required role for every worker, as in _calculate_skill_match_score
+        
+        Only workers holding a technology related to one of the role's
+        skills, or a related role, are touched.
+        
+        Returns:
+            Tuple of (direct role match flags, role score per worker)
+        """
+        matched = np.zeros(index.n_workers, dtype=bool)
+        scores = np.zeros(index.n_workers)
+        
+        # β * Σ(T_i * E_i): experience of each worker's first technology related to the skill
+        for skill in self.role_skill_mapping.get(role_normalized, []):
+            workers, experiences = index.skill_holders(self._normalize_text(skill))
+            scores[workers] += experiences * 1.5
+        
+        # Direct role match (α * R) replaces the technology score
+        direct = index.role_matches(role_normalized)
+        matched[direct] = True
+        scores[direct] = 10
+        return matched, scores
+    
+    def _skill_match_matrix(self, task_roles, index):
+        """
+        Skill Match Score (S) of every task x worker pair
+        
+        Each distinct role is scored against all workers once; a task's row
+        adds up its roles in order and applies the multi-role bonus and the
+        no-direct-match penalty, giving the same values as
+        _calculate_skill_match_score.
+        """
+        S = np.zeros((len(task_roles), index.n_workers))
+        role_cache = {}
+        
+        for task_idx, required_roles in enumerate(task_roles):
+            total_score = np.zeros(index.n_workers)
+            role_matches = np.zeros(index.n_workers, dtype=np.int64)
+            
+            for role in required_roles:
+                role_normalized = self._normalize_text(role)
+                if role_normalized not in role_cache:
+                    role_cache[role_normalized] = self._role_contributions(role_normalized, index)
+                matched, scores = role_cache[role_normalized]
+                total_score += scores
+                role_matches += matched
+            
+            total_score[role_matches > 1] *= 1.2  # Multi-role bonus
+            total_score[role_matches == 0] *= 0.3  # No direct match penalty
+            S[task_idx] = np.maximum(total_score, 0)
+        
+        return S
+    
+    def _complexity_fit_matrix(self, complexities, risks, table):
+        """Complexity Fit Factor (C) of every task x worker pair, as in _calculate_complexity_fit_factor"""
+        avg_experience = table.avg_experience
+        max_experience = table.max_experience
+        
+        # Scale task complexity (0-10) to experience scale (0-6)
+        scaled_complexity = (np.asarray(complexities, dtype=np.float64) / 10) * 6
+        experience_fit = 1.0 - np.abs(max_experience[None, :] - scaled_complexity[:, None]) / 6
+        experience_fit = np.clip(experience_fit, 0, 1)
+        
+        risk_tolerance = np.minimum(avg_experience / 6, 1.0)
+        task_risk = np.asarray(risks, dtype=np.float64)
+        C = np.maximum(0.1, experience_fit * 0.7 + (1 - task_risk)[:, None] * risk_tolerance[None, :] * 0.3)
+        
+        # Workers without experience entries get the default score
+        C[:, ~table.has_experience] = 0.5
+        return C
+    
+    def _time_per_worker(self, estimated_time, required_roles, max_workers_per_task):
+        """Hours each assigned worker gets: the task time split over its roles"""
+        share = min(len(required_roles), max_workers_per_task)
+        return estimated_time / share if share else 0.0
+    
+    def _assignment_entry(self, task_idx, task, required_roles, selected, skill_scores, complexity_fits,
+                          time_per_worker):
+        """Assignment dict of a task; adds the assigned hours to worker_availability"""
+        assigned_workers = []
+        
+        for worker_idx, workload_factor, total_score in selected:
+            worker_name = self.worker_table.names[worker_idx]
+            
+            # Update worker availability
+            if worker_name not in self.worker_availability:
+                self.worker_availability[worker_name] = 0
+            self.worker_availability[worker_name] += time_per_worker
+            
+            assigned_workers.append({
+                'name': worker_name,
+                'role': self.worker_table.role(worker_idx),
+                'skill_score': round(float(skill_scores[worker_idx]), 2),
+                'workload_factor': round(workload_factor, 3),
+                'complexity_fit': round(float(complexity_fits[worker_idx]), 3),
+                'formula_y_score': round(total_score, 2),
+                'assigned_time': round(time_per_worker, 2)
+            })
+        
+        return {
+            'task_index': task_idx,
+            'task_name': task['task'],
+            'required_roles': required_roles,
+            'estimated_time': task.get('estimated_time', 0),
+            'complexity': task.get('complexity', 0),
+            'risk': task.get('risk', 0),
+            'priority': task['priority'],
+            'assigned_workers': assigned_workers
+        }
+    
+    def _plan_greedy(self, S, C, estimated_times, hours, worker_name_ids, workload, max_workers_per_task):
+        """
+        Greedy pass: each task in order takes its best workers under the current workload
+        
+        Returns:
+            Selected (worker index, workload factor, Formula Y score) per task
+        """
+        workload = workload.copy()
+        
+        # Default capacity: 160 hours (4 weeks × 40 hours)
+        max_capacity = 160
+        plan = []
+        
+        for position, estimated_time in enumerate(estimated_times):
+            # Workload Factor (W) of every worker, then Formula Y: Y = S × W × C
+            workload_ratio = (workload[worker_name_ids] + estimated_time) / max_capacity
+            workload_factor = np.ones(len(workload_ratio))
+            overloaded = ~(workload_ratio <= 1.0)
+            workload_factor[overloaded] = 1.0 / (1 + 2 * (workload_ratio[overloaded] - 1.0))
+            formula_y_scores = S[position] * workload_factor * C[position]
+            
+            # Best first; ties keep worker order
+            ranking = np.argsort(-formula_y_scores, kind='stable')
+            
+            # Assign best workers (up to max_workers_per_task)
+            selected = []
+            for worker_idx in ranking[:max_workers_per_task]:
+                total_score = float(formula_y_scores[worker_idx])
+                
+                # Minimum score threshold for assignment
+                if total_score <= 0.1:
+                    break
+                
+                workload[worker_name_ids[worker_idx]] += hours[position]
+                selected.append((worker_idx, float(workload_factor[worker_idx]), total_score))
+            plan.append(selected)
+        
+        return plan
+    
+    def _plan_global(self, S, C, hours, worker_name_ids, workload, max_workers_per_task, time_limit):
+        """
+        Global pass: maximize the total S × C of all tasks with each worker
+        within the 160 h capacity (W = 1 for every assignment)
+        
+        Returns:
+            Tuple of (plan as in _plan_greedy, solver stats)
+        """
+        max_capacity = 160
+        scores = S * C
+        capacity = np.maximum(max_capacity - workload, 0.0)
+        selected, stats = global_assignment.solve(scores, hours, capacity, worker_name_ids,
+                                                  max_workers_per_task, time_limit)
+        plan = [[(worker_idx, 1.0, float(scores[position, worker_idx])) for worker_idx in workers]
+                for position, workers in enumerate(selected)]
+        return plan, stats
+    
+    def assign_tasks(self, tasks_data, max_workers_per_task=3, mode="greedy", time_limit=GLOBAL_TIME_LIMIT):
         """
         Main Formula Y assignment algorithm
         
         Process:
         1. Sort tasks by priority and complexity (high first)
-        2. For each task, calculate Y = S × W × C for all workers
-        3. Assign best-scoring workers (above threshold 0.1)
-        4. Update worker availability
+        2. Compute S and C for all tasks x workers up front (they don't
+           depend on assignments)
+        3. For each task, apply the current workload factor W to get
+           Y = S × W × C for all workers
+        4. Assign best-scoring workers (above threshold 0.1)
+        5. Update worker availability
+        
+        Args:
+            tasks_data: Tasks with roles, complexity, risk, priority and estimated_time
+            max_workers_per_task: Maximum workers assigned to a task
+            mode: 'greedy' (steps 3-4 task by task), 'global' (maximize the
+                total score of all tasks at once, see global_assignment.py)
+                or 'auto' (global when the problem is small enough for the
+                time limit and the solver beats greedy)
+            time_limit: Seconds the global solver may take
+        
+        The chosen mode, objectives and the gap against greedy are stored in
+        last_assignment_stats.
         
         Returns: List of assignment dictionaries
         """
+        if mode not in ASSIGNMENT_MODES:
+            raise ValueError(f"Unknown assignment mode '{mode}'. Available: {ASSIGNMENT_MODES}")
+        
         assignments = []
         
         print(f"\n🔄 Running Formula Y assignment for {len(tasks_data)} tasks...")
+        start = time.perf_counter()
         
         # Sort tasks by priority and complexity (high priority, high complexity first)
         sorted_tasks = sorted(enumerate(tasks_data), 
                             key=lambda x: (x[1]['priority'], x[1]['complexity']), 
                             reverse=True)
         
-        for task_idx, task in sorted_tasks:
-            task_name = task['task']
-            required_roles = task.get('roles', [])
-            estimated_time = task.get('estimated_time', 0)
-            complexity = task.get('complexity', 0)
-            risk = task.get('risk', 0)
-            
-            # Parse roles if they're in string format
-            if isinstance(required_roles, str):
-                required_roles = [role.strip() for role in required_roles.replace('[', '').replace(']', '').replace("'", '').replace('"', '').split(',')]
-            
-            # Calculate Formula Y scores for all workers
-            worker_scores = []
-            
-            for worker_idx in range(len(self.workers_df)):
-                # Calculate three Formula Y components
-                skill_score = self._calculate_skill_match_score(worker_idx, required_roles)
-                workload_factor = self._calculate_workload_factor(worker_idx, estimated_time)
-                complexity_fit = self._calculate_complexity_fit_factor(worker_idx, complexity, risk)
-                
-                # Formula Y: Y = S × W × C
-                formula_y_score = skill_score * workload_factor * complexity_fit
-                
-                worker_scores.append((
-                    worker_idx, 
-                    formula_y_score, 
-                    skill_score, 
-                    workload_factor, 
-                    complexity_fit
-                ))
-            
-            # Sort by Formula Y score (descending)
-            worker_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            # Assign best workers (up to max_workers_per_task)
-            assigned_workers = []
-            
-            for worker_data in worker_scores:
-                worker_idx, total_score, skill_score, workload_factor, complexity_fit = worker_data
-                
-                if len(assigned_workers) >= max_workers_per_task:
-                    break
-                
-                # Minimum score threshold for assignment
-                if total_score > 0.1:
-                    worker = self.workers_df.iloc[worker_idx]
-                    worker_name = worker['Name']
-                    worker_role = worker['Role']
-                    
-                    # Update worker availability
-                    if worker_name not in self.worker_availability:
-                        self.worker_availability[worker_name] = 0
-                    
-                    # Distribute time among assigned workers
-                    time_per_worker = estimated_time / min(len(required_roles), max_workers_per_task)
-                    self.worker_availability[worker_name] += time_per_worker
-                    
-                    assigned_workers.append({
-                        'name': worker_name,
-                        'role': worker_role,
-                        'skill_score': round(skill_score, 2),
-                        'workload_factor': round(workload_factor, 3),
-                        'complexity_fit': round(complexity_fit, 3),
-                        'formula_y_score': round(total_score, 2),
-                        'assigned_time': round(time_per_worker, 2)
-                    })
-            
-            assignments.append({
-                'task_index': task_idx,
-                'task_name': task_name,
-                'required_roles': required_roles,
-                'estimated_time': estimated_time,
-                'complexity': complexity,
-                'risk': risk,
-                'priority': task['priority'],
-                'assigned_workers': assigned_workers
-            })
+        table = self.worker_table
+        index = self.skill_index
+        worker_names = table.names
+        
+        # Workers sharing a name share one workload entry
+        name_ids = {}
+        worker_name_ids = np.array([name_ids.setdefault(name, len(name_ids)) for name in worker_names], dtype=np.int64)
+        workload = np.array([self.worker_availability.get(name, 0) for name in name_ids], dtype=np.float64)
+        
+        task_roles = [self._parse_required_roles(task.get('roles', [])) for _, task in sorted_tasks]
+        S = self._skill_match_matrix(task_roles, index)
+        C = self._complexity_fit_matrix(
+            [task.get('complexity', 0) for _, task in sorted_tasks],
+            [task.get('risk', 0) for _, task in sorted_tasks],
+            table
+        )
+        
+        estimated_times = [task.get('estimated_time', 0) for _, task in sorted_tasks]
+        hours = np.array([self._time_per_worker(estimated_time, roles, max_workers_per_task)
+                          for estimated_time, roles in zip(estimated_times, task_roles)], dtype=np.float64)
+        
+        plan = self._plan_greedy(S, C, estimated_times, hours, worker_name_ids, workload, max_workers_per_task)
+        greedy_objective = sum(S[position, worker_idx] * C[position, worker_idx]
+                               for position, selected in enumerate(plan) for worker_idx, _, _ in selected)
+        greedy_load = workload.copy()
+        for position, selected in enumerate(plan):
+            for worker_idx, _, _ in selected:
+                greedy_load[worker_name_ids[worker_idx]] += hours[position]
+        stats = {
+            "requested_mode": mode,
+            "mode": "greedy",
+            "objective": round(float(greedy_objective), 4),
+            "greedy_objective": round(float(greedy_objective), 4),
+            "greedy_overload_hours": round(float(np.maximum(greedy_load - 160, 0).sum()), 2)
+        }
+        
+        if mode != "greedy":
+            # Auto mode skips problems whose variable count the solver can't handle in time
+            size = len(sorted_tasks) * min(len(worker_names), global_assignment.CANDIDATES_PER_TASK)
+            if mode == "global" or (time_limit > 0 and size <= global_assignment.MAX_VARIABLES):
+                global_plan, solver_stats = self._plan_global(S, C, hours, worker_name_ids, workload,
+                                                              max_workers_per_task, time_limit)
+                stats["solver"] = solver_stats
+                objective = solver_stats["objective"]
+                stats["global_objective"] = round(objective, 4)
+                stats["gap_percent"] = round((objective - greedy_objective) / greedy_objective * 100, 2) \
+                    if greedy_objective > 0 else None
+                # Greedy can score higher only by overloading workers
+                if mode == "global" or objective >= greedy_objective or stats["greedy_overload_hours"] > 0:
+                    plan = global_plan
+                    stats["mode"] = "global"
+                    stats["objective"] = round(objective, 4)
+            else:
+                stats["skipped_global"] = f"{size} candidate pairs exceed {global_assignment.MAX_VARIABLES}"
         
+        for position, (task_idx, task) in enumerate(sorted_tasks):
+            assignments.append(self._assignment_entry(task_idx, task, task_roles[position], plan[position],
+                                                      S[position], C[position], float(hours[position])))
+        
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        self.last_assignment_stats = stats
+        if mode != "greedy":
+            print(f"✅ {stats['mode'].title()} assignment: objective {stats['objective']:.2f} "
+                  f"(greedy {stats['greedy_objective']:.2f}, gap {stats.get('gap_percent')}%)")
         return assignments
     
+    def _task_from_assignment(self, assignment):
+        """Task dict of a previous assignment entry"""
+        return {
+            'task': assignment['task_name'],
+            'roles': assignment['required_roles'],
+            'estimated_time': assignment.get('estimated_time', 0),
+            'complexity': assignment.get('complexity', 0),
+            'risk': assignment.get('risk', 0),
+            'priority': assignment['priority']
+        }
+    
+    def assignment_hours(self, assignments):
+        """Hours per worker booked by a list of assignment entries (their recorded assigned_time)"""
+        hours = defaultdict(float)
+        for assignment in assignments:
+            for worker in assignment['assigned_workers']:
+                hours[worker['name']] += worker['assigned_time']
+        return hours
+    
+    def reassign(self, previous_assignments, delta, max_workers_per_task=3, booked_hours=None):
+        """
+        Update an assignment result after tasks or workers changed
+        
+        Only the affected tasks are re-scored and re-assigned (greedy, in
+        priority order, against the workload of the kept assignments):
+        
+        - added and changed tasks
+        - tasks assigned to a removed or changed worker
+        - tasks where an added or changed worker now scores above the
+          weakest assigned worker, or above the threshold when the task
+          has a free slot
+        
+        Every other task keeps its workers and scores.
+        
+        Args:
+            previous_assignments: Result of assign_tasks or reassign
+            delta: Dict with any of
+                - added_tasks: task dicts (get new task indices)
+                - changed_tasks: dicts with task_index and the fields that changed
+                - removed_tasks: task indices
+                - added_workers, changed_workers: worker dicts (Name, Role,
+                  Technologies, Experience); workers are matched by Name
+                - removed_workers: worker names
+            max_workers_per_task: Maximum workers assigned to a task
+            booked_hours: Hours booked outside previous_assignments (e.g. other
+                projects of the workspace), planned around like the kept tasks
+        
+        worker_availability is rebuilt from booked_hours and the returned assignments.
+        
+        Returns: List of assignment dictionaries, in priority order
+        """
+        start = time.perf_counter()
+        table = self.worker_table
+        entries = {assignment['task_index']: assignment for assignment in previous_assignments}
+        tasks = {task_idx: self._task_from_assignment(assignment) for task_idx, assignment in entries.items()}
+        affected = set()
+        
+        # Tasks
+        removed_tasks = set(delta.get('removed_tasks', []))
+        for task_idx in removed_tasks:
+            entries.pop(task_idx, None)
+            tasks.pop(task_idx, None)
+        for change in delta.get('changed_tasks', []):
+            task_idx = change['task_index']
+            if task_idx not in tasks:
+                raise ValueError(f"Unknown task_index {task_idx}")
+            tasks[task_idx].update({key: value for key, value in change.items()
+                                    if key != 'task_index' and value is not None})
+            affected.add(task_idx)
+        next_index = max(list(tasks) + list(removed_tasks) + [-1]) + 1
+        for task in delta.get('added_tasks', []):
+            tasks[next_index] = dict(task)
+            affected.add(next_index)
+            next_index += 1
+        
+        # Workers
+        touched_names = set()
+        candidates = []
+        for name in delta.get('removed_workers', []):
+            for worker_idx in table.active_indices(name):
+                self.remove_worker(worker_idx)
+            touched_names.add(name)
+        for worker in delta.get('changed_workers', []):
+            matches = table.active_indices(worker.get('Name'))
+            if not matches:
+                raise ValueError(f"Unknown worker '{worker.get('Name')}'")
+            self.update_worker(matches[0], worker)
+            touched_names.add(worker.get('Name'))
+            candidates.append(matches[0])
+        for worker in delta.get('added_workers', []):
+            candidates.append(self.add_worker(worker))
+        
+        for task_idx, assignment in entries.items():
+            if any(worker['name'] in touched_names for worker in assignment['assigned_workers']):
+                affected.add(task_idx)
+        
+        # Workload of the assignments that are kept, on top of the hours booked elsewhere
+        load = self.assignment_hours([assignment for task_idx, assignment in entries.items()
+                                      if task_idx not in affected])
+        for worker_name, hours in (booked_hours or {}).items():
+            load[worker_name] += hours
+        
+        # Kept tasks an added or changed worker would now win a place in
+        max_capacity = 160
+        for worker_idx in candidates:
+            worker_name = table.names[worker_idx]
+            for task_idx, assignment in entries.items():
+                if task_idx in affected:
+                    continue
+                task = tasks[task_idx]
+                skill_score = self._calculate_skill_match_score(worker_idx, self._parse_required_roles(task['roles']))
+                if skill_score <= 0:
+                    continue
+                estimated_time = task.get('estimated_time', 0)
+                workload_ratio = (load[worker_name] + estimated_time) / max_capacity
+                workload_factor = 1.0 if workload_ratio <= 1.0 else 1.0 / (1 + 2 * (workload_ratio - 1.0))
+                score = skill_score * workload_factor * self._calculate_complexity_fit_factor(
+                    worker_idx, task.get('complexity', 0), task.get('risk', 0))
+                assigned = assignment['assigned_workers']
+                if score > 0.1 and (len(assigned) < max_workers_per_task
+                                    or score > min(worker['formula_y_score'] for worker in assigned)):
+                    affected.add(task_idx)
+        
+        # Re-assign the affected tasks in priority order
+        order = sorted(tasks, key=lambda task_idx: (tasks[task_idx]['priority'], tasks[task_idx]['complexity']),
+                       reverse=True)
+        redo = [task_idx for task_idx in order if task_idx in affected]
+        
+        name_ids = {}
+        worker_name_ids = np.array([name_ids.setdefault(name, len(name_ids)) for name in table.names], dtype=np.int64)
+        workload = np.array([load.get(name, 0.0) for name in name_ids], dtype=np.float64)
+        
+        task_roles = [self._parse_required_roles(tasks[task_idx].get('roles', [])) for task_idx in redo]
+        S = self._skill_match_matrix(task_roles, self.skill_index)
+        C = self._complexity_fit_matrix([tasks[task_idx].get('complexity', 0) for task_idx in redo],
+                                        [tasks[task_idx].get('risk', 0) for task_idx in redo], table)
+        estimated_times = [tasks[task_idx].get('estimated_time', 0) for task_idx in redo]
+        hours = np.array([self._time_per_worker(estimated_time, roles, max_workers_per_task)
+                          for estimated_time, roles in zip(estimated_times, task_roles)], dtype=np.float64)
+        plan = self._plan_greedy(S, C, estimated_times, hours, worker_name_ids, workload, max_workers_per_task)
+        
+        self.worker_availability = dict(load)
+        for position, task_idx in enumerate(redo):
+            entries[task_idx] = self._assignment_entry(task_idx, tasks[task_idx], task_roles[position], plan[position],
+                                                       S[position], C[position], float(hours[position]))
+        
+        self.last_assignment_stats = {
+            "mode": "incremental",
+            "tasks": len(order),
+            "reassigned_tasks": len(redo),
+            "seconds": round(time.perf_counter() - start, 4)
+        }
+        print(f"🔄 Incremental assignment: re-assigned {len(redo)} of {len(order)} tasks")
+        return [entries[task_idx] for task_idx in order]
+    
     def print_assignments(self, assignments):
         """Print Formula Y assignments in detailed format"""
         print("\n" + "="*80)
@@ -387,13 +802,13 @@ def predict_tasks(project_description):
         raise ValueError("Invalid JSON from Gemini response.")
     predictor = TaskPredictorTextOnly()
     predictor.load_models("models")
+    task_texts = [task_info.get("task", "Unknown Task") for task_info in tasks_info]
+    all_preds = predictor.predict_many(task_texts)
     predicted_tasks = []
-    for task_info in tasks_info:
-        task_text = task_info.get("task", "Unknown Task")
+    for task_info, task_text, preds in zip(tasks_info, task_texts, all_preds):
         duration = task_info.get("duration", "Unknown")
         roles = task_info.get("roles", "")
         roles = roles if isinstance(roles, list) else [roles]
-        preds = predictor.predict(task_text=task_text)
         predicted_tasks.append({
             "task": task_text,
             "duration": duration,
@@ -404,90 +819,37 @@ def predict_tasks(project_description):
         })
     return predicted_tasks
 
-def calculate_task_times(tasks_data, workspace_id=None, base_time=10):
+def calculate_task_times(tasks_data, workspace_id=None, base_time=10, workers_df=None):
     """
     Calculate estimated time E_T for each task using the original time estimation formula
     
     Args:
         tasks_data: List of task dictionaries with complexity, risk, priority
-        workspace_id: Workspace ID to fetch workers from database
+        workspace_id: Workspace ID to fetch workers from database (through the worker cache)
         base_time: Base time B_T (default: 10)
+        workers_df: Workers already loaded for the workspace (skips the database)
     
     Returns:
         List of task dictionaries with added 'estimated_time' field
     """
     try:
         # Load workers from database if workspace_id provided
-        if workspace_id:
-            workers_df = db_connection.get_csv_workers_dataframe(workspace_id)
+        if workers_df is not None:
+            pass
+        elif workspace_id:
+            workers_df = worker_cache.get(workspace_id).dataframe
         else:
             # Fallback to empty DataFrame
             workers_df = pd.DataFrame(columns=["Name", "Role", "Technologies", "Experience"])
         
-        T = len(workers_df)  # Total number of workers
-        
-        # Convert tasks to DataFrame for easier processing
+        # Skill scores and E_T for all tasks at once (time_estimator.py)
         tasks_df = pd.DataFrame(tasks_data)
-        
-        # Normalize columns
-        C_max = tasks_df['complexity'].max() if len(tasks_df) > 0 else 1
-        R_max = tasks_df['risk'].max() if len(tasks_df) > 0 else 1
-        Pr_max = tasks_df['priority'].max() if len(tasks_df) > 0 else 1
-        
-        # Calculate skill match score S for each task
-        def skill_score(task_roles):
-            """Calculate skill score based on worker technologies and experience"""
-            if not task_roles or not isinstance(task_roles, list):
-                return 1.0  # Default score if no roles specified
-                
-            total_score = 0
-            for _, row in workers_df.iterrows():
-                if 'Technologies' in row and 'Experience' in row:
-                    try:
-                        techs = str(row['Technologies']).split(':')
-                        exps = list(map(float, str(row['Experience']).split(':')))
-                        
-                        for role in task_roles:
-                            role_str = str(role).strip()
-                            if role_str in techs:
-                                idx = techs.index(role_str)
-                                if idx < len(exps):
-                                    total_score += exps[idx]
-                    except (ValueError, IndexError):
-                        continue  # Skip invalid data
-            
-            return max(total_score, 1.0)  # Ensure minimum score of 1
-        
-        # Add skill scores to tasks
-        for i, task in enumerate(tasks_data):
-            task_roles = task.get('roles', [])
-            tasks_df.loc[i, 'S'] = skill_score(task_roles)
-        
-        S_max = tasks_df['S'].max() if len(tasks_df) > 0 else 1
-        T_max = T
-        P_T = T  # assume all are participating
-        B_T = base_time
-        
-        # Calculate E_T for each task
-        def compute_E_T(row):
-            C, R, Pr, S = row['complexity'], row['risk'], row['priority'], row['S']
-            
-            # Avoid division by zero
-            C_norm = C / C_max if C_max > 0 else 0
-            R_norm = R / R_max if R_max > 0 else 0
-            Pr_norm = Pr / Pr_max if Pr_max > 0 else 0
-            S_factor = S_max / S if S > 0 else 1
-            
-            term1 = 0.8 * B_T * (1 + C_norm + R_norm + Pr_norm)
-            term2 = 0.2 * B_T * ((0.05 * (T / T_max)) + (0.05 * S_factor) + (0.05 * (P_T / T)))
-            
-            return round(term1 + term2, 2)
-        
-        tasks_df['E_T'] = tasks_df.apply(compute_E_T, axis=1)
+        task_roles = [task.get('roles', []) for task in tasks_data]
+        estimated_times = estimate_task_times(tasks_df, task_roles, workers_df, base_time)
         
         # Add estimated time back to original tasks data
-        for i, task in enumerate(tasks_data):
-            task['estimated_time'] = tasks_df.loc[i, 'E_T']
+        for task, estimated_time in zip(tasks_data, estimated_times):
+            task['estimated_time'] = estimated_time
         
         return tasks_data
         
@@ -502,11 +864,6 @@ def calculate_task_times(tasks_data, workspace_id=None, base_time=10):
             task['estimated_time'] = round(base_time * (1 + complexity_factor + risk_factor + priority_factor) * 0.3, 2)
         
         return tasks_data
-        print(f"Error in time calculation: {e}")
-        # Add default estimated time
-        for task in tasks_data:
-            task['estimated_time'] = base_time
-        return tasks_data
 
 def main():
     print("="*60)
@@ -550,17 +907,16 @@ def main():
         return
     
     print(f"\n3️⃣ Generating predictions for {len(tasks_info)} tasks...")
-    # Prepare tasks data with predictions
+    # Prepare tasks data with predictions (task descriptions only, one batch)
+    task_names = [task_info.get("task", "Unknown Task") for task_info in tasks_info]
+    predictions = predictor.predict_many(task_names)
+    
     predicted_tasks = []
-    for task_info in tasks_info:
-        task = task_info.get("task", "Unknown Task")
+    for task_info, task, pred in zip(tasks_info, task_names, predictions):
         duration = task_info.get("duration", "Unknown")
         roles = task_info.get("roles", "Unknown")
         roles = roles if isinstance(roles, list) else [roles] if roles != "Unknown" else []
         
-        # Predict using only the task description
-        pred = predictor.predict(task_text=task)
-        
         predicted_tasks.append({
             "task": task,
             "duration": duration,
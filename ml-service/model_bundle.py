@@ -0,0 +1,210 @@
+"""
+Single-file, memory-mapped model bundle format
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+A bundle stores every fitted array of the task predictor (vocabulary, IDF
+and scaler vectors, support vectors, dual coefficients) as raw little-endian
+arrays in one file, so it can be memory-mapped instead of unpickled. All
+uvicorn workers mapping the same bundle share its pages through the OS page
+cache, and loading only parses a small JSON manifest.
+
+Layout:
+    8 bytes   magic b"ADMXMB01"
+    8 bytes   manifest length (uint64, little-endian)
+    N bytes   manifest (UTF-8 JSON)
+    ...       arrays, each starting on a 64-byte boundary
+
+The manifest records the format version, each array's dtype/shape/offset,
+free-form metadata and a SHA-256 content hash over the arrays and metadata.
+
+This module only depends on NumPy so bundles can be read without sklearn.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+BUNDLE_MAGIC = b"ADMXMB01"
+BUNDLE_FORMAT = "adminix-task-model-bundle"
+BUNDLE_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sQ")
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def compute_content_hash(arrays, metadata):
+    """SHA-256 over the metadata and every array's name, dtype, shape and bytes"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(metadata, sort_keys=True).encode("utf-8"))
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode("utf-8"))
+        digest.update(array.dtype.str.encode("utf-8"))
+        digest.update(str(array.shape).encode("utf-8"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def encode_strings(strings):
+    """Pack a list of strings into (utf-8 blob, offsets) arrays"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def decode_strings(blob, offsets):
+    """Inverse of encode_strings"""
+    data = bytes(blob)
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def write_bundle(path, arrays, metadata=None):
+    """
+    Write arrays and metadata to a bundle file
+
+    The file is written next to its destination and moved into place with
+    os.replace, so readers never see a partial bundle and processes that
+    still map the previous file keep a valid mapping.
+
+    Returns:
+        The manifest that was written
+    """
+    metadata = metadata or {}
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    for name, array in arrays.items():
+        if array.dtype.byteorder == ">":
+            arrays[name] = array.astype(array.dtype.newbyteorder("<"))
+        if array.dtype == object:
+            raise ValueError(f"Array '{name}' has object dtype and cannot be stored in a bundle")
+
+    # Offsets are relative to the start of the data section
+    entries = {}
+    offset = 0
+    for name in sorted(arrays):
+        array = arrays[name]
+        offset = _aligned(offset)
+        entries[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": int(array.nbytes)
+        }
+        offset += array.nbytes
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "content_hash": compute_content_hash(arrays, metadata),
+        "metadata": metadata,
+        "arrays": entries
+    }
+    manifest_bytes = json.dumps(manifest).encode("utf-8")
+    data_start = _aligned(_HEADER.size + len(manifest_bytes))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".bundle.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, len(manifest_bytes)))
+            f.write(manifest_bytes)
+            for name in sorted(arrays):
+                f.seek(data_start + entries[name]["offset"])
+                f.write(arrays[name].tobytes())
+            f.truncate(data_start + offset)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return manifest
+
+
+def read_manifest(path):
+    """Read only the manifest of a bundle"""
+    with open(path, "rb") as f:
+        magic, manifest_length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        manifest = json.loads(f.read(manifest_length).decode("utf-8"))
+
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unknown bundle format '{manifest.get('format')}'")
+    if manifest.get("format_version", 0) > BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Bundle format version {manifest['format_version']} is newer than "
+            f"supported version {BUNDLE_FORMAT_VERSION}"
+        )
+    manifest["_data_start"] = _aligned(_HEADER.size + manifest_length)
+    return manifest
+
+
+def read_bundle(path, mmap=True, verify=False):
+    """
+    Open a bundle
+
+    Args:
+        path: Bundle file
+        mmap: Map the arrays read-only instead of reading them into memory
+        verify: Recompute the content hash and fail if it does not match
+
+    Returns:
+        Tuple of (manifest, dict of name -> array)
+    """
+    manifest = read_manifest(path)
+    data_start = manifest.pop("_data_start")
+
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        with open(path, "rb") as f:
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        start = data_start + entry["offset"]
+        raw = buffer[start:start + entry["nbytes"]]
+        arrays[name] = raw.view(np.dtype(entry["dtype"])).reshape(entry["shape"])
+
+    if verify:
+        actual = compute_content_hash(arrays, manifest["metadata"])
+        if actual != manifest["content_hash"]:
+            raise ValueError(f"Bundle {path} is corrupt: content hash mismatch")
+
+    return manifest, arrays
+
+
+def verify_bundle(path):
+    """Return True if the bundle's arrays match its recorded content hash"""
+    try:
+        read_bundle(path, mmap=True, verify=True)
+        return True
+    except ValueError:
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+
+    bundle_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("models", "model.bundle")
+    bundle_manifest, bundle_arrays = read_bundle(bundle_path, verify=True)
+    print(f"📦 {bundle_path}: {bundle_manifest['format']} v{bundle_manifest['format_version']}")
+    print(f"   Content hash: {bundle_manifest['content_hash']}")
+    print(f"   Created: {bundle_manifest['created_at']}")
+    for array_name, array in bundle_arrays.items():
+        print(f"   {array_name:<22} {array.dtype.str:<6} {str(array.shape):<16} {array.nbytes / 1024:>10.1f} KB")
+    print("✅ Content hash verified")
@@ -0,0 +1,231 @@
+"""
+Shared-kernel multi-output SVR inference
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+The complexity, risk and priority SVRs are all fit on the same training
+matrix with the same RBF kernel, so their support vectors are rows of the
+same X_train. This module merges them into a single predictor that computes
+the RBF kernel once against the union of support vectors and applies the
+three dual-coefficient vectors as one matrix product:
+
+    y = exp(-gamma * ||x - sv||^2) @ dual_coef + intercept
+
+For a smaller and faster export the predictor can be cast to float32,
+duplicate support vectors can be merged, and the support-vector set can be
+reduced to the most important vectors with their coefficients refit
+(a reduced-set approximation of the original decision function).
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class MultiOutputSVR:
+    """RBF SVR inference for several targets sharing one kernel evaluation"""
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma, target_names=None, sv_sq_norms=None):
+        """
+        Args:
+            support_vectors: (n_sv, n_features) matrix of support vectors. Any
+                sparse format works; a CSC matrix is used without copying.
+            dual_coef: (n_sv, n_targets) dual coefficients, one column per target
+            intercept: (n_targets,) intercepts
+            gamma: RBF kernel coefficient shared by all targets
+            target_names: Optional names of the output columns
+            sv_sq_norms: Optional precomputed squared norms of the support vectors
+        """
+        self.support_vectors = support_vectors if sp.issparse(support_vectors) else sp.csr_matrix(support_vectors)
+        # float32 models (see astype) compute in float32; anything else in float64
+        self.dtype = np.float32 if self.support_vectors.dtype == np.float32 else np.float64
+        if self.support_vectors.dtype != self.dtype:
+            self.support_vectors = self.support_vectors.astype(self.dtype)
+        self.dual_coef = np.asarray(dual_coef, dtype=self.dtype)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.target_names = list(target_names) if target_names else [
+            f"target_{i}" for i in range(self.dual_coef.shape[1])
+        ]
+
+        if self.dual_coef.shape != (self.support_vectors.shape[0], len(self.intercept)):
+            raise ValueError(
+                f"dual_coef shape {self.dual_coef.shape} does not match "
+                f"{self.support_vectors.shape[0]} support vectors and {len(self.intercept)} targets"
+            )
+
+        # Squared norms of the support vectors are constant, compute them once
+        if sv_sq_norms is None:
+            sv_sq_norms = np.asarray(
+                self.support_vectors.multiply(self.support_vectors).sum(axis=1)
+            ).ravel()
+        self.sv_sq_norms = np.asarray(sv_sq_norms, dtype=self.dtype)
+        # Feature-major copy so X @ SV.T is a plain CSR x CSR product
+        self._support_vectors_t = sp.csr_matrix(self.support_vectors.T)
+
+    @classmethod
+    def from_svr_models(cls, models, target_names=None):
+        """
+        Build a shared-kernel predictor from fitted sklearn SVR models
+
+        All models must use the RBF kernel with the same gamma and must have
+        been fit on the same training matrix, so that their `support_`
+        indices refer to the same rows.
+        """
+        if not models:
+            raise ValueError("At least one SVR model is required")
+
+        reference = models[0]
+        for svr in models:
+            if svr.kernel != 'rbf':
+                raise ValueError(f"Only RBF SVR models can share a kernel, got '{svr.kernel}'")
+            if svr.shape_fit_ != reference.shape_fit_:
+                raise ValueError("SVR models were fit on training matrices of different shapes")
+            if not np.isclose(svr._gamma, reference._gamma, rtol=1e-12, atol=0):
+                raise ValueError("SVR models use different gamma values")
+
+        # Union of support vector indices into the shared training matrix
+        all_support = np.unique(np.concatenate([svr.support_ for svr in models]))
+
+        # Take each union row from the first model that holds it
+        stacked_vectors = sp.vstack([sp.csr_matrix(svr.support_vectors_) for svr in models], format='csr')
+        stacked_support = np.concatenate([svr.support_ for svr in models])
+        _, first_rows = np.unique(stacked_support, return_index=True)
+        support_vectors = stacked_vectors[first_rows]
+
+        dual_coef = np.zeros((len(all_support), len(models)))
+        for column, svr in enumerate(models):
+            rows = np.searchsorted(all_support, svr.support_)
+            # dual_coef_ is a sparse matrix when the SVR was fit on sparse input
+            coef = svr.dual_coef_.toarray() if sp.issparse(svr.dual_coef_) else svr.dual_coef_
+            dual_coef[rows, column] = np.ravel(coef)
+
+        intercept = np.array([svr.intercept_[0] for svr in models])
+
+        return cls(support_vectors, dual_coef, intercept, reference._gamma, target_names)
+
+    @classmethod
+    def from_arrays(cls, arrays, gamma, target_names=None):
+        """Rebuild a predictor from the arrays produced by to_arrays (e.g. a mapped bundle)"""
+        n_features = len(arrays["sv_t_indptr"]) - 1
+        n_support = len(arrays["sv_sq_norms"])
+        # SV^T in CSR layout is SV in CSC layout, so the arrays are used as-is
+        support_vectors = sp.csc_matrix(
+            (arrays["sv_t_data"], arrays["sv_t_indices"], arrays["sv_t_indptr"]),
+            shape=(n_support, n_features)
+        )
+        return cls(support_vectors, arrays["dual_coef"], arrays["intercept"], gamma,
+                   target_names, sv_sq_norms=arrays["sv_sq_norms"])
+
+    def to_arrays(self):
+        """Raw arrays describing this predictor, in the layout used by predict"""
+        support_vectors_t = self._support_vectors_t.copy()
+        support_vectors_t.sort_indices()
+        # scipy upcasts (and so copies) mixed index dtypes; keep both int32 when they fit
+        index_dtype = np.int32 if support_vectors_t.nnz < np.iinfo(np.int32).max else np.int64
+        return {
+            "sv_t_data": support_vectors_t.data,
+            "sv_t_indices": support_vectors_t.indices.astype(index_dtype),
+            "sv_t_indptr": support_vectors_t.indptr.astype(index_dtype),
+            "sv_sq_norms": self.sv_sq_norms,
+            "dual_coef": self.dual_coef,
+            "intercept": self.intercept
+        }
+
+    @property
+    def n_support(self):
+        return self.support_vectors.shape[0]
+    
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays written by to_arrays"""
+        return sum(array.nbytes for array in self.to_arrays().values())
+    
+    def _with(self, support_vectors, dual_coef, sv_sq_norms=None):
+        return MultiOutputSVR(support_vectors, dual_coef, self.intercept, self.gamma,
+                              self.target_names, sv_sq_norms=sv_sq_norms)
+    
+    def astype(self, dtype):
+        """Copy of this predictor with its support vectors and coefficients cast to dtype"""
+        return self._with(self.support_vectors.astype(dtype), self.dual_coef.astype(dtype),
+                          self.sv_sq_norms.astype(dtype))
+    
+    def _kernel(self, X, support_vectors_t, sv_sq_norms):
+        """Dense RBF kernel between the rows of X and the given (feature-major) support vectors"""
+        x_sq_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        sq_distances = x_sq_norms[:, None] + sv_sq_norms[None, :] - 2 * (X @ support_vectors_t).toarray()
+        np.maximum(sq_distances, 0, out=sq_distances)
+        return np.exp(-self.gamma * sq_distances, out=sq_distances)
+    
+    def merge_duplicates(self, radius=0.0):
+        """
+        Merge support vectors closer than `radius` (squared euclidean distance)
+        
+        Each group is replaced by its first vector carrying the summed dual
+        coefficients. With radius=0 only identical vectors are merged, which
+        leaves predictions unchanged up to rounding.
+        """
+        support_vectors = sp.csr_matrix(self.support_vectors, dtype=np.float64)
+        sv_sq_norms = self.sv_sq_norms.astype(np.float64)
+        support_vectors_t = sp.csr_matrix(support_vectors.T)
+        threshold = max(float(radius), 1e-9)
+        
+        representative = np.full(self.n_support, -1)
+        for start in range(0, self.n_support, 512):
+            block = support_vectors[start:start + 512]
+            sq_distances = (sv_sq_norms[start:start + 512, None] + sv_sq_norms[None, :]
+                            - 2 * (block @ support_vectors_t).toarray())
+            for offset, row in enumerate(sq_distances):
+                index = start + offset
+                if representative[index] >= 0:
+                    continue
+                members = np.flatnonzero((row <= threshold) & (representative < 0))
+                representative[members] = index
+                representative[index] = index
+        
+        keep, group = np.unique(representative, return_inverse=True)
+        dual_coef = np.zeros((len(keep), self.dual_coef.shape[1]))
+        np.add.at(dual_coef, group, self.dual_coef.astype(np.float64))
+        return self._with(support_vectors[keep].astype(self.dtype), dual_coef,
+                          self.sv_sq_norms[keep])
+    
+    def reduce(self, n_keep, fit_X=None):
+        """
+        Reduced-set approximation keeping the n_keep most important support vectors
+        
+        Vectors are ranked by their largest absolute dual coefficient over
+        the targets. The coefficients of the kept vectors are refit by least
+        squares so the reduced model reproduces the original decision
+        function on fit_X (the original support vectors by default).
+        """
+        if n_keep >= self.n_support:
+            return self
+        importance = np.abs(self.dual_coef).max(axis=1)
+        keep = np.sort(np.argsort(-importance, kind="stable")[:n_keep])
+        
+        support_vectors = sp.csr_matrix(self.support_vectors, dtype=np.float64)
+        fit_X = support_vectors if fit_X is None else sp.csr_matrix(fit_X, dtype=np.float64)
+        kept_vectors = support_vectors[keep]
+        kept_sq_norms = self.sv_sq_norms[keep].astype(np.float64)
+        
+        design = self._kernel(fit_X, sp.csr_matrix(kept_vectors.T), kept_sq_norms)
+        target = self._kernel(fit_X, sp.csr_matrix(support_vectors.T),
+                              self.sv_sq_norms.astype(np.float64)) @ self.dual_coef.astype(np.float64)
+        dual_coef, *_ = np.linalg.lstsq(design, target, rcond=None)
+        return self._with(kept_vectors.astype(self.dtype), dual_coef, self.sv_sq_norms[keep])
+
+    def predict(self, X, batch_size=1024):
+        """
+        Predict all targets for the rows of X
+
+        Returns:
+            (n_samples, n_targets) array of predictions
+        """
+        # Match the model dtype so the support vectors are never upcast (copied)
+        X = sp.csr_matrix(X, dtype=self.dtype)
+        predictions = np.empty((X.shape[0], len(self.intercept)))
+
+        # Bound the dense (batch, n_sv) kernel block for large inputs
+        for start in range(0, X.shape[0], batch_size):
+            kernel = self._kernel(X[start:start + batch_size], self._support_vectors_t, self.sv_sq_norms)
+            predictions[start:start + batch_size] = kernel @ self.dual_coef + self.intercept
+
+        return predictions
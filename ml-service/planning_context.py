@@ -0,0 +1,57 @@
+"""
+Request-scoped planning context
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+A project analysis estimates task times and then assigns the tasks. Both
+stages used to load the workspace's workers on their own, so a request read
+the database twice and a worker import between the two reads could leave
+the estimation and the assignment working on different worker sets.
+
+A PlanningContext loads the workers once (through the worker cache) and
+hands that snapshot to the time estimation, the Formula Y engine and the
+utilization summary of the request.
+"""
+
+from model import FormulaYAssignmentEngine, calculate_task_times
+from worker_cache import worker_cache
+from workload_ledger import utilization_status
+
+
+class PlanningContext:
+    """Workers of one workspace, loaded once per request"""
+
+    def __init__(self, workspace_id, workers=None):
+        """
+        Args:
+            workspace_id: Workspace being planned
+            workers: WorkspaceWorkers already loaded (defaults to the worker cache)
+        """
+        self.workspace_id = workspace_id
+        self.workers = workers if workers is not None else worker_cache.get(workspace_id)
+        self._engine = None
+
+    def __len__(self):
+        return len(self.workers)
+
+    @property
+    def workers_df(self):
+        """Workers DataFrame used by the time estimation"""
+        return self.workers.dataframe
+
+    @property
+    def engine(self):
+        """Formula Y engine on the context's workers, created on first use"""
+        if self._engine is None:
+            self._engine = FormulaYAssignmentEngine(self.workspace_id, workers=self.workers)
+        return self._engine
+
+    def estimate_times(self, tasks_data, base_time=10):
+        """calculate_task_times on the context's workers"""
+        return calculate_task_times(tasks_data, self.workspace_id, base_time, workers_df=self.workers_df)
+
+    def utilization(self):
+        """Utilization entry of every worker with hours in the engine's workload"""
+        if self._engine is None:
+            return {}
+        return {worker_name: utilization_status(total_hours)
+                for worker_name, total_hours in self._engine.worker_availability.items()}
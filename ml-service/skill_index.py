@@ -0,0 +1,158 @@
+"""
+Inverted skill index for Formula Y role-to-worker matching
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Formula Y matches a required skill to a worker technology when either
+normalized string contains the other, and credits the experience of the
+first such technology in the worker's list. Checking that for every
+worker, skill and technology is O(workers x skills x technologies) per
+role.
+
+The index keeps, for every distinct normalized technology string, the
+workers holding it with their position and experience, and a substring
+table so the technologies related to a skill are found without scanning:
+
+    - technologies containing the skill: every substring of every
+      technology string maps to the technologies it occurs in
+    - technologies contained in the skill: every substring of the skill is
+      looked up as a technology string
+
+Worker roles are indexed the same way against the required role. A lookup
+then only touches the workers that hold a related technology or role.
+The index reads a WorkerTable; workers are added, edited and removed in
+place and only their own postings change.
+"""
+
+import numpy as np
+
+
+def _substrings(text):
+    """Every substring of text, including the empty string"""
+    subs = {""}
+    for start in range(len(text)):
+        for end in range(start + 1, len(text) + 1):
+            subs.add(text[start:end])
+    return subs
+
+
+class _SubstringTable:
+    """Distinct strings, with a lookup of strings related to a query by bidirectional containment"""
+
+    def __init__(self):
+        self.ids = {}
+        self._containing = {}  # substring -> ids of the strings containing it
+
+    def add(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+            for sub in _substrings(text):
+                self._containing.setdefault(sub, set()).add(string_id)
+        return string_id
+
+    def related(self, query):
+        """Ids of the strings that contain query or are contained in it"""
+        related = set(self._containing.get(query, ()))
+        related.update(self.ids[sub] for sub in _substrings(query) if sub in self.ids)
+        return related
+
+
+class SkillIndex:
+    """Technology and role postings of a worker set, updated per worker"""
+
+    def __init__(self, table):
+        """
+        Args:
+            table: WorkerTable of the workers to index
+        """
+        self.table = table
+        self._technologies = _SubstringTable()
+        self._roles = _SubstringTable()
+        self._tech_postings = []  # technology id -> {worker: (first position, experience)}
+        self._role_postings = []  # role id -> set of workers
+        self._indexed = []  # worker -> (role, technologies) as posted
+        self._skill_cache = {}
+        for worker_idx in range(len(table)):
+            self._index(worker_idx)
+
+    @property
+    def n_workers(self):
+        return len(self._indexed)
+
+    def _index(self, worker_idx):
+        if not self.table.active[worker_idx]:
+            self._record(worker_idx, None, [])
+            return
+
+        role = self.table.role_key(worker_idx)
+        role_id = self._roles.add(role)
+        if role_id == len(self._role_postings):
+            self._role_postings.append(set())
+        self._role_postings[role_id].add(worker_idx)
+
+        # Technologies without an experience never score and are not posted
+        technologies, experiences = self.table.skills(worker_idx)
+        for position, (tech, experience) in enumerate(zip(technologies, experiences)):
+            tech_id = self._technologies.add(tech)
+            if tech_id == len(self._tech_postings):
+                self._tech_postings.append({})
+            postings = self._tech_postings[tech_id]
+            if worker_idx not in postings:  # Keep the first occurrence of a repeated technology
+                postings[worker_idx] = (position, float(experience))
+
+        self._record(worker_idx, role, technologies)
+
+    def _record(self, worker_idx, role, technologies):
+        if worker_idx == len(self._indexed):
+            self._indexed.append((role, technologies))
+        else:
+            self._indexed[worker_idx] = (role, technologies)
+        self._skill_cache.clear()
+
+    def _unindex(self, worker_idx):
+        role, technologies = self._indexed[worker_idx]
+        if role is None:
+            return
+        self._role_postings[self._roles.ids[role]].discard(worker_idx)
+        for tech in technologies:
+            self._tech_postings[self._technologies.ids[tech]].pop(worker_idx, None)
+        self._skill_cache.clear()
+
+    def add(self, worker_idx):
+        """Index a worker appended to the table"""
+        self._index(worker_idx)
+
+    def update(self, worker_idx):
+        """Re-index a worker whose table record was replaced or removed"""
+        self._unindex(worker_idx)
+        self._index(worker_idx)
+
+    def role_matches(self, role_normalized):
+        """Workers whose role contains the required role or is contained in it"""
+        workers = set()
+        for role_id in self._roles.related(role_normalized):
+            workers.update(self._role_postings[role_id])
+        return np.array(sorted(workers), dtype=np.int64)
+
+    def skill_holders(self, skill_normalized):
+        """
+        Workers holding a technology related to a skill
+
+        Returns:
+            Tuple of (worker indices, experience of each worker's first
+            related technology)
+        """
+        cached = self._skill_cache.get(skill_normalized)
+        if cached is not None:
+            return cached
+
+        first = {}
+        for tech_id in self._technologies.related(skill_normalized):
+            for worker_idx, (position, experience) in self._tech_postings[tech_id].items():
+                if worker_idx not in first or position < first[worker_idx][0]:
+                    first[worker_idx] = (position, experience)
+
+        workers = np.fromiter(first, dtype=np.int64, count=len(first))
+        experiences = np.array([experience for _, experience in first.values()], dtype=np.float64)
+        self._skill_cache[skill_normalized] = (workers, experiences)
+        return workers, experiences
@@ -0,0 +1,48 @@
+"""
+Tests for the pure-NumPy inference engine
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_inference_engine.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from inference_engine import InferenceEngine
+from ml import TARGET_BOUNDS, TaskPredictorTextOnly
+
+MODEL_DIR = "models"
+DATASET = "big_dataset.csv"
+TARGETS = ("complexity", "risk", "priority")
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    predictor = TaskPredictorTextOnly(backend="svr", use_cache=False)
+    predictor.load_models(MODEL_DIR, use_bundle=False)
+    return predictor
+
+
+def test_bundle_engine_matches_sklearn_svr(predictor, tmp_path):
+    bundle_path = os.path.join(tmp_path, "model.bundle")
+    predictor.save_bundle(bundle_path)
+    engine = InferenceEngine.from_bundle(bundle_path)
+
+    combined_text, _, _, _ = predictor.load_training_data(DATASET)
+    rng = np.random.default_rng(0)
+    texts = list(rng.choice(combined_text.values, size=300, replace=False))
+    texts += ["", "qwertyuiop", "Develop user authentication system"]
+
+    # Per-target sklearn path: vectorizer, scaler, one SVR.predict per target
+    X_scaled = predictor.scaler.transform(predictor.vectorizer.transform(texts))
+    models = {"complexity": predictor.complexity_model, "risk": predictor.risk_model,
+              "priority": predictor.priority_model}
+    expected = np.column_stack([np.clip(models[target].predict(X_scaled), *TARGET_BOUNDS[target])
+                                for target in TARGETS])
+
+    predictions = engine.predict_many(texts)
+    actual = np.array([[prediction[target] for target in TARGETS] for prediction in predictions])
+
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
@@ -0,0 +1,79 @@
+"""
+Tests for the nearest-neighbour index
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_knn_index.py
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from knn_index import TAIL_ROWS, TaskNeighborIndex
+
+K = 10
+
+
+def make_texts(n, rng, vocabulary):
+    # Zipf-like term frequencies: a few common terms with long postings, many rare ones
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    return [" ".join(rng.choice(vocabulary, size=rng.integers(3, 12), p=weights)) for _ in range(n)]
+
+
+def make_labels(n, rng):
+    return rng.uniform(1, 5, n), rng.uniform(1, 5, n), rng.uniform(1, 5, n)
+
+
+def assert_exact(index, texts, queries, k=K):
+    """search() returns the top-k of X @ q, computed with the index's float32 weights"""
+    X = index.vectorizer.transform(texts).astype(np.float32).astype(np.float64)
+    for query in queries:
+        rows, scores = index.search(query, k)
+        all_scores = X @ index.vectorizer.transform([query]).toarray().ravel()
+        expected = np.sort(all_scores[all_scores > 0])[::-1][:k]
+        np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+        # The rows returned score what the search says (ties may pick either row)
+        np.testing.assert_allclose(all_scores[rows], scores, rtol=0, atol=1e-12)
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(3)
+    vocabulary = np.array([f"term{i}" for i in range(400)])
+    texts = make_texts(3000 + TAIL_ROWS + 700, rng, vocabulary)
+    queries = make_texts(60, rng, vocabulary) + ["term0 term1", "unknownword term399", "unknownword"]
+    return rng, texts, queries
+
+
+def test_search_matches_brute_force_across_tail_merge(corpus):
+    rng, texts, queries = corpus
+    built = 3000
+    index = TaskNeighborIndex.build(texts[:built], *make_labels(built, rng), k=K)
+    assert_exact(index, texts[:built], queries)
+
+    # Rows in the tail segment, then past TAIL_ROWS so the tail is merged, then a new tail
+    for start in range(built, len(texts), 350):
+        batch = texts[start:start + 350]
+        index.add_rows(batch, *make_labels(len(batch), rng))
+        assert_exact(index, texts[:start + len(batch)], queries[:15])
+    assert index._n_indexed > built and index.n_rows > index._n_indexed
+    assert_exact(index, texts, queries)
+
+
+def test_pickle_round_trip_keeps_results(corpus):
+    rng, texts, queries = corpus
+    index = TaskNeighborIndex.build(texts[:2000], *make_labels(2000, rng), k=K)
+    index.add_rows(texts[2000:2500], *make_labels(500, rng))
+
+    restored = pickle.loads(pickle.dumps(index))
+
+    assert restored.n_rows == index.n_rows
+    for query in queries:
+        rows, scores = restored.search(query)
+        expected_rows, expected_scores = index.search(query)
+        np.testing.assert_array_equal(rows, expected_rows)
+        np.testing.assert_array_equal(scores, expected_scores)
+    restored.add_rows(texts[2500:], *make_labels(len(texts) - 2500, rng))
+    assert_exact(restored, texts, queries[:15])
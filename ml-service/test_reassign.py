@@ -0,0 +1,132 @@
+"""
+Tests for incremental reassignment
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_reassign.py
+"""
+
+import random
+
+import pytest
+
+from model import FormulaYAssignmentEngine
+
+ROLES = {
+    "Backend Developer": ["Java", "Spring Boot", "SQL", "Node.js", "Python"],
+    "Frontend Developer": ["React", "Vue", "HTML", "CSS", "JavaScript"],
+    "QA Engineer": ["Selenium", "JMeter", "Postman"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "Jenkins", "AWS"],
+    "UI Designer": ["Figma", "AdobeXD", "Sketch", "CSS"],
+}
+
+
+def make_workers(n, rng):
+    workers = []
+    for i in range(n):
+        role = rng.choice(list(ROLES))
+        techs = rng.sample(ROLES[role], rng.randint(1, 3))
+        workers.append({"Name": f"W{i}", "Role": role, "Technologies": techs,
+                        "Experience": [rng.randint(1, 8) for _ in techs]})
+    return workers
+
+
+def make_tasks(n, rng):
+    # Distinct priorities, decreasing, so the last task is the lowest-priority one; hours
+    # split evenly over up to 3 roles, so recorded assigned_time is exact
+    tasks = []
+    for i in range(n):
+        roles = rng.sample(list(ROLES), rng.randint(1, 3))
+        tasks.append({"task": f"Task {i}", "roles": roles, "complexity": rng.randint(1, 5),
+                      "risk": rng.randint(1, 5), "priority": 5.0 - i * 4.0 / n,
+                      "estimated_time": 6.0 * rng.randint(1, 8)})
+    return tasks
+
+
+@pytest.fixture
+def data():
+    rng = random.Random(11)
+    return make_workers(12, rng), make_tasks(30, rng)
+
+
+def full_run(workers, tasks):
+    engine = FormulaYAssignmentEngine(workers=workers)
+    return engine.assign_tasks([dict(task) for task in tasks]), engine
+
+
+def test_kept_tasks_unchanged(data):
+    workers, tasks = data
+    previous, _ = full_run(workers, tasks)
+    removed = previous[5]['assigned_workers'][0]['name']
+
+    engine = FormulaYAssignmentEngine(workers=workers)
+    result = engine.reassign(previous, {"changed_tasks": [{"task_index": 3, "complexity": 1}],
+                                        "removed_workers": [removed]})
+
+    redone = {3} | {entry['task_index'] for entry in previous
+                    if any(worker['name'] == removed for worker in entry['assigned_workers'])}
+    previous_by_task = {entry['task_index']: entry for entry in previous}
+    for entry in result:
+        if entry['task_index'] in redone:
+            assert all(worker['name'] != removed for worker in entry['assigned_workers'])
+        else:
+            assert entry == previous_by_task[entry['task_index']]
+    assert engine.last_assignment_stats['reassigned_tasks'] == len(redone)
+
+
+def test_adding_lowest_priority_task_equals_full_run(data):
+    workers, tasks = data
+    previous, _ = full_run(workers, tasks[:-1])
+    expected, expected_engine = full_run(workers, tasks)
+
+    engine = FormulaYAssignmentEngine(workers=workers)
+    result = engine.reassign(previous, {"added_tasks": [dict(tasks[-1])]})
+
+    assert result == expected
+    assert engine.worker_availability == pytest.approx(expected_engine.worker_availability)
+
+
+def test_added_task_planned_around_booked_hours(data):
+    workers, tasks = data
+    booked = {"W0": 150.0, "W3": 120.0, "Other": 40.0}
+    previous_engine = FormulaYAssignmentEngine(workers=workers)
+    previous_engine.worker_availability = dict(booked)
+    previous = previous_engine.assign_tasks([dict(task) for task in tasks[:-1]])
+    expected_engine = FormulaYAssignmentEngine(workers=workers)
+    expected_engine.worker_availability = dict(booked)
+    expected = expected_engine.assign_tasks([dict(task) for task in tasks])
+
+    engine = FormulaYAssignmentEngine(workers=workers)
+    result = engine.reassign(previous, {"added_tasks": [dict(tasks[-1])]}, booked_hours=booked)
+
+    assert result == expected
+    assert engine.worker_availability == pytest.approx(expected_engine.worker_availability)
+
+
+def test_removing_lowest_priority_task_equals_full_run(data):
+    workers, tasks = data
+    previous, _ = full_run(workers, tasks)
+    expected, expected_engine = full_run(workers, tasks[:-1])
+
+    engine = FormulaYAssignmentEngine(workers=workers)
+    result = engine.reassign(previous, {"removed_tasks": [len(tasks) - 1]})
+
+    assert result == expected
+    assert engine.last_assignment_stats['reassigned_tasks'] == 0
+    assert engine.worker_availability == pytest.approx(
+        {name: hours for name, hours in expected_engine.worker_availability.items() if hours})
+
+
+def test_reassign_on_a_copy_leaves_the_engine_unchanged(data):
+    workers, tasks = data
+    engine = FormulaYAssignmentEngine(workers=workers)
+    previous = engine.copy().assign_tasks([dict(task) for task in tasks])
+
+    request_engine = engine.copy()
+    request_engine.reassign(previous, {"added_workers": [{"Name": "New", "Role": "QA Engineer",
+                                                          "Technologies": ["Selenium"], "Experience": [9]}],
+                                       "removed_workers": ["W0"]})
+
+    assert len(request_engine.worker_table) == len(workers) + 1
+    assert len(engine.worker_table) == len(workers)
+    assert engine.worker_table.active_indices("W0") and not engine.worker_table.active_indices("New")
+    assert engine.worker_availability == {} and engine.last_assignment_stats == {}
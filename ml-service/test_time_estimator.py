@@ -0,0 +1,142 @@
+"""
+Tests for the vectorized time estimator
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_time_estimator.py
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import calculate_task_times
+from time_estimator import estimate_task_times, skill_scores
+
+
+def row_loop_times(tasks_data, workers_df, base_time=10):
+    """E_T as computed by the former per-row implementation"""
+    T = len(workers_df)
+    tasks_df = pd.DataFrame(tasks_data)
+    C_max, R_max, Pr_max = (tasks_df[column].max() for column in ('complexity', 'risk', 'priority'))
+
+    def skill_score(task_roles):
+        if not task_roles or not isinstance(task_roles, list):
+            return 1.0
+        total_score = 0
+        for _, row in workers_df.iterrows():
+            try:
+                techs = str(row['Technologies']).split(':')
+                exps = list(map(float, str(row['Experience']).split(':')))
+                for role in task_roles:
+                    role_str = str(role).strip()
+                    if role_str in techs:
+                        idx = techs.index(role_str)
+                        if idx < len(exps):
+                            total_score += exps[idx]
+            except (ValueError, IndexError):
+                continue
+        return max(total_score, 1.0)
+
+    for i, task in enumerate(tasks_data):
+        tasks_df.loc[i, 'S'] = skill_score(task.get('roles', []))
+    S_max = tasks_df['S'].max()
+
+    def compute_E_T(row):
+        C, R, Pr, S = row['complexity'], row['risk'], row['priority'], row['S']
+        C_norm = C / C_max if C_max > 0 else 0
+        R_norm = R / R_max if R_max > 0 else 0
+        Pr_norm = Pr / Pr_max if Pr_max > 0 else 0
+        S_factor = S_max / S if S > 0 else 1
+        term1 = 0.8 * base_time * (1 + C_norm + R_norm + Pr_norm)
+        term2 = 0.2 * base_time * ((0.05 * (T / T)) + (0.05 * S_factor) + (0.05 * (T / T)))
+        return round(term1 + term2, 2)
+
+    return list(tasks_df.apply(compute_E_T, axis=1))
+
+
+TECHNOLOGIES = ["Java", "SQL", "React", "Docker", "AWS", "Figma", "Python", " Java"]
+
+
+def make_workers(n, rng, fractional=False):
+    rows = []
+    for i in range(n):
+        techs = rng.sample(TECHNOLOGIES, rng.randint(1, 5))
+        # Some workers list fewer experiences than technologies
+        exps = [rng.random() * 8 if fractional else rng.randint(0, 9) for _ in techs[:len(techs) - (i % 4 == 0)]]
+        rows.append({"Name": f"W{i}", "Role": "Developer", "Technologies": ":".join(techs),
+                     "Experience": ":".join(str(exp) for exp in exps)})
+    rows.append({"Name": "Broken", "Role": "Developer", "Technologies": "Java", "Experience": "senior"})
+    return pd.DataFrame(rows)
+
+
+def make_tasks(n, rng):
+    tasks = []
+    for i in range(n):
+        roles = [] if i % 10 == 0 else [rng.choice(TECHNOLOGIES + ["Go", " SQL "]) for _ in range(rng.randint(1, 3))]
+        tasks.append({"task": f"Task {i}", "roles": roles, "complexity": rng.randint(1, 5),
+                      "risk": rng.random() * 5, "priority": rng.randint(1, 5)})
+    return tasks
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+def test_same_numbers_as_row_loop(fractional):
+    rng = random.Random(7)
+    workers_df = make_workers(40, rng, fractional)
+    tasks = make_tasks(60, rng)
+
+    result = calculate_task_times([dict(task) for task in tasks], workers_df=workers_df)
+
+    assert [task['estimated_time'] for task in result] == row_loop_times(tasks, workers_df)
+
+
+def test_skill_scores_first_technology_and_missing_experience():
+    workers_df = pd.DataFrame([
+        {"Technologies": "Java:SQL:Java", "Experience": "4:2:9"},
+        {"Technologies": "React:Java", "Experience": "3"},
+        {"Technologies": "Java", "Experience": "n/a"},
+    ])
+
+    scores = skill_scores([["Java"], ["SQL", "Java"], [], "Java", ["Go"]], workers_df)
+
+    np.testing.assert_array_equal(scores, [4.0, 6.0, 1.0, 1.0, 1.0])
+
+
+def test_list_workers_score_like_strings():
+    # get_csv_workers_dataframe splits Technologies/Experience into lists
+    rng = random.Random(5)
+    workers_df = make_workers(20, rng)
+    list_df = workers_df.assign(
+        Technologies=workers_df['Technologies'].str.split(':'),
+        Experience=workers_df['Experience'].apply(
+            lambda value: [int(exp) if exp.isdigit() else exp for exp in value.split(':')]))
+    roles = [task['roles'] for task in make_tasks(30, rng)]
+
+    scores = skill_scores(roles, list_df)
+    np.testing.assert_array_equal(scores, skill_scores(roles, workers_df))
+    assert scores.max() > 1.0
+
+
+def test_no_workers_raises_and_falls_back():
+    tasks = [{"task": "API", "roles": ["Java"], "complexity": 2, "risk": 1, "priority": 3}]
+    empty = pd.DataFrame(columns=["Name", "Role", "Technologies", "Experience"])
+
+    with pytest.raises(ZeroDivisionError):
+        estimate_task_times(pd.DataFrame(tasks), [["Java"]], empty)
+
+    result = calculate_task_times([dict(task) for task in tasks], workers_df=empty)
+    assert result[0]['estimated_time'] == round(10 * (1 + 2 + 1 + 3) * 0.3, 2)
+
+
+def test_missing_prediction_column_falls_back():
+    rng = random.Random(3)
+    tasks = [{"task": "Docs", "roles": ["Python"], "risk": 2, "priority": 1}]
+
+    result = calculate_task_times(tasks, workers_df=make_workers(5, rng))
+
+    assert result[0]['estimated_time'] == round(10 * (1 + 1 + 2 + 1) * 0.3, 2)
+
+
+def test_empty_task_list():
+    assert calculate_task_times([], workers_df=make_workers(3, random.Random(1))) == []
@@ -0,0 +1,54 @@
+"""
+Tests for the worker cache
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_worker_cache.py
+"""
+
+import pytest
+
+from worker_cache import WorkerCache
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.loads = 0
+
+    def get_csv_workers(self, workspace_id):
+        self.loads += 1
+        return [{"Name": f"{workspace_id}-{self.loads}", "Role": "Backend Developer",
+                 "Technologies": "Java:SQL", "Experience": "4:2"}]
+
+
+@pytest.fixture
+def caches(tmp_path):
+    # Two API workers: separate caches sharing the generations file
+    database = FakeDatabase()
+    path = str(tmp_path / "generations.db")
+    return database, WorkerCache(database, path), WorkerCache(database, path)
+
+
+def test_invalidation_reaches_every_cache(caches):
+    database, first, second = caches
+    first.get("ws")
+    second.get("ws")
+    second.get("other")
+    first.get("ws")
+    assert database.loads == 3
+
+    first.invalidate("ws")
+    assert second.get("ws").records[0]["Name"] == "ws-4"
+    assert second.get("other").records[0]["Name"] == "other-3"
+    assert first.get("ws").records[0]["Name"] == "ws-5"
+
+    second.invalidate()
+    first.get("ws")
+    second.get("other")
+    assert database.loads == 7
+
+
+def test_dataframe_splits_lists(caches):
+    _, cache, _ = caches
+    dataframe = cache.get("ws").dataframe
+
+    assert dataframe.loc[0, "Technologies"] == ["Java", "SQL"] and dataframe.loc[0, "Experience"] == [4, 2]
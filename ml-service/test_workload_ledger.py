@@ -0,0 +1,66 @@
+"""
+Tests for the workload ledger
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Run from ml-service/: python -m pytest test_workload_ledger.py
+"""
+
+import pytest
+
+from workload_ledger import LedgerConflict, WorkloadLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return WorkloadLedger(str(tmp_path / "ledger.db"))
+
+
+def test_snapshot_commit_and_conflict(ledger):
+    loads, version = ledger.snapshot("ws")
+    assert loads == {} and version == 0
+
+    new_version = ledger.commit("ws", {"Ana": 8.0, "Ben": 4.0}, version)
+    assert ledger.snapshot("ws") == ({"Ana": 8.0, "Ben": 4.0}, new_version)
+
+    # A second plan made on the old snapshot must not book the same hours
+    with pytest.raises(LedgerConflict):
+        ledger.commit("ws", {"Ana": 8.0}, version)
+    assert ledger.hours("ws", "Ana") == 8.0
+
+    # Other workspaces have their own version
+    ledger.commit("other", {"Ana": 2.0}, 0)
+    ledger.commit("ws", {"Ana": 2.0}, new_version)
+    assert ledger.hours("ws", "Ana") == 10.0 and ledger.hours("other", "Ana") == 2.0
+
+
+def test_unkeyed_commit_adds_and_clamps(ledger):
+    ledger.commit("ws", {"Ana": 8.0})
+    ledger.commit("ws", {"Ana": 3.0, "Ben": 1.0})
+    ledger.commit("ws", {"Ben": -5.0})
+
+    assert ledger.snapshot("ws")[0] == {"Ana": 11.0, "Ben": 0.0}
+
+
+def test_project_booking_replaces_previous(ledger):
+    ledger.commit("ws", {"Ana": 5.0})
+    ledger.commit("ws", {"Ana": 8.0, "Ben": 4.0}, project="p1")
+    ledger.commit("ws", {"Ana": 2.0}, project="p2")
+
+    # Analysing p1 again plans without its own booking and replaces it
+    loads, version = ledger.snapshot("ws", exclude_project="p1")
+    assert loads == {"Ana": 7.0, "Ben": 0.0}
+    ledger.commit("ws", {"Ana": 6.0, "Cid": 3.0}, version, project="p1")
+    ledger.commit("ws", {"Ana": 6.0, "Cid": 3.0}, project="p1")
+
+    assert ledger.snapshot("ws")[0] == {"Ana": 13.0, "Ben": 0.0, "Cid": 3.0}
+
+    ledger.release_project("ws", "p1")
+    assert ledger.snapshot("ws")[0] == {"Ana": 7.0, "Ben": 0.0, "Cid": 0.0}
+
+
+def test_reset_clears_bookings(ledger):
+    ledger.commit("ws", {"Ana": 8.0}, project="p1")
+    ledger.reset("ws")
+    ledger.commit("ws", {"Ana": 2.0}, project="p1")
+
+    assert ledger.hours("ws", "Ana") == 2.0
@@ -0,0 +1,169 @@
+"""
+Vectorized task time estimation
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+calculate_task_times scores every task with S, the experience of all
+workers in the task's roles summed, then derives E_T from the normalized
+complexity, risk and priority. The row loop re-split every worker's
+technologies for every task; here:
+
+    - workers are parsed once into a worker x role experience matrix over
+      the distinct roles of the tasks (a role matches the first technology
+      with exactly that name, as `techs.index` did)
+    - S is computed once per distinct role list, for all of them at once.
+      Whole-year experiences sum exactly in any order, so a list's S is
+      the sum of its roles' column totals; otherwise the experiences are
+      accumulated in the loop's order (worker by worker, role by role), so
+      the sums stay bit-identical
+    - E_T is computed for all tasks with array operations
+
+Technologies and Experience may be colon-separated strings (CSV upload) or
+lists (the database DataFrame), parsed like the worker table does; the row
+loop only read strings, so list-valued workers used to score nothing.
+Workers whose experience can't be parsed contribute nothing, tasks without
+a role list score 1, and no workers raises ZeroDivisionError, exactly as
+before (calculate_task_times then uses its fallback formula).
+"""
+
+import numpy as np
+import pandas as pd
+
+from worker_table import parse_experiences, parse_technologies
+
+CHUNK_ELEMENTS = 1 << 20  # Bounds the worker x role-list block summed at once
+EXACT_INTEGER_SUM = 2 ** 53  # Integer float sums below this are exact in any order
+
+
+def _first_experiences(technologies, experience):
+    """
+    Experience of each technology of a worker, first occurrence only
+
+    Returns:
+        Dict of technology -> experience, or None if the experience can't be parsed
+    """
+    techs = parse_technologies(technologies)
+    exps = parse_experiences(experience)
+    if exps is None:
+        return None
+    first = {}
+    for tech, exp in zip(techs, exps):
+        first.setdefault(tech, exp)
+    return first
+
+
+def experience_matrix(workers_df, roles):
+    """
+    Experience credited to every worker for every role
+
+    Args:
+        workers_df: Workers DataFrame (Technologies, Experience)
+        roles: Distinct role strings
+
+    Returns:
+        workers x roles array (0 where a worker doesn't list the role)
+    """
+    matrix = np.zeros((len(workers_df), len(roles)))
+    if 'Technologies' not in workers_df.columns or 'Experience' not in workers_df.columns:
+        return matrix
+
+    role_ids = {role: role_id for role_id, role in enumerate(roles)}
+    for worker_idx, (technologies, experience) in enumerate(zip(workers_df['Technologies'],
+                                                                workers_df['Experience'])):
+        experiences = _first_experiences(technologies, experience)
+        if experiences is None:
+            continue
+        for tech, exp in experiences.items():
+            role_id = role_ids.get(tech)
+            if role_id is not None:
+                matrix[worker_idx, role_id] = exp
+    return matrix
+
+
+def skill_scores(task_roles, workers_df):
+    """
+    Skill score S of every task
+
+    Args:
+        task_roles: Role list of every task
+        workers_df: Workers DataFrame (Technologies, Experience)
+
+    Returns:
+        Float array; 1.0 for tasks without roles, otherwise max(summed experience, 1)
+    """
+    scores = np.ones(len(task_roles))
+    role_lists = {}   # role tuple -> id
+    task_lists = []   # (task position, role list id)
+    for position, roles in enumerate(task_roles):
+        if not roles or not isinstance(roles, list):
+            continue
+        key = tuple(str(role).strip() for role in roles)
+        task_lists.append((position, role_lists.setdefault(key, len(role_lists))))
+
+    n_workers = len(workers_df)
+    if not task_lists or n_workers == 0:
+        return scores
+
+    vocabulary = list(dict.fromkeys(role for key in role_lists for role in key))
+    vocabulary_ids = {role: role_id for role_id, role in enumerate(vocabulary)}
+    # Extra zero column pads shorter role lists; adding 0.0 leaves a sum unchanged
+    matrix = np.hstack((experience_matrix(workers_df, vocabulary), np.zeros((n_workers, 1))))
+    width = max(len(key) for key in role_lists)
+    list_ids = np.full((len(role_lists), width), len(vocabulary), dtype=np.int64)
+    for key, list_id in role_lists.items():
+        list_ids[list_id, :len(key)] = [vocabulary_ids[role] for role in key]
+
+    if np.all(matrix == np.floor(matrix)) and np.abs(matrix).sum() < EXACT_INTEGER_SUM:
+        totals = matrix.sum(axis=0)[list_ids].sum(axis=1)
+    else:
+        totals = np.empty(len(role_lists))
+        # Workers without any of the roles only add 0.0
+        matrix = matrix[np.any(matrix != 0, axis=1)]
+        chunk = max(1, CHUNK_ELEMENTS // max(len(matrix) * width, 1))
+        for start in range(0, len(role_lists), chunk):
+            ids = list_ids[start:start + chunk]
+            # lists x (workers x roles), in the loop's order; cumsum adds sequentially
+            block = matrix[:, ids].transpose(1, 0, 2).reshape(len(ids), -1)
+            totals[start:start + len(ids)] = np.cumsum(block, axis=1)[:, -1] if block.shape[1] else 0.0
+    totals = np.where(1.0 > totals, 1.0, totals)
+
+    positions, list_positions = map(list, zip(*task_lists))
+    scores[positions] = totals[list_positions]
+    return scores
+
+
+def estimate_task_times(tasks_df, task_roles, workers_df, base_time=10):
+    """
+    Estimated time E_T of every task
+
+    Args:
+        tasks_df: Tasks DataFrame (complexity, risk, priority)
+        task_roles: Role list of every task
+        workers_df: Workers DataFrame (Technologies, Experience)
+        base_time: Base time B_T
+
+    Raises:
+        ZeroDivisionError: There are no workers
+
+    Returns:
+        Float array rounded to 2 decimals
+    """
+    T = len(workers_df)  # Total number of workers
+    C_max = tasks_df['complexity'].max() if len(tasks_df) > 0 else 1
+    R_max = tasks_df['risk'].max() if len(tasks_df) > 0 else 1
+    Pr_max = tasks_df['priority'].max() if len(tasks_df) > 0 else 1
+
+    S = skill_scores(task_roles, workers_df)
+    S_max = pd.Series(S).max() if len(tasks_df) > 0 else 1
+    T_max = T
+    P_T = T  # assume all are participating
+    B_T = base_time
+
+    C, R, Pr = (tasks_df[column].to_numpy(dtype=np.float64) for column in ('complexity', 'risk', 'priority'))
+    C_norm = C / C_max if C_max > 0 else np.zeros(len(C))
+    R_norm = R / R_max if R_max > 0 else np.zeros(len(R))
+    Pr_norm = Pr / Pr_max if Pr_max > 0 else np.zeros(len(Pr))
+    S_factor = np.where(S > 0, S_max / S, 1)
+
+    term1 = 0.8 * B_T * (1 + C_norm + R_norm + Pr_norm)
+    term2 = 0.2 * B_T * ((0.05 * (T / T_max)) + (0.05 * S_factor) + (0.05 * (P_T / T)))
+    return np.round(term1 + term2, 2)
@@ -0,0 +1,363 @@
+"""
+Isolated model training worker
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Model training runs in its own process instead of on the API event loop:
+
+    - the process is started with subprocess, so the BLAS/OpenMP thread
+      limits are in its environment before NumPy is imported
+    - it lowers its own scheduling priority with os.nice (and the Linux
+      SCHED_IDLE policy, so it only gets CPU time the API leaves unused)
+      and fits the targets with a capped number of joblib workers
+    - on multi-core hosts it is pinned to its own cores (the last
+      TRAINING_THREADS of the allowed set), so the fit doesn't evict the
+      caches of the cores serving requests
+    - SCHED_IDLE still shares caches and memory bandwidth with the API, so
+      the fit runs under a supervisor that stops it (SIGSTOP) while API
+      workers are serving and resumes it once they are idle; a pause lasts
+      at most TRAINING_MAX_PAUSE seconds, then the fit runs for
+      TRAINING_MIN_RUN seconds, so constant traffic can't starve it
+    - progress (loading, vectorizing, fitting each target, evaluating,
+      saving) is written to a JSON status file that every API worker reads
+
+The status file is replaced atomically on every write and read-modify-write
+updates hold an advisory file lock, so several uvicorn workers can share it.
+API workers watch the file and swap the new models in once a job completes.
+
+Usage:
+    python training_worker.py --backend svr --csv big_dataset.csv [--tune]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic replaces only, no cross-process lock
+    fcntl = None
+
+# Thread pools of the numerical libraries, capped in the training process
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"
+]
+
+TRAINING_THREADS = int(os.getenv("TRAINING_THREADS", 1))
+TRAINING_NICE = int(os.getenv("TRAINING_NICE", 19))
+TRAINING_AFFINITY = os.getenv("TRAINING_AFFINITY", "true").lower() in ("1", "true", "yes")
+TRAINING_PAUSE_UNDER_LOAD = os.getenv("TRAINING_PAUSE_UNDER_LOAD", "true").lower() in ("1", "true", "yes")
+TRAINING_IDLE_SECONDS = float(os.getenv("TRAINING_IDLE_SECONDS", 0.5))  # No request for this long = idle
+TRAINING_MAX_PAUSE = float(os.getenv("TRAINING_MAX_PAUSE", 30))
+TRAINING_MIN_RUN = float(os.getenv("TRAINING_MIN_RUN", 1))
+SUPERVISOR_POLL_SECONDS = 0.02
+
+IDLE_STATUS = {"status": "idle", "stage": None, "message": "No training in progress", "timestamp": ""}
+
+
+def _pid_alive(pid):
+    """True if a process with this pid exists"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def heartbeat_path(status_path):
+    """Serving heartbeat file next to a training status file"""
+    return f"{status_path}.serving"
+
+
+class ServingHeartbeat:
+    """Marks recent serving traffic in a file the training supervisor watches"""
+
+    def __init__(self, path, interval=0.1):
+        """
+        Args:
+            path: Heartbeat file (heartbeat_path of the training status file)
+            interval: Minimum seconds between two touches of the file
+        """
+        self.path = path
+        self.interval = interval
+        self._last = 0.0
+
+    def beat(self):
+        """Record that a request is being served (at most one write per interval)"""
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        try:
+            with open(self.path, "a"):
+                os.utime(self.path)
+        except OSError:
+            pass
+
+
+def _serving_idle_seconds(path):
+    """Seconds since the last serving heartbeat"""
+    try:
+        return time.time() - os.stat(path).st_mtime
+    except OSError:
+        return float("inf")
+
+
+class TrainingStatusStore:
+    """Training status shared by all API workers through a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock_path = f"{path}.lock"
+
+    @contextmanager
+    def _locked(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self):
+        """Current status; a job whose process died is reported as failed"""
+        try:
+            with open(self.path) as f:
+                status = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict(IDLE_STATUS)
+
+        if status.get("status") == "training" and status.get("pid") and not _pid_alive(status["pid"]):
+            status.update(status="failed", stage="failed",
+                          message=f"Training process {status['pid']} exited without reporting a result")
+        return status
+
+    def _write(self, status):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".status.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(status, f, indent=2)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def update(self, **fields):
+        """Merge fields into the status and stamp it"""
+        with self._locked():
+            status = self.read()
+            status.update(fields, timestamp=datetime.now().isoformat())
+            self._write(status)
+            return status
+
+    def try_start(self, **fields):
+        """
+        Record a new training job unless one is already running
+
+        Returns:
+            The new status, or None if another job is still training
+        """
+        with self._locked():
+            if self.read().get("status") == "training":
+                return None
+            now = datetime.now().isoformat()
+            status = {
+                **IDLE_STATUS,
+                "status": "training",
+                "stage": "queued",
+                "job_id": uuid.uuid4().hex[:12],
+                "started_at": now,
+                "timestamp": now,
+                **fields
+            }
+            self._write(status)
+            return status
+
+
+def start_training_process(store, job_id, csv_path, backend, tune=False, model_dir="models",
+                           threads=TRAINING_THREADS, nice=TRAINING_NICE):
+    """Launch a training job in a separate, lower-priority process"""
+    env = os.environ.copy()
+    for name in THREAD_ENV_VARS:
+        env[name] = str(threads)
+
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--csv", csv_path, "--backend", backend, "--model-dir", model_dir,
+        "--status-file", store.path, "--job-id", job_id,
+        "--threads", str(threads), "--nice", str(nice)
+    ]
+    if tune:
+        command.append("--tune")
+
+    process = subprocess.Popen(command, env=env, start_new_session=True)
+    store.update(pid=process.pid)
+    return process
+
+
+def _pin_to_training_cores(threads):
+    """Run on the last `threads` allowed cores when others are left for serving"""
+    if not TRAINING_AFFINITY or not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) <= threads:
+        return None
+    os.sched_setaffinity(0, cpus[-threads:])
+    return cpus[-threads:]
+
+
+def run_training_job(store, job_id, csv_path, backend, tune=False, model_dir="models",
+                     threads=TRAINING_THREADS, nice=TRAINING_NICE):
+    """Train, save and report one job; runs inside the training process"""
+    _pin_to_training_cores(threads)
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+        # Child processes (joblib workers) inherit the policy
+        if hasattr(os, "SCHED_IDLE"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+            except OSError:
+                pass
+    store.update(job_id=job_id, pid=os.getpid(), stage="starting",
+                 message=f"Training {backend} models (nice {nice}, {threads} threads)")
+
+    def progress(stage, message):
+        store.update(stage=stage, message=message)
+
+    try:
+        # Imported here so the thread limits and priority apply to NumPy/sklearn
+        from ml import train_models
+        from tuning import tune_hyperparameters
+
+        hyperparams = None
+        if tune:
+            progress("tuning", "Running the hyperparameter search")
+            hyperparams = tune_hyperparameters(csv_path, backend, model_dir, n_jobs=threads)
+        predictor = train_models(backend, csv_path, model_dir, hyperparams=hyperparams,
+                                 n_jobs=threads, progress=progress)
+
+        store.update(
+            status="completed", stage="done", message="Model training completed successfully",
+            backend=backend, model_version=predictor.model_version, metrics=predictor.metrics,
+            training_stats=predictor.training_stats,
+            finished_at=datetime.now().isoformat()
+        )
+        return True
+    except Exception as e:
+        store.update(status="failed", stage="failed", message=f"Model training failed: {str(e)}",
+                     finished_at=datetime.now().isoformat())
+        return False
+
+
+def _training_child(*args, **kwargs):
+    # Own process group, so the supervisor's signals reach the joblib workers too
+    os.setpgrp()
+    sys.exit(0 if run_training_job(*args, **kwargs) else 1)
+
+
+def _signal_group(pgid, signum):
+    """Signal a process group; False if it no longer exists"""
+    try:
+        os.killpg(pgid, signum)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+def run_supervised(store, *args, **kwargs):
+    """
+    Run a training job in a child process that is paused while the API serves requests
+
+    Returns:
+        True if the job succeeded
+    """
+    # NumPy isn't imported yet, so forking is safe
+    child = multiprocessing.get_context("fork").Process(target=_training_child, args=(store, *args), kwargs=kwargs)
+    child.start()
+    try:
+        # Also set from here: the child may not have run setpgrp yet
+        os.setpgid(child.pid, child.pid)
+    except OSError:
+        pass
+    heartbeat = heartbeat_path(store.path)
+    paused_at = None
+    run_until = 0.0
+    try:
+        while child.is_alive():
+            now = time.monotonic()
+            busy = _serving_idle_seconds(heartbeat) < TRAINING_IDLE_SECONDS
+            if paused_at is None and busy and now >= run_until:
+                if not _signal_group(child.pid, signal.SIGSTOP):
+                    break
+                paused_at = now
+                store.update(paused=True)
+            elif paused_at is not None and (not busy or now - paused_at >= TRAINING_MAX_PAUSE):
+                _signal_group(child.pid, signal.SIGCONT)
+                paused_at = None
+                # After a maximal pause the fit gets a slice even if the API is still busy
+                run_until = now + TRAINING_MIN_RUN
+                store.update(paused=False)
+            time.sleep(SUPERVISOR_POLL_SECONDS)
+    finally:
+        if paused_at is not None:
+            _signal_group(child.pid, signal.SIGCONT)
+            store.update(paused=False)
+    child.join()
+    return child.exitcode == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train task prediction models in an isolated process")
+    parser.add_argument("--csv", default="big_dataset.csv", help="Path to training dataset")
+    parser.add_argument("--backend", default="svr", help="Model backend to train")
+    parser.add_argument("--model-dir", default="models", help="Models directory")
+    parser.add_argument("--tune", action="store_true", help="Run a hyperparameter search before training")
+    parser.add_argument("--status-file", default=os.path.join("models", "training_status.json"),
+                        help="Shared training status file")
+    parser.add_argument("--job-id", help="Job id recorded by the API (a new job is started if omitted)")
+    parser.add_argument("--threads", type=int, default=TRAINING_THREADS, help="CPU threads for training")
+    parser.add_argument("--nice", type=int, default=TRAINING_NICE, help="Niceness increment of this process")
+    args = parser.parse_args()
+
+    # NumPy is not imported yet, so the limits still apply when run by hand
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(args.threads))
+
+    status_store = TrainingStatusStore(args.status_file)
+    job_id = args.job_id
+    if job_id is None:
+        job = status_store.try_start(backend=args.backend, csv_path=args.csv, pid=os.getpid())
+        if job is None:
+            print("❌ Another training job is already running")
+            sys.exit(1)
+        job_id = job["job_id"]
+
+    if TRAINING_PAUSE_UNDER_LOAD and hasattr(signal, "SIGSTOP") and hasattr(os, "fork"):
+        # Stopping the supervisor (SIGTERM) must not leave the fit stopped
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+        success = run_supervised(status_store, job_id, args.csv, args.backend, args.tune, args.model_dir,
+                                 threads=args.threads, nice=args.nice)
+    else:
+        success = run_training_job(status_store, job_id, args.csv, args.backend, args.tune, args.model_dir,
+                                   threads=args.threads, nice=args.nice)
+    sys.exit(0 if success else 1)
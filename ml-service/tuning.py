@@ -0,0 +1,298 @@
+"""
+Hyperparameter tuning for the task prediction models
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Searches the TF-IDF settings and the model hyperparameters with successive
+halving: every candidate is cross-validated on a small subset of the
+training rows, the best 1/factor survive, and the survivors are evaluated
+again on factor times more rows until one is left or all rows are used.
+
+Each vectorizer config is featurized once and cached, so candidates that
+share a vectorizer config never re-tokenize the dataset. The vectorizer and
+scaler are fit on the whole tuning split (they are unsupervised); the
+held-out test split used by TaskPredictorTextOnly.train is never seen.
+Training rows are deduplicated as in training (dedup_similarity), once per
+vectorizer config and fold, so candidates are scored on the samples they
+will be trained on.
+
+The winning config is saved as tuned_config.json next to the models and is
+picked up by ml.train_models and /models/train.
+
+Usage:
+    python tuning.py --backend svr
+    python tuning.py --backend linear --train
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from ml import (
+    TaskPredictorTextOnly, make_vectorizer, train_models, collapse_near_duplicates, _fit_target, TARGETS,
+    MODEL_BACKENDS, DEFAULT_BACKEND, INCREMENTAL_BACKENDS, DEFAULT_VECTORIZER_PARAMS, DEFAULT_DEDUP_SIMILARITY,
+    TUNED_CONFIG_FILE
+)
+
+# Search space
+VECTORIZER_GRID = {
+    "max_features": [500, 1000, 2000],
+    "ngram_range": [(1, 1), (1, 2)],
+    "min_df": [1, 2, 3]
+}
+
+MODEL_GRIDS = {
+    "svr": {"C": [1, 10, 100, 1000], "epsilon": [0.05, 0.1], "gamma_factor": [0.3, 1.0, 3.0]},
+    "linear": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+    "nystroem": {"alpha": [0.01, 0.1, 1.0]},
+    "rff": {"alpha": [0.01, 0.1, 1.0]},
+    "online": {"alpha": [1e-6, 1e-5, 1e-4], "eta0": [0.01, 0.05, 0.1]}
+}
+
+
+def _grid(param_grid):
+    """Expand a dict of lists into a list of dicts"""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+
+
+def _config_key(vectorizer_params):
+    return tuple(sorted(vectorizer_params.items()))
+
+
+class FeatureCache:
+    """Featurized tuning matrices, one per vectorizer config"""
+
+    def __init__(self, texts, backend=DEFAULT_BACKEND):
+        self.texts = texts
+        self.backend = backend
+        self._entries = {}
+
+    def get(self, vectorizer_params):
+        """Return (X_scaled, vectorizer, scaler, X_text) for a config, featurizing it on first use"""
+        key = _config_key(vectorizer_params)
+        if key not in self._entries:
+            vectorizer = make_vectorizer(self.backend, vectorizer_params)
+            X_text = vectorizer.fit_transform(self.texts)
+            if self.backend in INCREMENTAL_BACKENDS:
+                # Hashed features are used unscaled, as in TaskPredictorTextOnly.train
+                scaler = None
+                X_scaled = X_text
+            else:
+                scaler = StandardScaler(with_mean=False)
+                X_scaled = scaler.fit_transform(X_text)
+            self._entries[key] = (X_scaled, vectorizer, scaler, X_text)
+        return self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _collapse_rows(X_text, Y, rows, dedup_similarity):
+    """
+    Training rows deduplicated as in TaskPredictorTextOnly.train
+
+    Returns:
+        Tuple of (rows kept, their targets, sample weights or None)
+    """
+    if dedup_similarity is None:
+        return rows, Y[rows], None
+    leaders, Y_mean, counts = collapse_near_duplicates(X_text[rows], Y[rows], dedup_similarity)
+    return rows[leaders], Y_mean, counts
+
+
+def _evaluate_fold(backend, model_params, X, Y, target_scales, train_rows, test_rows,
+                   Y_train=None, sample_weight=None):
+    """
+    Fit every target on one fold; returns the mean scale-normalized MAE
+
+    Y_train and sample_weight replace Y[train_rows] when the training rows were collapsed
+    """
+    Y_train = Y[train_rows] if Y_train is None else Y_train
+    errors = []
+    for column, target in enumerate(TARGETS):
+        _, model, _ = _fit_target(backend, target, X[train_rows], Y_train[:, column], model_params, sample_weight)
+        predictions = model.predict(X[test_rows])
+        errors.append(mean_absolute_error(Y[test_rows, column], predictions) / target_scales[column])
+    return float(np.mean(errors))
+
+
+def tune_hyperparameters(csv_path="big_dataset.csv", backend=DEFAULT_BACKEND, model_dir="models",
+                         factor=3, min_rows=250, cv=3, n_jobs=-1, max_rows=None, save=True,
+                         dedup_similarity=DEFAULT_DEDUP_SIMILARITY):
+    """
+    Run a successive-halving search and return the winning config
+
+    Args:
+        csv_path: Training dataset
+        backend: Model backend to tune (one of ml.MODEL_BACKENDS)
+        model_dir: Models directory; the config is saved next to the backend's models
+        factor: Fraction of candidates kept per round is 1/factor, rows grow by factor
+        min_rows: Rows used in the first round
+        cv: Cross-validation folds per evaluation
+        n_jobs: Worker processes (-1 = all cores)
+        max_rows: Optional cap on the rows used in the last rounds
+        save: Write tuned_config.json next to the models
+        dedup_similarity: Cosine similarity at which training rows are
+            collapsed, as in training (None keeps every row)
+    """
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}'. Available: {MODEL_BACKENDS}")
+
+    search_start = time.perf_counter()
+    predictor = TaskPredictorTextOnly(backend=backend, use_cache=False)
+    combined_text, y_complexity, y_risk, y_priority = predictor.load_training_data(csv_path)
+    Y = np.column_stack([y_complexity, y_risk, y_priority])
+
+    # Same holdout split as TaskPredictorTextOnly.train, kept out of the search
+    texts_tune, texts_test, Y_tune, Y_test = train_test_split(
+        combined_text.values, Y, test_size=0.2, random_state=42
+    )
+    target_scales = np.where(Y_tune.std(axis=0) > 0, Y_tune.std(axis=0), 1.0)
+
+    # Nested row subsets: each round uses a longer prefix of one shuffled order
+    row_order = np.random.default_rng(42).permutation(len(texts_tune))
+    total_rows = min(len(row_order), max_rows) if max_rows else len(row_order)
+
+    vectorizer_configs = [{**DEFAULT_VECTORIZER_PARAMS, **params} for params in _grid(VECTORIZER_GRID)]
+    candidates = [
+        {"vectorizer_params": vectorizer_params, "model_params": model_params}
+        for vectorizer_params in vectorizer_configs
+        for model_params in _grid(MODEL_GRIDS[backend])
+    ]
+    print(f"🔍 Tuning {backend}: {len(candidates)} candidates, factor={factor}, cv={cv}, "
+          f"rows {min(min_rows, total_rows)} -> {total_rows}")
+
+    features = FeatureCache(texts_tune, backend)
+    rounds = []
+    n_rows = min(min_rows, total_rows)
+    scores = {}
+
+    while True:
+        round_start = time.perf_counter()
+        rows = row_order[:n_rows]
+        folds = list(KFold(n_splits=cv, shuffle=True, random_state=42).split(rows))
+
+        jobs = []
+        collapsed = {}  # (vectorizer config, fold) -> deduplicated training rows
+        for index, candidate in enumerate(candidates):
+            X, _, _, X_text = features.get(candidate["vectorizer_params"])
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                key = (_config_key(candidate["vectorizer_params"]), fold)
+                if key not in collapsed:
+                    collapsed[key] = _collapse_rows(X_text, Y_tune, rows[train_idx], dedup_similarity)
+                train_rows, Y_train, sample_weight = collapsed[key]
+                jobs.append((index, delayed(_evaluate_fold)(
+                    backend, candidate["model_params"], X, Y_tune, target_scales,
+                    train_rows, rows[test_idx], Y_train, sample_weight
+                )))
+
+        fold_scores = Parallel(n_jobs=n_jobs, backend="loky")(job for _, job in jobs)
+
+        scores = {}
+        for (index, _), score in zip(jobs, fold_scores):
+            scores.setdefault(index, []).append(score)
+        ranked = sorted(scores, key=lambda index: np.mean(scores[index]))
+
+        rounds.append({
+            "n_rows": int(n_rows),
+            "n_candidates": len(candidates),
+            "best_score": round(float(np.mean(scores[ranked[0]])), 5),
+            "seconds": round(time.perf_counter() - round_start, 2)
+        })
+        print(f"   Round {len(rounds)}: {len(candidates)} candidates on {n_rows} rows, "
+              f"best normalized MAE {rounds[-1]['best_score']:.4f} ({rounds[-1]['seconds']}s)")
+
+        if len(candidates) == 1 or n_rows >= total_rows:
+            best = candidates[ranked[0]]
+            best_score = float(np.mean(scores[ranked[0]]))
+            break
+
+        keep = max(1, math.ceil(len(candidates) / factor))
+        candidates = [candidates[index] for index in ranked[:keep]]
+        n_rows = min(n_rows * factor, total_rows)
+
+    # Refit the winner on the whole tuning split and score it on the holdout split
+    X_tune, vectorizer, scaler, X_text = features.get(best["vectorizer_params"])
+    X_test = vectorizer.transform(texts_test)
+    if scaler is not None:
+        X_test = scaler.transform(X_test)
+    fit_rows, Y_fit, sample_weight = _collapse_rows(X_text, Y_tune, np.arange(len(Y_tune)), dedup_similarity)
+    holdout_metrics = {}
+    for column, target in enumerate(TARGETS):
+        _, model, _ = _fit_target(backend, target, X_tune[fit_rows], Y_fit[:, column], best["model_params"],
+                                  sample_weight)
+        predictions = model.predict(X_test)
+        holdout_metrics[target] = {
+            "mae": float(mean_absolute_error(Y_test[:, column], predictions)),
+            "rmse": float(np.sqrt(mean_squared_error(Y_test[:, column], predictions)))
+        }
+
+    config = {
+        "backend": backend,
+        "vectorizer_params": {**best["vectorizer_params"], "ngram_range": list(best["vectorizer_params"]["ngram_range"])},
+        "model_params": best["model_params"],
+        "cv_score": round(best_score, 5),
+        "holdout_metrics": holdout_metrics,
+        "search": {
+            "method": "successive_halving",
+            "factor": factor,
+            "cv": cv,
+            "dedup_similarity": dedup_similarity,
+            "n_candidates": len(vectorizer_configs) * len(_grid(MODEL_GRIDS[backend])),
+            "vectorizer_configs_featurized": len(features),
+            "rounds": rounds,
+            "seconds": round(time.perf_counter() - search_start, 2)
+        },
+        "tuned_at": datetime.now().isoformat()
+    }
+
+    print(f"✅ Best config: vectorizer={config['vectorizer_params']} model={config['model_params']}")
+    for target, metrics in holdout_metrics.items():
+        print(f"   {target.capitalize()} holdout - MAE: {metrics['mae']:.4f}, RMSE: {metrics['rmse']:.4f}")
+
+    if save:
+        config_dir = predictor._backend_dir(model_dir)
+        os.makedirs(config_dir, exist_ok=True)
+        config_path = os.path.join(config_dir, TUNED_CONFIG_FILE)
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+        print(f"💾 Tuned config saved to {config_path}")
+
+    # Same shape as ml.load_tuned_config
+    config["vectorizer_params"]["ngram_range"] = tuple(config["vectorizer_params"]["ngram_range"])
+    return config
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune task prediction hyperparameters with successive halving")
+    parser.add_argument("--csv", default="big_dataset.csv", help="Path to training dataset")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=MODEL_BACKENDS, help="Model backend to tune")
+    parser.add_argument("--model-dir", default="models", help="Models directory")
+    parser.add_argument("--factor", type=int, default=3, help="Halving factor")
+    parser.add_argument("--min-rows", type=int, default=250, help="Rows used in the first round")
+    parser.add_argument("--max-rows", type=int, help="Cap on rows used in the last rounds")
+    parser.add_argument("--cv", type=int, default=3, help="Cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument("--train", action="store_true", help="Retrain and save the models with the winning config")
+    parser.add_argument("--dedup-similarity", type=float, default=DEFAULT_DEDUP_SIMILARITY,
+                        help="Collapse training rows with at least this cosine similarity into weighted samples")
+    parser.add_argument("--no-dedup", action="store_true", help="Tune on every row")
+    args = parser.parse_args()
+    dedup_similarity = None if args.no_dedup else args.dedup_similarity
+
+    tuned = tune_hyperparameters(
+        args.csv, args.backend, args.model_dir, factor=args.factor, min_rows=args.min_rows,
+        cv=args.cv, n_jobs=args.n_jobs, max_rows=args.max_rows, dedup_similarity=dedup_similarity
+    )
+    if args.train:
+        train_models(args.backend, args.csv, args.model_dir, hyperparams=tuned, dedup_similarity=dedup_similarity)
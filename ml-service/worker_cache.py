@@ -0,0 +1,214 @@
+"""
+Per-workspace cache of parsed CSV workers
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Project analysis, sprint planning and /workers read a workspace's CSV
+workers from MongoDB and parse them on every request, although imports are
+rare. The cache keeps, per workspace:
+
+    - the worker records as returned by `db_connection.get_csv_workers`
+    - the workers DataFrame used by the time estimation
+    - the parsed WorkerTable and, once an engine needs it, its SkillIndex;
+      engines share them read-only and copy the table before editing it
+
+Entries live in an LRUTTLCache (size bound, LRU eviction, TTL). They are
+dropped when workers are imported (POST /workers/cache/invalidate, called
+by the backend after a CSV import) and, where MongoDB supports change
+streams (replica sets), as soon as a csvworkers document changes. Without
+change streams the TTL bounds how long a stale worker set is served.
+
+The invalidation request reaches a single API worker, so invalidations bump
+generation counters in a SQLite file shared by all of them (by default the
+workload ledger's). Every entry remembers the generation it was loaded at
+and is reloaded once the shared counter moved, in any process; checking it
+is one primary-key read per request.
+
+Empty worker sets are not cached, so a workspace is picked up right after
+its first import and a failed database read is retried on the next
+request.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from cache import LRUTTLCache
+from database import db_connection, workers_dataframe
+from skill_index import SkillIndex
+from worker_table import WorkerTable, normalize_text
+
+WATCH_RETRY_SECONDS = 30
+ALL_WORKSPACES = "*"  # Generation row bumped when every workspace is invalidated
+
+
+class SharedGenerations:
+    """Invalidation counters per workspace in a SQLite file shared by the API workers"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute("""CREATE TABLE IF NOT EXISTS worker_cache_generations (
+            workspace TEXT PRIMARY KEY, generation INTEGER NOT NULL)""")
+
+    def _connection(self):
+        # One connection per thread, as in the workload ledger
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, workspace_id):
+        """(generation of every workspace, generation of workspace_id)"""
+        rows = dict(self._connection().execute(
+            "SELECT workspace, generation FROM worker_cache_generations WHERE workspace IN (?, ?)",
+            (ALL_WORKSPACES, workspace_id)))
+        return rows.get(ALL_WORKSPACES, 0), rows.get(workspace_id, 0)
+
+    def bump(self, workspace_id=None):
+        """Move the generation of a workspace, or of every workspace"""
+        self._connection().execute("""INSERT INTO worker_cache_generations (workspace, generation) VALUES (?, 1)
+                                      ON CONFLICT (workspace) DO UPDATE SET generation = generation + 1""",
+                                   (ALL_WORKSPACES if workspace_id is None else workspace_id,))
+
+
+class WorkspaceWorkers:
+    """Workers of one workspace, loaded and parsed once"""
+
+    def __init__(self, workspace_id, records):
+        self.workspace_id = workspace_id
+        self.records = records
+        self.dataframe = workers_dataframe(records)
+        self.table = WorkerTable.from_dataframe(self.dataframe, normalize_text)
+        self.loaded_at = time.time()
+        self.generation = None  # Shared generation the workers were loaded at
+        self._skill_index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def skill_index(self):
+        """Skill index of the table, built by the first engine that needs it"""
+        with self._lock:
+            if self._skill_index is None:
+                self._skill_index = SkillIndex(self.table)
+            return self._skill_index
+
+
+class WorkerCache:
+    """Per-workspace WorkspaceWorkers with TTL, LRU eviction and change-driven invalidation"""
+
+    def __init__(self, database, generations_file, max_size=256, ttl_seconds=300):
+        """
+        Args:
+            database: DatabaseConnection the workers are read from
+            generations_file: SQLite file of the generation counters shared by the API workers
+            max_size: Maximum number of cached workspaces (0 disables the cache)
+            ttl_seconds: Seconds a worker set is served without being reloaded
+        """
+        self.database = database
+        self.cache = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds, name="workers")
+        # Bumped on invalidation, in any process, so entries loaded before it aren't served
+        self.generations = SharedGenerations(generations_file)
+        self.loads = 0
+        self.watch_status = "disabled"
+        self.watch_error = None
+        self._watch_thread = None
+
+    def get(self, workspace_id):
+        """
+        Workers of a workspace, from the cache or the database
+
+        Returns:
+            WorkspaceWorkers (empty if the workspace has no workers)
+        """
+        workspace_id = str(workspace_id)
+        generation = self.generations.get(workspace_id)
+        workers = self.cache.get(workspace_id)
+        if workers is not None:
+            if workers.generation == generation:
+                return workers
+            # Invalidated by another API worker
+            self.cache.invalidate(workspace_id)
+
+        workers = WorkspaceWorkers(workspace_id, self.database.get_csv_workers(workspace_id))
+        workers.generation = generation
+        self.loads += 1
+        if len(workers) and self.generations.get(workspace_id) == generation:
+            self.cache.put(workspace_id, workers)
+        return workers
+
+    def invalidate(self, workspace_id=None):
+        """Drop the workers of a workspace, or of every workspace, in every API worker"""
+        if workspace_id is not None:
+            workspace_id = str(workspace_id)
+        self.generations.bump(workspace_id)
+        if workspace_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(workspace_id)
+
+    def start_watch(self):
+        """Invalidate entries from a csvworkers change stream in a background thread"""
+        if self._watch_thread is None or not self._watch_thread.is_alive():
+            self.watch_status = "starting"
+            self.watch_error = None
+            self._watch_thread = threading.Thread(target=self._watch, name="worker-cache-watch", daemon=True)
+            self._watch_thread.start()
+
+    def _watch(self):
+        from pymongo.errors import OperationFailure, PyMongoError
+
+        followed = False
+        while True:
+            try:
+                if self.database.db is None and not self.database.connect():
+                    raise PyMongoError("Could not connect to database")
+                with self.database.db.csvworkers.watch(full_document="updateLookup") as stream:
+                    self.watch_status, self.watch_error = "active", None
+                    followed = True
+                    # Changes made while the stream was down may have been missed
+                    self.invalidate()
+                    print("👀 Worker cache following csvworkers changes")
+                    for change in stream:
+                        workspace_id = (change.get("fullDocument") or {}).get("workspaceId")
+                        # Deletes don't carry the document, so the workspace is unknown
+                        self.invalidate(str(workspace_id) if workspace_id is not None else None)
+            except OperationFailure as e:
+                # Standalone servers have no change streams; entries expire after the TTL
+                self.watch_status, self.watch_error = "unavailable", str(e)
+                print(f"⚠️  Worker change stream unavailable, worker cache relies on its TTL: {e}")
+                return
+            except PyMongoError as e:
+                if not followed:
+                    self.watch_status, self.watch_error = "unavailable", str(e)
+                    print(f"⚠️  Worker change stream not started, worker cache relies on its TTL: {e}")
+                    return
+                self.watch_status, self.watch_error = "reconnecting", str(e)
+                print(f"⚠️  Worker change stream interrupted, retrying in {WATCH_RETRY_SECONDS} s: {e}")
+                time.sleep(WATCH_RETRY_SECONDS)
+
+    def stats(self):
+        """Cache counters, database loads and change stream status"""
+        stats = self.cache.stats()
+        stats.update(
+            database_loads=self.loads,
+            invalidation="change_stream" if self.watch_status == "active" else "ttl",
+            change_stream=self.watch_status,
+            change_stream_error=self.watch_error
+        )
+        return stats
+
+
+worker_cache = WorkerCache(
+    db_connection,
+    os.getenv("WORKER_CACHE_GENERATIONS_FILE",
+              os.getenv("WORKLOAD_LEDGER_FILE", os.path.join("models", "workload_ledger.db"))),
+    max_size=int(os.getenv("WORKER_CACHE_SIZE", 256)),
+    ttl_seconds=float(os.getenv("WORKER_CACHE_TTL", 300))
+)
@@ -0,0 +1,229 @@
+"""
+Compact typed worker table for Formula Y
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Workers arrive either as colon strings (`Java:SQL`, `4:3`, as in the CSV
+import) or as lists (`database.get_csv_workers_dataframe` already splits
+them). The table parses both once per workspace load into:
+
+    - interned role and technology ids (raw string -> id, plus the
+      normalized form Formula Y compares)
+    - a CSR layout of each worker's technologies in order with the
+      experience credited for each: `indptr`, `tech_ids`, `experiences`
+      (NaN where the worker lists no experience for the technology, so it
+      never scores)
+    - avg/max experience and a has-experience flag per worker for the
+      Complexity Fit Factor
+    - an active flag; removed workers keep their row (indices stay valid)
+      and are skipped by the skill index
+
+The fallbacks of the original per-row parsing are kept: unparseable
+experience counts as 1 year for every technology in S and as a single
+year in C.
+"""
+
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_text(text):
+    """Normalized form of a role or technology, as Formula Y compares them"""
+    if pd.isna(text) or text is None:
+        return ""
+    return str(text).lower().strip().replace(' ', '').replace('-', '').replace('_', '').replace('.', '')
+
+
+def _is_sequence(value):
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def parse_technologies(value):
+    """Technologies of a worker as a list of strings"""
+    if _is_sequence(value):
+        return [str(tech) for tech in value]
+    return str(value).split(':')
+
+
+def parse_experiences(value):
+    """
+    Experience years of a worker
+
+    Returns:
+        List of floats, or None if the value can't be parsed
+    """
+    try:
+        if _is_sequence(value):
+            return [float(exp) for exp in value]
+        return list(map(float, str(value).split(':')))
+    except (ValueError, TypeError):
+        return None
+
+
+class WorkerTable:
+    """Array-backed worker records, built once per workspace load"""
+
+    def __init__(self, normalize):
+        """
+        Args:
+            normalize: Text normalization used for role and technology
+                matching (FormulaYAssignmentEngine._normalize_text)
+        """
+        self._normalize = normalize
+        self.names = []
+        self.roles = []            # role id -> raw role
+        self.role_keys = []        # role id -> normalized role
+        self.technologies = []     # tech id -> raw technology
+        self.technology_keys = []  # tech id -> normalized technology
+        self._role_ids = {}
+        self._tech_ids = {}
+
+        self.role_ids = np.zeros(0, dtype=np.int32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.tech_ids = np.zeros(0, dtype=np.int32)
+        self.experiences = np.zeros(0, dtype=np.float64)
+        self.avg_experience = np.zeros(0, dtype=np.float64)
+        self.max_experience = np.zeros(0, dtype=np.float64)
+        self.has_experience = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+
+    @classmethod
+    def from_records(cls, records, normalize):
+        """Build a table from worker dicts (Name, Role, Technologies, Experience)"""
+        table = cls(normalize)
+        rows = [table._parse(record) for record in records]
+
+        table.names = [row[0] for row in rows]
+        table.role_ids = np.array([row[1] for row in rows], dtype=np.int32)
+        counts = np.array([len(row[2]) for row in rows], dtype=np.int64)
+        table.indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        table.tech_ids = np.array([tech for row in rows for tech in row[2]], dtype=np.int32)
+        table.experiences = np.array([exp for row in rows for exp in row[3]], dtype=np.float64)
+        table.avg_experience = np.array([row[4] for row in rows], dtype=np.float64)
+        table.max_experience = np.array([row[5] for row in rows], dtype=np.float64)
+        table.has_experience = np.array([row[6] for row in rows], dtype=bool)
+        table.active = np.ones(len(rows), dtype=bool)
+        return table
+
+    @classmethod
+    def from_dataframe(cls, workers_df, normalize):
+        """Build a table from a workers DataFrame"""
+        return cls.from_records(workers_df.to_dict('records'), normalize)
+
+    def copy(self):
+        """Independent copy, for editing a table other engines share"""
+        table = WorkerTable(self._normalize)
+        table.names = list(self.names)
+        table.roles, table.role_keys = list(self.roles), list(self.role_keys)
+        table.technologies, table.technology_keys = list(self.technologies), list(self.technology_keys)
+        table._role_ids, table._tech_ids = dict(self._role_ids), dict(self._tech_ids)
+        for attr in ('role_ids', 'indptr', 'tech_ids', 'experiences', 'avg_experience', 'max_experience',
+                     'has_experience', 'active'):
+            setattr(table, attr, getattr(self, attr).copy())
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def _intern(self, value, ids, raw, keys):
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(raw)
+            raw.append(value)
+            keys.append(self._normalize(value))
+        return value_id
+
+    def _parse(self, record):
+        """Parse one worker into (name, role id, tech ids, experiences, avg, max, has experience)"""
+        role = record.get('Role', '')
+        if role is None or (isinstance(role, float) and math.isnan(role)):
+            role = ''
+        role_id = self._intern(role, self._role_ids, self.roles, self.role_keys)
+
+        technologies = parse_technologies(record.get('Technologies', ''))
+        tech_ids = [self._intern(tech, self._tech_ids, self.technologies, self.technology_keys)
+                    for tech in technologies]
+
+        experiences = parse_experiences(record.get('Experience', '0'))
+        if experiences is None:
+            # S counts 1 year per technology, C a single year
+            skill_experiences = [1.0] * len(technologies)
+            fit_experiences = [1.0]
+        else:
+            skill_experiences = experiences[:len(technologies)]
+            skill_experiences += [math.nan] * (len(technologies) - len(skill_experiences))
+            fit_experiences = experiences
+
+        if fit_experiences:
+            avg_experience, max_experience = float(np.mean(fit_experiences)), max(fit_experiences)
+        else:
+            avg_experience = max_experience = 0.0
+        return (record.get('Name'), role_id, tech_ids, skill_experiences,
+                avg_experience, max_experience, bool(fit_experiences))
+
+    def append(self, record):
+        """Add a worker; returns its index"""
+        name, role_id, tech_ids, experiences, avg_experience, max_experience, has_experience = self._parse(record)
+        self.names.append(name)
+        self.role_ids = np.append(self.role_ids, np.int32(role_id))
+        self.indptr = np.append(self.indptr, self.indptr[-1] + len(tech_ids))
+        self.tech_ids = np.append(self.tech_ids, np.array(tech_ids, dtype=np.int32))
+        self.experiences = np.append(self.experiences, np.array(experiences, dtype=np.float64))
+        self.avg_experience = np.append(self.avg_experience, avg_experience)
+        self.max_experience = np.append(self.max_experience, max_experience)
+        self.has_experience = np.append(self.has_experience, has_experience)
+        self.active = np.append(self.active, True)
+        return len(self.names) - 1
+
+    def replace(self, worker_idx, record):
+        """Replace the record of a worker"""
+        name, role_id, tech_ids, experiences, avg_experience, max_experience, has_experience = self._parse(record)
+        start, end = self.indptr[worker_idx], self.indptr[worker_idx + 1]
+        self.names[worker_idx] = name
+        self.role_ids[worker_idx] = role_id
+        self.tech_ids = np.concatenate((self.tech_ids[:start], np.array(tech_ids, dtype=np.int32), self.tech_ids[end:]))
+        self.experiences = np.concatenate((self.experiences[:start], np.array(experiences, dtype=np.float64),
+                                           self.experiences[end:]))
+        self.indptr[worker_idx + 1:] += len(tech_ids) - (end - start)
+        self.avg_experience[worker_idx] = avg_experience
+        self.max_experience[worker_idx] = max_experience
+        self.has_experience[worker_idx] = has_experience
+
+    def remove(self, worker_idx):
+        """Deactivate a worker; its index is not reused"""
+        self.active[worker_idx] = False
+
+    def active_indices(self, name):
+        """Indices of the active workers with a name"""
+        return [worker_idx for worker_idx, worker_name in enumerate(self.names)
+                if worker_name == name and self.active[worker_idx]]
+
+    def role(self, worker_idx):
+        """Raw role of a worker"""
+        return self.roles[self.role_ids[worker_idx]]
+
+    def role_key(self, worker_idx):
+        """Normalized role of a worker"""
+        return self.role_keys[self.role_ids[worker_idx]]
+
+    def skills(self, worker_idx):
+        """
+        Technologies of a worker that carry an experience, in list order
+
+        Returns:
+            Tuple of (normalized technologies, experience years)
+        """
+        start, end = self.indptr[worker_idx], self.indptr[worker_idx + 1]
+        experiences = self.experiences[start:end]
+        scored = ~np.isnan(experiences)
+        keys = [self.technology_keys[tech_id] for tech_id in self.tech_ids[start:end][scored]]
+        return keys, experiences[scored]
+
+    def nbytes(self):
+        """Approximate memory of the arrays and interned strings"""
+        arrays = (self.role_ids, self.indptr, self.tech_ids, self.experiences,
+                  self.avg_experience, self.max_experience, self.has_experience, self.active)
+        strings = self.names + self.roles + self.role_keys + self.technologies + self.technology_keys
+        return sum(array.nbytes for array in arrays) + sum(sys.getsizeof(value) for value in strings)
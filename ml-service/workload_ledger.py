@@ -0,0 +1,193 @@
+"""
+Persistent workload ledger
+Author: Mohamed Taher Ben Slama - Digixi Intern
+
+Hours assigned to each worker, keyed by (workspace, worker), in a local
+SQLite database shared by every API worker and kept across restarts:
+
+    - reserve/release add or remove hours of one worker atomically
+    - snapshot returns a workspace's loads with its version; commit adds
+      the hours of a new assignment only if the workspace is still at that
+      version, so two requests planning the same workspace can't both book
+      the same free hours (the loser re-plans on the new snapshot)
+    - commits for a project replace that project's previous booking instead
+      of adding to it, so analysing a project again doesn't book it twice;
+      snapshot can leave the project's own booking out to re-plan it
+    - reads are primary-key lookups, so utilization doesn't depend on how
+      many assignments were made
+
+The database runs in WAL mode, so readers don't wait for a writer, and
+writes take the lock up front (BEGIN IMMEDIATE).
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+MAX_CAPACITY = 160  # Hours per worker (4 weeks × 40 hours)
+
+
+class LedgerConflict(Exception):
+    """The workspace changed since the snapshot a commit was planned on"""
+
+
+def utilization_status(total_hours, max_capacity=MAX_CAPACITY):
+    """Utilization entry of a worker, as reported by /workers/utilization"""
+    utilization_percent = (total_hours / max_capacity) * 100
+    status = "overloaded" if utilization_percent > 100 else \
+        "high_load" if utilization_percent > 80 else \
+        "normal" if utilization_percent > 50 else "light_load"
+    return {
+        "total_hours": round(total_hours, 2),
+        "utilization_percent": round(utilization_percent, 2),
+        "status": status
+    }
+
+
+class WorkloadLedger:
+    """Worker hours per workspace in SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._transaction() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS workload (
+                workspace TEXT NOT NULL, worker TEXT NOT NULL, hours REAL NOT NULL, updated_at TEXT NOT NULL,
+                PRIMARY KEY (workspace, worker))""")
+            db.execute("""CREATE TABLE IF NOT EXISTS workspaces (
+                workspace TEXT PRIMARY KEY, version INTEGER NOT NULL)""")
+            db.execute("""CREATE TABLE IF NOT EXISTS bookings (
+                workspace TEXT NOT NULL, project TEXT NOT NULL, worker TEXT NOT NULL, hours REAL NOT NULL,
+                updated_at TEXT NOT NULL, PRIMARY KEY (workspace, project, worker))""")
+
+    def _connection(self):
+        # One connection per thread; FastAPI runs sync work in a thread pool
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _add(self, db, workspace, worker, hours):
+        db.execute("""INSERT INTO workload (workspace, worker, hours, updated_at) VALUES (?, ?, MAX(?, 0), ?)
+                      ON CONFLICT (workspace, worker)
+                      DO UPDATE SET hours = MAX(hours + ?, 0), updated_at = excluded.updated_at""",
+                   (workspace, worker, hours, datetime.now().isoformat(), hours))
+
+    def _bump(self, db, workspace):
+        db.execute("""INSERT INTO workspaces (workspace, version) VALUES (?, 1)
+                      ON CONFLICT (workspace) DO UPDATE SET version = version + 1""", (workspace,))
+        return self._version(db, workspace)
+
+    def _version(self, db, workspace):
+        row = db.execute("SELECT version FROM workspaces WHERE workspace = ?", (workspace,)).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, workspace, worker, hours):
+        """Add hours to a worker"""
+        with self._transaction() as db:
+            self._add(db, workspace, worker, hours)
+            self._bump(db, workspace)
+
+    def release(self, workspace, worker, hours):
+        """Remove hours from a worker (never below zero)"""
+        self.reserve(workspace, worker, -hours)
+
+    def hours(self, workspace, worker):
+        """Hours currently booked for a worker"""
+        row = self._connection().execute("SELECT hours FROM workload WHERE workspace = ? AND worker = ?",
+                                         (workspace, worker)).fetchone()
+        return row[0] if row else 0.0
+
+    def _booking(self, db, workspace, project):
+        return dict(db.execute("SELECT worker, hours FROM bookings WHERE workspace = ? AND project = ?",
+                               (workspace, project)))
+
+    def snapshot(self, workspace, exclude_project=None):
+        """
+        Loads of a workspace and the version they were read at
+
+        Args:
+            workspace: Workspace ID
+            exclude_project: Project whose booking is left out of the loads
+
+        Returns:
+            Tuple of ({worker: hours}, version)
+        """
+        db = self._connection()
+        db.execute("BEGIN")
+        try:
+            loads = dict(db.execute("SELECT worker, hours FROM workload WHERE workspace = ?", (workspace,)))
+            if exclude_project is not None:
+                for worker, hours in self._booking(db, workspace, exclude_project).items():
+                    loads[worker] = max(loads.get(worker, 0.0) - hours, 0.0)
+            version = self._version(db, workspace)
+        finally:
+            db.execute("COMMIT")
+        return loads, version
+
+    def commit(self, workspace, hours_by_worker, expected_version=None, project=None):
+        """
+        Book the hours of an assignment planned on a snapshot
+
+        Args:
+            workspace: Workspace ID
+            hours_by_worker: {worker: hours}
+            expected_version: Version of the snapshot the assignment was planned on
+            project: Project the hours belong to; they replace its previous
+                booking. Without a project they are added to the loads
+
+        Raises:
+            LedgerConflict: The workspace changed since expected_version
+
+        Returns:
+            The new workspace version
+        """
+        with self._transaction() as db:
+            if expected_version is not None and self._version(db, workspace) != expected_version:
+                raise LedgerConflict(f"Workload of workspace {workspace} changed during planning")
+            if project is not None:
+                for worker, hours in self._booking(db, workspace, project).items():
+                    self._add(db, workspace, worker, -hours)
+                db.execute("DELETE FROM bookings WHERE workspace = ? AND project = ?", (workspace, project))
+                db.executemany("INSERT INTO bookings (workspace, project, worker, hours, updated_at) VALUES (?, ?, ?, ?, ?)",
+                               [(workspace, project, worker, hours, datetime.now().isoformat())
+                                for worker, hours in hours_by_worker.items() if hours > 0])
+            for worker, hours in hours_by_worker.items():
+                if hours:
+                    self._add(db, workspace, worker, hours)
+            return self._bump(db, workspace)
+
+    def release_project(self, workspace, project):
+        """Remove the booking of a project"""
+        return self.commit(workspace, {}, project=project)
+
+    def utilization(self, workspace):
+        """Utilization entry of every worker with booked hours in a workspace"""
+        rows = self._connection().execute("SELECT worker, hours FROM workload WHERE workspace = ? ORDER BY worker",
+                                          (workspace,))
+        return {worker: utilization_status(hours) for worker, hours in rows}
+
+    def reset(self, workspace):
+        """Clear all hours of a workspace"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM workload WHERE workspace = ?", (workspace,))
+            db.execute("DELETE FROM bookings WHERE workspace = ?", (workspace,))
+            self._bump(db, workspace)